@@ -0,0 +1,246 @@
+"""
+Measurement and baseline comparison for the benchmark suite.
+
+A ``Case`` builds its inputs once in ``setup`` and returns an ``op`` that
+does a fixed amount of work and returns how many operations it performed
+(ticks, path-steps, rows, requests). ``measure`` warms the op up (Numba
+compilation, connection pools, caches), times ``repeat`` samples of at
+least ``min_seconds`` each, then runs one extra pass under
+``tracemalloc``:
+
+- ``ops_per_sec``: median operations per second over the samples. Unlike
+  the fastest sample (kept as ``best_ops_per_sec`` for reference), one
+  lucky or unlucky sample cannot move it, which matters for the I/O-bound
+  bridge cases.
+- ``peak_rss_mb``: the process's resident-set high-water mark after the
+  timed samples. The suite runs every case in its own interpreter so this
+  is per case.
+- ``traced_peak_bytes_per_op``: how far memory traced by ``tracemalloc``
+  (Python objects and NumPy buffers) rose above its level at the start of
+  the extra pass, at its highest, divided by the pass's operations. This is
+  the working memory an op holds at once, not how much it allocates:
+  memory freed and reused within the pass is not counted again, so a case
+  that churns through short-lived temporaries can score near zero. Arrow
+  buffers come from pyarrow's own memory pool and are not traced at all;
+  only ``peak_rss_mb`` sees them.
+
+Baselines are JSON files mapping case names to these metrics.
+``compare`` flags a case when throughput falls, or memory grows, by more
+than the tolerance (the larger of the run's and the case's own).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+
+    HAVE_RESOURCE = True
+except ImportError:  # pragma: no cover - Windows
+    HAVE_RESOURCE = False
+
+BASELINE_VERSION = 3  # 2: ops_per_sec is the median sample; 3: alloc_bytes_per_op renamed
+DEFAULT_TOLERANCE = 0.25
+# A timed sample repeats the op until at least this long, so short ops are not timer noise
+MIN_SAMPLE_SECONDS = 0.2
+# Changes below these are noise however large they are relative to a tiny baseline
+RSS_SLACK_MB = 8.0
+TRACED_SLACK_BYTES = 64.0
+
+# Metric name -> True if higher is better
+METRICS = {"ops_per_sec": True, "peak_rss_mb": False, "traced_peak_bytes_per_op": False}
+SLACK = {"ops_per_sec": 0.0, "peak_rss_mb": RSS_SLACK_MB, "traced_peak_bytes_per_op": TRACED_SLACK_BYTES}
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One benchmark.
+
+    Args:
+        name: Unique name, ``group.case[param]`` by convention.
+        setup: Builds inputs and returns the op; the op returns its operation count.
+        unit: What one operation is, for the report.
+        repeat: Timed samples.
+        requires: Why the case cannot run here, or ``None`` if it can.
+        min_seconds: Minimum length of one timed sample; longer for noisy
+            (I/O-bound) cases so scheduling jitter averages out.
+        tolerance: Allowed fractional regression for this case, if it is
+            noisier than the run's ``--tolerance`` allows for.
+    """
+
+    name: str
+    setup: Callable[[], Callable[[], int]]
+    unit: str = "op"
+    repeat: int = 5
+    requires: Optional[str] = None
+    min_seconds: float = MIN_SAMPLE_SECONDS
+    tolerance: Optional[float] = None
+
+
+@dataclass
+class Result:
+    """Metrics of one case."""
+
+    name: str
+    unit: str
+    ops: int
+    ops_per_sec: float
+    best_ops_per_sec: float
+    peak_rss_mb: Optional[float]
+    traced_peak_bytes_per_op: float
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Result":
+        return cls(**{key: data.get(key) for key in cls.__dataclass_fields__})
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Resident-set high-water mark of this process in MiB (None if unknown)."""
+    if not HAVE_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(case: Case, repeat: Optional[int] = None) -> Result:
+    """Warm up, time and trace ``case`` in this process."""
+    op = case.setup()
+    op()
+
+    samples = []
+    ops = 0
+    for _ in range(repeat or case.repeat):
+        done, start = 0, time.perf_counter()
+        while True:
+            ops = op()
+            done += ops
+            elapsed = time.perf_counter() - start
+            if elapsed >= case.min_seconds:
+                break
+        samples.append(done / elapsed)
+    rss = peak_rss_mb()
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        traced_ops = op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=case.name,
+        unit=case.unit,
+        ops=ops,
+        ops_per_sec=statistics.median(samples),
+        best_ops_per_sec=max(samples),
+        peak_rss_mb=rss,
+        traced_peak_bytes_per_op=max(peak - baseline, 0) / max(traced_ops, 1),
+    )
+
+
+def environment() -> Dict:
+    """Where a baseline was recorded; comparisons across machines are only indicative."""
+    info = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpus": os.cpu_count(),
+    }
+    for module in ("numpy", "pandas", "pyarrow", "numba", "httpx"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    return info
+
+
+def save_baseline(path: str, results: List[Result], tolerance: float) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "recorded": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "tolerance": tolerance,
+        "cases": {
+            r.name: {key: value for key, value in r.to_dict().items() if key != "name"}
+            for r in sorted(results, key=lambda r: r.name)
+        },
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    os.replace(tmp, path)
+
+
+def load_baseline(path: str) -> Dict:
+    with open(path) as fh:
+        data = json.load(fh)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: baseline version {data.get('version')} (expected {BASELINE_VERSION})")
+    return data
+
+
+@dataclass
+class Change:
+    """One metric of one case against its baseline."""
+
+    name: str
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    regressed: bool = False
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline - 1.0
+
+
+def compare(
+    results: List[Result],
+    baseline: Dict,
+    tolerance: float,
+    case_tolerance: Optional[Dict[str, float]] = None,
+) -> List[Change]:
+    """
+    Changes of every metric of ``results`` against ``baseline["cases"]``.
+
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (a fraction: 0.25 allows 25%) plus its noise slack.
+    ``case_tolerance`` raises the tolerance of the cases it names.
+    Cases without a baseline entry get ``baseline=None`` and never regress.
+    """
+    changes = []
+    cases = baseline.get("cases", {})
+    case_tolerance = case_tolerance or {}
+    for result in results:
+        base = cases.get(result.name, {})
+        allowed = max(tolerance, case_tolerance.get(result.name) or 0.0)
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), getattr(result, metric)
+            change = Change(result.name, metric, old, new)
+            if old is not None and new is not None:
+                if higher_is_better:
+                    change.regressed = new < old * (1.0 - allowed) - SLACK[metric]
+                else:
+                    change.regressed = new > old * (1.0 + allowed) + SLACK[metric]
+            changes.append(change)
+    return changes
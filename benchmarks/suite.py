@@ -0,0 +1,506 @@
+"""
+Offline microbenchmarks and performance-regression checks.
+
+Covers the hot paths of the examples and the bridge without network access
+or an API key:
+
+- ``asq.*``: ``ASQMaker.on_tick`` scalar, ``on_tick`` + ``get_quotes`` per
+  tick, and batched ``on_ticks`` (ops are ticks).
+- ``backtest.*``: the single-path ``asq_test`` backtest, the Monte Carlo
+  engines and the latency-aware backtest at several step counts (ops are
+  path-steps).
+- ``merge.chunks[N]``: ``generate_batch.merge_chunks`` over the same rows
+  split into 1, 10 and 100 Parquet chunks, with sketches and Merkle
+  manifest (ops are rows).
+- ``bridge.*``: JSON-RPC round trips through ``server.serve_stream`` to a
+  fake upstream on localhost: proxied, served from the response cache, and
+  with a tabular result offloaded to the Arrow spool (ops are requests).
+
+Each case runs in a fresh interpreter so peak RSS is its own. Results are
+compared with a JSON baseline (``benchmarks/baseline.json`` by default);
+the exit status is 1 when a case's median throughput, or its memory,
+regresses by more than ``--tolerance`` (or the case's own, wider tolerance:
+the bridge cases also take longer and more samples).
+Baselines are machine-specific: record one on the machine you compare on.
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --filter 'asq.*' --filter 'merge.*' --repeat 3
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --tolerance 0.5 --output report.json --markdown summary.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import fnmatch
+import functools
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+if __package__ in (None, ""):
+    # Support `python benchmarks/suite.py` as well as `python -m benchmarks.suite`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_TOLERANCE,
+    Case,
+    Result,
+    compare,
+    environment,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+SEED = 42
+CASE_TIMEOUT = 600
+
+
+def _have(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def _scratch_dir() -> str:
+    """A temporary directory removed when the interpreter exits."""
+    path = tempfile.mkdtemp(prefix="aleatoric-bench-")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def _market(steps: int, dt: float = 0.4):
+    """Seeded price, confidence and timestamp arrays of one synthetic path."""
+    from examples.asq_test import BASE_PRICE, SIGMA_BASE, generate_paths
+
+    prices, confs = generate_paths(SEED, [0], steps, dt, BASE_PRICE, SIGMA_BASE)
+    return prices[0], confs[0], 1.7e9 + dt * np.arange(steps)
+
+
+# --- ASQ ---
+
+
+def _maker():
+    from examples.asq import ASQMaker, StratConfig
+
+    maker = ASQMaker("BENCH", StratConfig())
+    maker.logger.disabled = True  # Breaker transitions would log per tick
+    return maker
+
+
+def asq_on_tick(ticks: int, quotes: bool) -> Callable[[], int]:
+    prices, confs, timestamps = (a.tolist() for a in _market(ticks))
+
+    def op():
+        maker = _maker()
+        for price, conf, ts in zip(prices, confs, timestamps):
+            maker.on_tick(price, conf, ts, 10.0)
+            if quotes:
+                maker.get_quotes()
+        return ticks
+
+    return op
+
+
+def asq_on_ticks(ticks: int) -> Callable[[], int]:
+    prices, confs, timestamps = _market(ticks)
+
+    def op():
+        _maker().on_ticks(prices, confs, timestamps, 10.0)
+        return ticks
+
+    return op
+
+
+# --- Backtests ---
+
+
+def backtest_single(steps: int) -> Callable[[], int]:
+    from examples.asq_test import run_simulation
+
+    def op():
+        # Fill probabilities of quotes through the price overflow np.exp; that is expected
+        with contextlib.redirect_stdout(io.StringIO()), np.errstate(over="ignore"):
+            run_simulation(steps, SEED)
+        return steps
+
+    return op
+
+
+def backtest_monte_carlo(engine: str, paths: int, steps: int) -> Callable[[], int]:
+    from examples.asq_test import run_monte_carlo
+
+    def op():
+        run_monte_carlo(paths, steps, batch_paths=paths, seed=SEED, engine=engine)
+        return paths * steps
+
+    return op
+
+
+def backtest_latency(steps: int) -> Callable[[], int]:
+    from examples.latency_backtest import DEFAULT_LATENCY, DT_SECONDS, LatencyProfile
+    from examples.latency_backtest import run_latency_backtest
+
+    prices, confs, timestamps = _market(steps, DT_SECONDS)
+    profile = LatencyProfile.parse(*(DEFAULT_LATENCY[c] for c in ("feed", "order", "ack")))
+
+    def op():
+        run_latency_backtest(prices, confs, timestamps - timestamps[0], profile, SEED)
+        return steps
+
+    return op
+
+
+# --- Parquet chunk merge ---
+
+
+def merge_chunks(n_chunks: int, rows: int = 100_000) -> Callable[[], int]:
+    import pandas as pd
+
+    from examples.generate_batch import merge_chunks as merge
+
+    prices, confs, _ = _market(rows)
+    rng = np.random.default_rng(SEED)
+    frame = pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=rows, freq="400ms", tz="UTC"),
+        "price": prices,
+        "bid": prices * (1 - 2e-4),
+        "ask": prices * (1 + 2e-4),
+        "spread_bps": np.full(rows, 4.0),
+        "oracle_conf": confs,
+        "volume": rng.exponential(1.0, rows),
+        "returns": np.concatenate([[0.0], np.diff(np.log(prices))]),
+    })
+    chunks = []
+    for part in np.array_split(np.arange(rows), n_chunks):
+        buffer = io.BytesIO()
+        frame.iloc[part].to_parquet(buffer, index=False)
+        chunks.append(buffer.getvalue())
+    output = os.path.join(_scratch_dir(), "merged.parquet")
+
+    def op():
+        return merge(chunks, output)[0]
+
+    return op
+
+
+# --- Bridge ---
+
+
+@functools.lru_cache(maxsize=None)
+def _dataset_text(rows: int) -> str:
+    """A ``generate_dataset``-style payload, built once so the upstream adds little time."""
+    records = [
+        {"timestamp": 1.7e9 + 0.4 * i, "price": 100.0 + i * 1e-3, "conf": 0.05, "volume": 1.5}
+        for i in range(rows)
+    ]
+    return json.dumps({"symbol": "BTC", "rows": records})
+
+
+def _tool(i: int) -> Dict:
+    return {
+        "name": f"tool_{i}",
+        "description": "Benchmark tool " * 8,
+        "inputSchema": {
+            "type": "object",
+            "properties": {f"arg_{j}": {"type": "string", "description": "x" * 40} for j in range(8)},
+        },
+    }
+
+
+class _FakeUpstream(BaseHTTPRequestHandler):
+    """Answers MCP JSON-RPC like the remote endpoint, from canned payloads."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the bridge's pooled client expects
+    # Headers and body go out in separate writes; with Nagle each reply waits for a delayed ACK
+    disable_nagle_algorithm = True
+    dataset_rows = 5_000
+
+    def do_POST(self):
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        method = req.get("method")
+        if method == "tools/list":
+            result = {"tools": [_tool(i) for i in range(12)]}
+        elif method == "tools/call":
+            result = {"content": [{"type": "text", "text": _dataset_text(self.dataset_rows)}]}
+        else:
+            result = {}
+        body = json.dumps({"jsonrpc": "2.0", "id": req.get("id"), "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _CountingWriter:
+    """Stands in for stdout: counts responses without keeping them alive."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def bridge_round_trip(method: str, requests: int, cache: bool = True) -> Callable[[], int]:
+    import server
+
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUpstream)
+    upstream.daemon_threads = True
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    server.API_BASE_URL = f"http://127.0.0.1:{upstream.server_address[1]}"
+    server.API_KEY = "benchmark"
+    server.SPOOL_DIR = _scratch_dir()
+    server.SPOOL_ENABLED = server.HAVE_ARROW
+    if not cache:
+        server.CACHE_TTL = 0
+
+    params = {"name": "generate_dataset", "arguments": {"symbol": "BTC"}} if method == "tools/call" else {}
+    lines = "".join(
+        json.dumps({"jsonrpc": "2.0", "id": i, "method": method, "params": params}) + "\n"
+        for i in range(requests)
+    )
+
+    def op():
+        writer = _CountingWriter()
+        with contextlib.redirect_stderr(io.StringIO()):  # Spool log lines
+            server.serve_stream(io.StringIO(lines), writer)
+        return writer.lines
+
+    return op
+
+
+# --- Registry ---
+
+
+def _cases() -> List[Case]:
+    from examples.asq_kernel import HAVE_NUMBA
+
+    tabular = None if _have("pandas") and _have("pyarrow") else "pandas and pyarrow"
+    cases = [
+        Case("asq.on_tick", lambda: asq_on_tick(20_000, quotes=False), "tick"),
+        Case("asq.on_tick+get_quotes", lambda: asq_on_tick(20_000, quotes=True), "tick"),
+        Case("asq.on_ticks", lambda: asq_on_ticks(200_000), "tick"),
+    ]
+    for steps in (1_000, 4_000):
+        cases.append(Case(f"backtest.single[{steps}]", lambda s=steps: backtest_single(s), "step", 3))
+    for engine in ("numpy", "kernel"):
+        for steps in (1_000, 10_000):
+            cases.append(Case(
+                f"backtest.monte_carlo.{engine}[64x{steps}]",
+                lambda e=engine, s=steps: backtest_monte_carlo(e, 64, s),
+                "path-step",
+                3,
+                None if engine == "numpy" or HAVE_NUMBA else "numba",
+            ))
+    for steps in (2_000, 20_000):
+        cases.append(Case(f"backtest.latency[{steps}]", lambda s=steps: backtest_latency(s), "step", 3))
+    for n in (1, 10, 100):
+        cases.append(Case(f"merge.chunks[{n}]", lambda n=n: merge_chunks(n), "row", 3, tabular))
+    # Loopback HTTP and thread handoffs are noisy: longer samples, more of them, wider tolerance
+    bridge = {"repeat": 7, "min_seconds": 1.0, "tolerance": 0.4}
+    cases += [
+        Case("bridge.proxy", lambda: bridge_round_trip("ping", 500), "request", **bridge),
+        Case("bridge.cached", lambda: bridge_round_trip("tools/list", 2_000), "request", **bridge),
+        Case(
+            "bridge.offload",
+            lambda: bridge_round_trip("tools/call", 20, cache=False),
+            "request",
+            requires=None if _have("pyarrow") else "pyarrow",
+            **bridge,
+        ),
+    ]
+    return cases
+
+
+CASES: Dict[str, Case] = {case.name: case for case in _cases()}
+
+
+def select(patterns: Optional[List[str]]) -> List[Case]:
+    """Cases named by, or matching a glob in, ``patterns`` (all if none)."""
+    if not patterns:
+        return list(CASES.values())
+    return [
+        c for c in CASES.values()
+        if any(c.name == p or fnmatch.fnmatchcase(c.name, p) for p in patterns)
+    ]
+
+
+def run_isolated(case: Case, repeat: Optional[int]) -> Result:
+    """Measure ``case`` in a child interpreter and return its result."""
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--worker", case.name]
+    if repeat:
+        cmd += ["--repeat", str(repeat)]
+    proc = subprocess.run(
+        cmd, cwd=ROOT, capture_output=True, text=True, timeout=CASE_TIMEOUT
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{case.name} failed:\n{proc.stderr.strip()}")
+    return Result.from_dict(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+# --- Reporting ---
+
+
+def _delta(change) -> str:
+    ratio = change.ratio if change else None
+    if ratio is None:
+        return "new" if change and change.baseline is None else ""
+    flag = " !" if change.regressed else ""
+    return f"{ratio:+.0%}{flag}"
+
+
+def report_rows(results: List[Result], changes) -> List[List[str]]:
+    by_key = {(c.name, c.metric): c for c in changes}
+    rows = []
+    for r in results:
+        regressed = any(by_key[(r.name, m)].regressed for m in ("ops_per_sec", "peak_rss_mb", "traced_peak_bytes_per_op")
+                        if (r.name, m) in by_key)
+        rows.append([
+            r.name,
+            f"{r.ops_per_sec:,.0f} {r.unit}/s",
+            _delta(by_key.get((r.name, "ops_per_sec"))),
+            "-" if r.peak_rss_mb is None else f"{r.peak_rss_mb:,.0f}",
+            _delta(by_key.get((r.name, "peak_rss_mb"))),
+            f"{r.traced_peak_bytes_per_op:,.1f}",
+            _delta(by_key.get((r.name, "traced_peak_bytes_per_op"))),
+            "REGRESSED" if regressed else "ok",
+        ])
+    return rows
+
+
+HEADER = ["case", "throughput", "vs base", "peak RSS MB", "vs base", "traced peak B/op", "vs base", "status"]
+
+
+def format_table(rows: List[List[str]]) -> str:
+    widths = [max(len(row[i]) for row in [HEADER] + rows) for i in range(len(HEADER))]
+    lines = ["  ".join(cell.ljust(w) for cell, w in zip(HEADER, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def format_markdown(rows: List[List[str]], skipped: Dict[str, str], note: str) -> str:
+    lines = ["## Benchmarks", "", note, "", "| " + " | ".join(HEADER) + " |", "|" + "---|" * len(HEADER)]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+    lines += [f"\nSkipped `{name}` (needs {why})" for name, why in skipped.items()]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks and regression check")
+    parser.add_argument("--filter", action="append", metavar="GLOB", help="Run matching cases (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List cases and exit")
+    parser.add_argument("--repeat", type=int, help="Timed samples per case (default: per case)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE.relative_to(ROOT)), help="Baseline JSON to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed fractional regression per metric (default: {DEFAULT_TOLERANCE})",
+    )
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a new baseline")
+    parser.add_argument("--output", metavar="PATH", help="Write results and comparison as JSON")
+    parser.add_argument("--markdown", metavar="PATH", help="Append a Markdown report (e.g. $GITHUB_STEP_SUMMARY)")
+    parser.add_argument("--in-process", action="store_true", help="Run cases in this interpreter (RSS is shared)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        case = CASES[args.worker]
+        with contextlib.redirect_stdout(sys.stderr):
+            result = measure(case, args.repeat)
+        print(json.dumps(result.to_dict()))
+        return 0
+
+    cases = select(args.filter)
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<36} {case.unit}" + (f"  (needs {case.requires})" if case.requires else ""))
+        return 0
+    if not cases:
+        print(f"No cases match {args.filter}", file=sys.stderr)
+        return 2
+
+    results, skipped, failed = [], {}, []
+    for case in cases:
+        if case.requires:
+            skipped[case.name] = case.requires
+            print(f"{case.name}: skipped (needs {case.requires})", file=sys.stderr)
+            continue
+        print(f"{case.name} ...", file=sys.stderr, flush=True)
+        try:
+            results.append(measure(case, args.repeat) if args.in_process else run_isolated(case, args.repeat))
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(str(e), file=sys.stderr)
+            failed.append(case.name)
+
+    baseline = {}
+    if args.save_baseline:
+        note = f"Recording a new baseline in `{args.save_baseline}`."
+    else:
+        note = "No baseline; run with `--save-baseline` to record one."
+    if not args.save_baseline and os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+        note = f"Compared with `{args.baseline}` (recorded {baseline.get('recorded')}, "
+        note += f"tolerance {args.tolerance:.0%})."
+        base_env, env = baseline.get("environment", {}), environment()
+        if any(base_env.get(k) != env.get(k) for k in ("python", "machine", "processor", "cpus")):
+            note += " The baseline comes from a different machine or Python; changes are indicative only."
+    case_tolerance = {case.name: case.tolerance for case in cases if case.tolerance}
+    changes = compare(results, baseline, args.tolerance, case_tolerance)
+    regressions = sorted({c.name for c in changes if c.regressed})
+
+    rows = report_rows(results, changes)
+    print(format_table(rows))
+    print(note)
+    if args.markdown:
+        with open(args.markdown, "a") as fh:
+            fh.write(format_markdown(rows, skipped, note))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({
+                "environment": environment(),
+                "tolerance": args.tolerance,
+                "results": [r.to_dict() for r in results],
+                "changes": [dict(vars(c), ratio=c.ratio) for c in changes],
+                "regressions": regressions,
+                "skipped": skipped,
+                "failed": failed,
+            }, fh, indent=2)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, args.tolerance)
+        print(f"Saved baseline for {len(results)} cases to {args.save_baseline}")
+
+    if regressions:
+        print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
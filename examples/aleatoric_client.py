@@ -0,0 +1,526 @@
+"""
+Shared client for the Aleatoric MCP REST API, used by every example.
+
+``AleatoricClient`` (sync) and ``AsyncAleatoricClient`` (async) expose the
+same typed methods over one pooled ``httpx`` connection set; HTTP/2 is used
+when the optional ``h2`` package is installed (``pip install httpx[http2]``),
+so concurrent requests share a single multiplexed connection. Batch helpers
+(``venues``, ``call_many``) issue independent requests concurrently and send
+identical requests only once.
+
+Presets, venue details, the config schema and the server manifest change
+rarely; their responses are cached by ``ETag`` and revalidated with
+``If-None-Match``, so a repeat call costs a ``304`` with no body.
+
+Usage:
+    from examples.aleatoric_client import AleatoricClient
+
+    with AleatoricClient() as client:           # reads ALEATORIC_API_KEY
+        presets = client.presets()
+        venues = client.venues()                # all six venues concurrently
+        result = client.validate_config({"symbol": "BTC", "seed": 42})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+BASE_URL = os.getenv("MCP_BASE_URL", "https://mcp.aleatoric.systems")
+EXCHANGES = ["binance", "hyperliquid", "okx", "bybit", "cme", "sgx"]
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONCURRENCY = 16
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+SCHEMA_PATH = "/mcp/config/schema"
+
+
+class MissingAPIKeyError(RuntimeError):
+    """``ALEATORIC_API_KEY`` is not set and no key was passed."""
+
+
+# ---------------------------------------------------------------------------
+# Typed responses
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Preset:
+    name: str
+    exchange: Optional[str] = None
+    type: Optional[str] = None
+    description: str = ""
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Preset":
+        return cls(
+            name=data.get("name", "unknown"),
+            exchange=data.get("exchange"),
+            type=data.get("type"),
+            description=data.get("description", ""),
+            raw=data,
+        )
+
+
+@dataclass
+class VenueDetails:
+    exchange: str
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.raw.get(key, default)
+
+
+@dataclass
+class ServerManifest:
+    name: str
+    version: str
+    tools: Dict[str, Dict[str, Any]]
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ServerManifest":
+        server = data.get("server", {})
+        return cls(
+            name=server.get("name", ""),
+            version=str(server.get("version", "")),
+            tools=data.get("capabilities", {}).get("tools", {}),
+            raw=data,
+        )
+
+
+@dataclass
+class ValidationResult:
+    valid: bool
+    hash: Optional[str] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    errors: List[Any] = field(default_factory=list)
+    cache_key: Optional[str] = None
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ValidationResult":
+        return cls(
+            valid=bool(data.get("valid")),
+            hash=data.get("hash"),
+            config=data.get("config", {}),
+            errors=data.get("errors", []),
+            cache_key=data.get("cache_key"),
+            raw=data,
+        )
+
+
+@dataclass
+class FundingPeriod:
+    funding_rate: float
+    pnl: float
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class FundingResult:
+    periods: List[FundingPeriod]
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "FundingResult":
+        periods = [
+            FundingPeriod(p.get("funding_rate", 0.0), p.get("pnl", 0.0), p)
+            for p in data.get("periods", [])
+        ]
+        return cls(periods=periods, raw=data)
+
+    @property
+    def total_pnl(self) -> float:
+        return sum(p.pnl for p in self.periods)
+
+
+@dataclass
+class GenerateResult:
+    download_url: str
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+
+# ---------------------------------------------------------------------------
+# Request plumbing shared by both faces
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Call:
+    """One API request plus how to turn its JSON into a typed result."""
+
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+    parse: Callable[[Any], Any] = lambda data: data
+    conditional: bool = False  # Cache by ETag and revalidate with If-None-Match
+
+    def key(self) -> Tuple[str, str, str]:
+        return self.method, self.path, json.dumps(self.json, sort_keys=True)
+
+
+def _presets(data: Dict[str, Any]) -> List[Preset]:
+    return [Preset.from_json(p) for p in data.get("presets", [])]
+
+
+HEALTH = Call("GET", "/mcp/health")
+MANIFEST = Call("GET", "/mcp/manifest", parse=ServerManifest.from_json, conditional=True)
+PRESETS = Call("GET", "/mcp/presets", parse=_presets, conditional=True)
+CONFIG_SCHEMA = Call("GET", SCHEMA_PATH, conditional=True)
+
+
+def generate_call(config: Dict[str, Any], duration_seconds: int) -> Call:
+    return Call(
+        "POST",
+        "/data/generate",
+        {"config": config, "duration_seconds": duration_seconds},
+        parse=lambda data: GenerateResult(data["download_url"], data),
+    )
+
+
+def funding_call(
+    exchange: str, spot: float, mark: float, position: float, periods: int
+) -> Call:
+    payload = {
+        "exchange": exchange,
+        "spot_price": spot,
+        "mark_price": mark,
+        "position_size": position,
+        "num_periods": periods,
+    }
+    return Call("POST", "/mcp/simulate_funding_regime", payload, FundingResult.from_json)
+
+
+def validate_call(config: Dict[str, Any]) -> Call:
+    return Call("POST", "/mcp/config/validate", {"config": config}, ValidationResult.from_json)
+
+
+def venue_call(exchange: str) -> Call:
+    return Call(
+        "GET",
+        f"/mcp/venues/{exchange}",
+        parse=lambda data: VenueDetails(exchange, data),
+        conditional=True,
+    )
+
+
+def _unique(calls: Sequence[Call]) -> Tuple[List[Call], List[int]]:
+    """Distinct calls plus, for every input call, the index of its distinct twin."""
+    seen: Dict[Tuple[str, str, str], int] = {}
+    unique: List[Call] = []
+    slots = []
+    for call in calls:
+        key = call.key()
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(call)
+        slots.append(seen[key])
+    return unique, slots
+
+
+class _ClientBase:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = BASE_URL,
+        max_connections: int = DEFAULT_CONCURRENCY,
+    ):
+        api_key = api_key or os.getenv("ALEATORIC_API_KEY")
+        if not api_key:
+            raise MissingAPIKeyError("Set ALEATORIC_API_KEY environment variable")
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"X-API-Key": api_key}
+        self.max_connections = max_connections
+        self._etags: Dict[str, Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return path if path.startswith("http") else f"{self.base_url}{path}"
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+
+    def etag(self, path: str) -> Optional[str]:
+        """The cached ``ETag`` for a conditional ``path``, if any."""
+        with self._lock:
+            entry = self._etags.get(path)
+        return entry[0] if entry else None
+
+    def seed_cache(self, path: str, etag: Optional[str], data: Any) -> None:
+        """Pre-load a conditional response, e.g. one persisted by an earlier run."""
+        if etag:
+            with self._lock:
+                self._etags[path] = (etag, data)
+
+    def _prepare(self, call: Call) -> Dict[str, str]:
+        headers = dict(self.headers)
+        if call.conditional:
+            etag = self.etag(call.path)
+            if etag:
+                headers["If-None-Match"] = etag
+        return headers
+
+    def _finish(self, call: Call, resp: httpx.Response) -> Any:
+        if resp.status_code == 304 and call.conditional:
+            with self._lock:
+                data = self._etags[call.path][1]
+            return call.parse(data)
+        resp.raise_for_status()
+        data = resp.json()
+        etag = resp.headers.get("etag")
+        if call.conditional and etag:
+            with self._lock:
+                self._etags[call.path] = (etag, data)
+        return call.parse(data)
+
+
+# ---------------------------------------------------------------------------
+# Sync face
+# ---------------------------------------------------------------------------
+
+
+class AleatoricClient(_ClientBase):
+    """
+    Blocking client over a pooled ``httpx.Client``.
+
+    Batch helpers run on a thread pool sharing the same connection pool.
+
+    Args:
+        api_key: API key; defaults to ``ALEATORIC_API_KEY``.
+        base_url: API root; defaults to ``MCP_BASE_URL`` or the hosted API.
+        timeout: Default request timeout in seconds.
+        max_connections: Pool size, also the default batch concurrency.
+        **http_options: Extra ``httpx.Client`` options (proxies, transport, ...).
+
+    Raises:
+        MissingAPIKeyError: If no API key is available.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = BASE_URL,
+        timeout: Union[float, httpx.Timeout] = DEFAULT_TIMEOUT,
+        max_connections: int = DEFAULT_CONCURRENCY,
+        **http_options: Any,
+    ):
+        super().__init__(api_key, base_url, max_connections)
+        self.http = httpx.Client(
+            timeout=timeout, limits=self._limits(), http2=HTTP2, **http_options
+        )
+
+    def __enter__(self) -> "AleatoricClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.http.close()
+
+    def call(self, call: Call, timeout: Optional[float] = None) -> Any:
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        resp = self.http.request(
+            call.method,
+            self.url(call.path),
+            json=call.json,
+            headers=self._prepare(call),
+            **kwargs,
+        )
+        return self._finish(call, resp)
+
+    def call_many(
+        self,
+        calls: Sequence[Call],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run ``calls`` concurrently; results come back in input order.
+
+        Identical calls are sent once and share a result. With
+        ``return_exceptions`` a failed call yields its exception instead of
+        raising.
+        """
+        unique, slots = _unique(calls)
+
+        def run(call: Call) -> Any:
+            try:
+                return self.call(call)
+            except httpx.HTTPError as exc:
+                if return_exceptions:
+                    return exc
+                raise
+
+        workers = max(1, min(concurrency or self.max_connections, len(unique)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, unique))
+        return [results[i] for i in slots]
+
+    def health(self) -> Dict[str, Any]:
+        return self.call(HEALTH)
+
+    def manifest(self) -> ServerManifest:
+        return self.call(MANIFEST)
+
+    def presets(self) -> List[Preset]:
+        return self.call(PRESETS)
+
+    def config_schema(self) -> Dict[str, Any]:
+        return self.call(CONFIG_SCHEMA)
+
+    def venue(self, exchange: str) -> VenueDetails:
+        return self.call(venue_call(exchange))
+
+    def venues(self, exchanges: Sequence[str] = EXCHANGES) -> Dict[str, VenueDetails]:
+        """Details for several venues, fetched concurrently."""
+        return dict(zip(exchanges, self.call_many([venue_call(e) for e in exchanges])))
+
+    def validate_config(self, config: Dict[str, Any]) -> ValidationResult:
+        return self.call(validate_call(config))
+
+    def validate_configs(self, configs: Sequence[Dict[str, Any]]) -> List[ValidationResult]:
+        return self.call_many([validate_call(c) for c in configs])
+
+    def simulate_funding(
+        self, exchange: str, spot: float, mark: float, position: float, periods: int
+    ) -> FundingResult:
+        return self.call(funding_call(exchange, spot, mark, position, periods))
+
+    def generate(
+        self, config: Dict[str, Any], duration_seconds: int, timeout: float = 300.0
+    ) -> GenerateResult:
+        """Start a ``/data/generate`` job; the result holds the download URL."""
+        return self.call(generate_call(config, duration_seconds), timeout=timeout)
+
+    def download(self, url: str, timeout: float = 300.0) -> bytes:
+        """Fetch a (possibly relative) download URL into memory."""
+        resp = self.http.get(self.url(url), timeout=timeout)
+        resp.raise_for_status()
+        return resp.content
+
+
+# ---------------------------------------------------------------------------
+# Async face
+# ---------------------------------------------------------------------------
+
+
+class AsyncAleatoricClient(_ClientBase):
+    """
+    ``asyncio`` twin of ``AleatoricClient`` over a pooled ``httpx.AsyncClient``.
+
+    Batch helpers keep at most ``concurrency`` requests in flight with a
+    semaphore. Arguments are as for ``AleatoricClient``.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = BASE_URL,
+        timeout: Union[float, httpx.Timeout] = DEFAULT_TIMEOUT,
+        max_connections: int = DEFAULT_CONCURRENCY,
+        **http_options: Any,
+    ):
+        super().__init__(api_key, base_url, max_connections)
+        self.http = httpx.AsyncClient(
+            timeout=timeout, limits=self._limits(), http2=HTTP2, **http_options
+        )
+
+    async def __aenter__(self) -> "AsyncAleatoricClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def call(self, call: Call, timeout: Optional[float] = None) -> Any:
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        resp = await self.http.request(
+            call.method,
+            self.url(call.path),
+            json=call.json,
+            headers=self._prepare(call),
+            **kwargs,
+        )
+        return self._finish(call, resp)
+
+    async def call_many(
+        self,
+        calls: Sequence[Call],
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Async ``AleatoricClient.call_many``: concurrent, deduplicated, ordered."""
+        unique, slots = _unique(calls)
+        semaphore = asyncio.Semaphore(concurrency or self.max_connections)
+
+        async def run(call: Call) -> Any:
+            async with semaphore:
+                try:
+                    return await self.call(call)
+                except httpx.HTTPError as exc:
+                    if return_exceptions:
+                        return exc
+                    raise
+
+        results = await asyncio.gather(*(run(call) for call in unique))
+        return [results[i] for i in slots]
+
+    async def health(self) -> Dict[str, Any]:
+        return await self.call(HEALTH)
+
+    async def manifest(self) -> ServerManifest:
+        return await self.call(MANIFEST)
+
+    async def presets(self) -> List[Preset]:
+        return await self.call(PRESETS)
+
+    async def config_schema(self) -> Dict[str, Any]:
+        return await self.call(CONFIG_SCHEMA)
+
+    async def venue(self, exchange: str) -> VenueDetails:
+        return await self.call(venue_call(exchange))
+
+    async def venues(self, exchanges: Sequence[str] = EXCHANGES) -> Dict[str, VenueDetails]:
+        return dict(zip(exchanges, await self.call_many([venue_call(e) for e in exchanges])))
+
+    async def validate_config(self, config: Dict[str, Any]) -> ValidationResult:
+        return await self.call(validate_call(config))
+
+    async def validate_configs(
+        self, configs: Sequence[Dict[str, Any]]
+    ) -> List[ValidationResult]:
+        return await self.call_many([validate_call(c) for c in configs])
+
+    async def simulate_funding(
+        self, exchange: str, spot: float, mark: float, position: float, periods: int
+    ) -> FundingResult:
+        return await self.call(funding_call(exchange, spot, mark, position, periods))
+
+    async def generate(
+        self, config: Dict[str, Any], duration_seconds: int, timeout: float = 300.0
+    ) -> GenerateResult:
+        """Start a ``/data/generate`` job; the result holds the download URL."""
+        return await self.call(generate_call(config, duration_seconds), timeout=timeout)
+
+    async def download(self, url: str, timeout: float = 300.0) -> bytes:
+        """Fetch a (possibly relative) download URL into memory."""
+        resp = await self.http.get(self.url(url), timeout=timeout)
+        resp.raise_for_status()
+        return resp.content
@@ -57,7 +57,13 @@ class ASQMaker:
         """
         if price <= 0:
             return
+        self._update(price, conf, timestamp, inventory)
 
+    def _update(self, price: float, conf: float, timestamp: float, inventory: float):
+        """
+        Fold one valid (positive-price) tick into the state; shared by
+        ``on_tick`` and ``on_ticks``.
+        """
         # 1. Update Volatility (Only if we have a valid previous price)
         if self.oracle_price > 0 and not self.is_stale:
             # Log return
@@ -88,6 +94,36 @@ class ASQMaker:
 
         self._run_safety_checks()
 
+    def on_ticks(
+        self,
+        prices: np.ndarray,
+        confs: np.ndarray,
+        timestamps: np.ndarray,
+        inventory: float,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Batched equivalent of calling ``on_tick`` once per element.
+
+        State ends up exactly as after the scalar calls; the per-tick
+        annualized sigma and circuit-breaker flag are returned so callers can
+        inspect the whole batch without calling ``get_quotes`` per tick.
+        """
+        n = len(prices)
+        sigma = np.empty(n)
+        breaker = np.zeros(n, dtype=bool)
+        update = self._update
+
+        for i, (price, conf, ts) in enumerate(
+            zip(prices.tolist(), confs.tolist(), timestamps.tolist())
+        ):
+            if price > 0:
+                update(price, conf, ts, inventory)
+
+            sigma[i] = max(math.sqrt(self.vol_variance), self.cfg.sigma_min)
+            breaker[i] = self.circuit_breaker
+
+        return {"sigma_annual": sigma, "circuit_breaker": breaker}
+
     def _run_safety_checks(self):
         """
         Monitor for Oracle Uncertainty.
@@ -4,17 +4,24 @@ from __future__ import annotations
 Local ASQ simulation (non-MCP) for demonstrating Avellaneda-Stoikov behavior.
 Use the MCP-driven notebooks/scripts for real data; this script is a seeded,
 reproducible toy model only.
+
+Run `python -m examples.asq_test` for one path, or add `--paths N` for a
+Monte Carlo distribution of the Oracle-Aware excess return.
 """
 
 import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 
 import numpy as np
 import pandas as pd
 
 from examples.asq import ASQMaker, StratConfig
+from examples.asq_kernel import HAVE_NUMBA, quote_fill_block, rolling_std
+from examples.backtest_metrics import StreamingMetrics
+from examples.rng_streams import FILL_BLOCK, draw_block, fill_streams, stream
 
 
 # --- CONFIGURATION (Drift Protocol / Solana Params) ---
@@ -31,57 +38,125 @@ K_LIQUIDITY = 1.5  # Order book liquidity parameter (Fill probability decay)
 # Oracle Parameters (Pyth)
 CONF_THRESHOLD = 0.0015  # 15 bps (If Conf/Price > 0.15%, assume toxic flow)
 CONF_MULTIPLIER = 5.0  # How much to widen spreads during high uncertainty
+SHARPE_ANNUALIZATION = np.sqrt(365 * 24 * 60 * 60 / DT_SECONDS)
+
+# Monte Carlo Parameters
+VOL_WINDOW = 10  # Lookback (steps) for the rolling volatility proxy
+BATCH_PATHS = 256  # Paths simulated together; bounds peak memory per batch
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def generate_paths(seed, paths, steps, dt, base_price, sigma):
+    """
+    Draw GBM-plus-jumps price paths and their oracle confidence.
+
+    Each row comes from its own ``vol``/``price``/``jumps`` streams, so a path
+    is identical no matter which batch or worker generates it.
+
+    Args:
+        seed: Root seed of the experiment.
+        paths: Global path indices to generate (one row each).
+        steps: Number of blocks per path (columns).
+        dt: Block time in seconds.
+        base_price: Starting price.
+        sigma: Annualized base volatility.
+
+    Returns:
+        Tuple of ``(prices, confs)`` arrays shaped ``(len(paths), steps)``.
+    """
+    shape = (len(paths), steps)
+    drift = 0.0
+    vol_process = np.empty(shape)
+    shocks = np.empty(shape)
+    jumps = np.empty(shape)
+
+    for row, path in enumerate(paths):
+        # Stochastic Volatility component
+        vol_process[row] = stream(seed, path, "vol").normal(sigma, sigma * 0.5, steps)
+        shocks[row] = stream(seed, path, "price").standard_normal(steps)
+
+        # Add "Toxic Shocks" (Price jumps): 0.5% chance of 2% jump
+        jump_rng = stream(seed, path, "jumps")
+        jumps[row] = jump_rng.poisson(0.005, steps) * jump_rng.normal(0, 0.02, steps)
+
+    np.abs(vol_process, out=vol_process)
+
+    # Price Generation
+    returns = drift * dt + shocks * vol_process * np.sqrt(dt / 31536000)
+    returns += jumps
 
-def set_seed(seed: int) -> None:
-    """Deterministic seed for reproducible comparisons."""
-    np.random.seed(seed)
-set_seed(42)
+    prices = base_price * np.exp(np.cumsum(returns, axis=1))
+
+    # High Vol or Jumps = Wide Confidence Interval
+    confs = prices * (0.0005 + (np.abs(jumps) * 10) + (vol_process * 0.001))
+    return prices, confs
 
 
 class MarketSimulator:
-    def __init__(self, steps, dt, base_price, sigma):
+    def __init__(self, steps, dt, base_price, sigma, seed=42, path=0):
         self.steps = steps
         self.dt = dt
 
         # 1. Generate Synthetic Price Path (GBM)
         # We add "Jumps" to simulate Oracle dislocations where Confidence would spike
-        t = np.linspace(0, steps * dt, steps)
-        drift = 0.0
+        # 2. Generate Oracle Confidence Signal (Correlated with Vol + Jumps)
+        prices, confs = generate_paths(seed, [path], steps, dt, base_price, sigma)
+        self.prices = prices[0]
+        self.confs = confs[0]
 
-        # Stochastic Volatility component
-        vol_process = np.abs(np.random.normal(sigma, sigma * 0.5, steps))
+    def get_data(self):
+        return pd.DataFrame({"price": self.prices, "conf": self.confs})
 
-        # Price Generation
-        returns = np.random.normal(
-            drift * dt, vol_process * np.sqrt(dt / 31536000), steps
-        )
 
-        # Add "Toxic Shocks" (Price jumps)
-        jumps = np.random.poisson(0.005, steps) * np.random.normal(
-            0, 0.02, steps
-        )  # 0.5% chance of 2% jump
-        returns += jumps
+class MonteCarloSimulator:
+    """
+    Many independent market paths, generated in bounded batches.
 
-        self.prices = base_price * np.exp(np.cumsum(returns))
+    Only one ``(batch_paths, steps)`` block of prices and confidences is alive
+    at a time, so peak memory is set by ``batch_paths`` rather than
+    ``n_paths``: 10,000 x 10,000 runs in ~40 batches of ~20 MB per array.
+    Path ``i`` is the same whatever the batch size (see ``rng_streams``).
+    """
 
-        # 2. Generate Oracle Confidence Signal (Correlated with Vol + Jumps)
-        # High Vol or Jumps = Wide Confidence Interval
-        self.confs = self.prices * (
-            0.0005 + (np.abs(jumps) * 10) + (vol_process * 0.001)
+    def __init__(
+        self, n_paths, steps, dt, base_price, sigma, batch_paths=BATCH_PATHS, seed=42
+    ):
+        self.n_paths = n_paths
+        self.steps = steps
+        self.dt = dt
+        self.base_price = base_price
+        self.sigma = sigma
+        self.batch_paths = max(1, batch_paths)
+        self.seed = seed
+
+    def path_batches(self):
+        """Global path indices of each batch, in order."""
+        for start in range(0, self.n_paths, self.batch_paths):
+            yield range(start, min(start + self.batch_paths, self.n_paths))
+
+    def generate(self, paths):
+        """``(prices, confs)`` for the given global path indices."""
+        return generate_paths(
+            self.seed, paths, self.steps, self.dt, self.base_price, self.sigma
         )
 
-    def get_data(self):
-        return pd.DataFrame({"price": self.prices, "conf": self.confs})
+    def batches(self):
+        """Yield ``(paths, prices, confs)`` until ``n_paths`` rows are produced."""
+        for paths in self.path_batches():
+            prices, confs = self.generate(paths)
+            yield paths, prices, confs
 
 
 class Strategy:
-    def __init__(self, name, use_oracle_signal=False):
+    def __init__(self, name, use_oracle_signal=False, history_every=0):
         self.name = name
         self.use_signal = use_oracle_signal
         self.cash = INITIAL_CASH
         self.inventory = 0.0
-        self.pnl_history = []
         self.fills_history = []
+        # Running NAV metrics; pass history_every > 0 to keep a sampled NAV history
+        self.metrics = StreamingMetrics(
+            1, INITIAL_CASH, SHARPE_ANNUALIZATION, history_every
+        )
 
     def quote(self, current_price, current_conf, current_vol):
         # --- CORE AVELLANEDA LOGIC ---
@@ -121,9 +196,288 @@ class Strategy:
         self.inventory += quantity
 
 
-def run_simulation():
+class PathBatchStrategy:
+    """
+    Vectorized counterpart of ``Strategy``: one cash/inventory slot per path.
+
+    Quotes and fills are the same Avellaneda logic as ``Strategy.quote`` and
+    ``Strategy.update_fill``, evaluated elementwise across all paths of a batch.
+    """
+
+    def __init__(self, name, n_paths, use_oracle_signal=False):
+        self.name = name
+        self.use_signal = use_oracle_signal
+        self.cash = np.full(n_paths, INITIAL_CASH)
+        self.inventory = np.zeros(n_paths)
+
+    def quote(self, current_price, current_conf, current_vol):
+        reservation_price = current_price - (self.inventory * GAMMA * (current_vol**2))
+
+        spread_term = (GAMMA * (current_vol**2)) + (2 / GAMMA) * np.log(
+            1 + (GAMMA / K_LIQUIDITY)
+        )
+        half_spread = spread_term / 2.0
+
+        bid_price = reservation_price - half_spread
+        ask_price = reservation_price + half_spread
+
+        if self.use_signal:
+            is_toxic = (current_conf / current_price) > CONF_THRESHOLD
+            widen = np.where(is_toxic, half_spread * CONF_MULTIPLIER, 0.0)
+            bid_price = bid_price - widen
+            ask_price = ask_price + widen
+        else:
+            is_toxic = np.zeros(current_price.shape, dtype=bool)
+
+        return bid_price, ask_price, is_toxic
+
+    def update_fills(self, bid, ask, bid_filled, ask_filled):
+        buys = bid_filled.astype(float)
+        sells = ask_filled.astype(float)
+        self.cash -= bid * buys - ask * sells
+        self.inventory += buys - sells
+
+
+def rolling_vol_proxy(prices, t, window=VOL_WINDOW):
+    """Annualized vol proxy from the ``window`` prices before step ``t`` (per path)."""
+    price = prices[:, t]
+    vol = (
+        prices[:, t - window : t].std(axis=1, ddof=1)
+        / price
+        * np.sqrt(31536000 * DT_SECONDS)
+    )
+    return np.where(np.isnan(vol) | (vol == 0), SIGMA_BASE, vol)
+
+
+def run_path_batch(prices, confs, paths, seed, history_every=0):
+    """
+    Run Naive and Oracle-Aware strategies across every path in one batch.
+
+    The step loop stays sequential (inventory is path dependent) but each step
+    is a handful of array operations over the whole batch. Fill uniforms come
+    from per-(path, strategy) streams, predrawn ``FILL_BLOCK`` steps at a time,
+    and NAVs are folded into ``StreamingMetrics`` once per block.
+
+    Returns:
+        ``{strategy_name: StreamingMetrics}`` covering the batch's paths.
+    """
+    n_paths, steps = prices.shape
+    strategies = [
+        PathBatchStrategy("Naive Avellaneda", n_paths, use_oracle_signal=False),
+        PathBatchStrategy("Oracle-Aware MM", n_paths, use_oracle_signal=True),
+    ]
+    metrics = {
+        s.name: StreamingMetrics(
+            n_paths, INITIAL_CASH, SHARPE_ANNUALIZATION, history_every
+        )
+        for s in strategies
+    }
+    fill_rngs = {s.name: fill_streams(seed, paths, s.name) for s in strategies}
+    blocks = {}
+    nav_buf = {s.name: np.empty((n_paths, FILL_BLOCK)) for s in strategies}
+    inv_buf = {s.name: np.empty((n_paths, FILL_BLOCK)) for s in strategies}
+    fill_counts = {s.name: np.zeros((2, n_paths)) for s in strategies}
+
+    def flush(width):
+        for name, acc in metrics.items():
+            acc.update_block(
+                nav_buf[name][:, :width],
+                inv_buf[name][:, :width],
+                buys=fill_counts[name][0],
+                sells=fill_counts[name][1],
+            )
+            fill_counts[name][:] = 0.0
+
+    for t in range(VOL_WINDOW, steps):
+        i = t - VOL_WINDOW
+        col = i % FILL_BLOCK
+        if col == 0:
+            if i:
+                flush(FILL_BLOCK)
+            size = min(FILL_BLOCK, steps - t)
+            blocks = {name: draw_block(rngs, size) for name, rngs in fill_rngs.items()}
+
+        price = prices[:, t]
+        conf = confs[:, t]
+        vol_proxy = rolling_vol_proxy(prices, t)
+
+        for strat in strategies:
+            bid, ask, _ = strat.quote(price, conf, vol_proxy)
+
+            # Quotes through the mid overflow exp() to inf: a certain fill
+            with np.errstate(over="ignore"):
+                prob_bid = np.exp(-K_LIQUIDITY * (price - bid))
+                prob_ask = np.exp(-K_LIQUIDITY * (ask - price))
+            u_bid, u_ask = blocks[strat.name][:, :, col]
+            bid_filled = u_bid < prob_bid
+            ask_filled = u_ask < prob_ask
+            strat.update_fills(bid, ask, bid_filled, ask_filled)
+
+            fill_counts[strat.name][0] += bid_filled
+            fill_counts[strat.name][1] += ask_filled
+            nav_buf[strat.name][:, col] = strat.cash + strat.inventory * price
+            inv_buf[strat.name][:, col] = strat.inventory
+
+    if steps > VOL_WINDOW:
+        flush((steps - VOL_WINDOW - 1) % FILL_BLOCK + 1)
+    return metrics
+
+
+def run_path_batch_kernel(prices, confs, paths, seed, history_every=0):
+    """
+    Same backtest as ``run_path_batch``, with the sequential quote/fill/mark
+    loop in ``asq_kernel.quote_fill_block`` (Numba-compiled when available).
+
+    Works one ``FILL_BLOCK`` of steps at a time: the vol proxy and fill
+    uniforms for the block are prepared with array ops, then the kernel walks
+    each path through the block.
+    """
+    n_paths, steps = prices.shape
+    strategies = [
+        PathBatchStrategy("Naive Avellaneda", n_paths, use_oracle_signal=False),
+        PathBatchStrategy("Oracle-Aware MM", n_paths, use_oracle_signal=True),
+    ]
+    metrics = {
+        s.name: StreamingMetrics(
+            n_paths, INITIAL_CASH, SHARPE_ANNUALIZATION, history_every
+        )
+        for s in strategies
+    }
+    fill_rngs = {s.name: fill_streams(seed, paths, s.name) for s in strategies}
+
+    for t0 in range(VOL_WINDOW, steps, FILL_BLOCK):
+        size = min(FILL_BLOCK, steps - t0)
+        block_prices = prices[:, t0 : t0 + size]
+        vols = (
+            rolling_std(prices, t0, size, VOL_WINDOW)
+            / block_prices
+            * np.sqrt(31536000 * DT_SECONDS)
+        )
+        vols[np.isnan(vols) | (vols == 0)] = SIGMA_BASE
+
+        for strat in strategies:
+            u_bid, u_ask = draw_block(fill_rngs[strat.name], size)
+            navs = np.empty((n_paths, size))
+            inventories = np.empty((n_paths, size))
+            fills = np.zeros((2, n_paths))
+            quote_fill_block(
+                block_prices,
+                confs[:, t0 : t0 + size],
+                vols,
+                u_bid,
+                u_ask,
+                strat.use_signal,
+                GAMMA,
+                K_LIQUIDITY,
+                CONF_THRESHOLD,
+                CONF_MULTIPLIER,
+                strat.cash,
+                strat.inventory,
+                navs,
+                inventories,
+                fills,
+            )
+            metrics[strat.name].update_block(
+                navs, inventories, buys=fills[0], sells=fills[1]
+            )
+
+    return metrics
+
+
+ENGINES = {"numpy": run_path_batch, "kernel": run_path_batch_kernel}
+DEFAULT_ENGINE = "kernel" if HAVE_NUMBA else "numpy"
+
+
+def _run_batch_task(task):
+    """Process-pool entry point: generate and backtest one batch of paths."""
+    sim, paths, history_every, engine = task
+    prices, confs = sim.generate(paths)
+    return ENGINES[engine](prices, confs, paths, sim.seed, history_every)
+
+
+def run_monte_carlo(
+    n_paths,
+    steps=SIM_STEPS,
+    batch_paths=BATCH_PATHS,
+    seed=42,
+    workers=1,
+    history_every=0,
+    engine=DEFAULT_ENGINE,
+):
+    """
+    Monte Carlo backtest of both strategies over ``n_paths`` independent paths.
+
+    Results are identical for any ``batch_paths`` and ``workers``: every path
+    draws from its own streams and batches are reassembled in path order.
+    Memory per batch is bounded; per-path state is O(1) unless
+    ``history_every`` asks for a downsampled NAV history. ``engine`` picks
+    the vectorized ``"numpy"`` step loop or the compiled ``"kernel"``.
+
+    Returns:
+        ``{strategy_name: StreamingMetrics}`` over all ``n_paths`` paths.
+
+    Raises:
+        ValueError: If ``steps <= VOL_WINDOW``; the vol proxy needs that many
+            prior steps, so no step would be traded.
+    """
+    if steps <= VOL_WINDOW:
+        raise ValueError(f"steps must exceed VOL_WINDOW ({VOL_WINDOW}), got {steps}")
+    sim = MonteCarloSimulator(
+        n_paths, steps, DT_SECONDS, BASE_PRICE, SIGMA_BASE, batch_paths, seed
+    )
+    tasks = [(sim, paths, history_every, engine) for paths in sim.path_batches()]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch_results = list(pool.map(_run_batch_task, tasks))
+    else:
+        batch_results = map(_run_batch_task, tasks)
+
+    collected = {}
+    for batch in batch_results:
+        for name, metrics in batch.items():
+            collected.setdefault(name, []).append(metrics)
+
+    return {name: StreamingMetrics.concat(parts) for name, parts in collected.items()}
+
+
+def summarize_monte_carlo(results):
+    """Distribution of Oracle-Aware excess return over Naive across paths."""
+    naive = results["Naive Avellaneda"].summary()
+    smart = results["Oracle-Aware MM"].summary()
+    excess = smart["Ret"] - naive["Ret"]
+    summary = {
+        "paths": len(excess),
+        "excess_mean": float(excess.mean()),
+        "excess_std": float(excess.std(ddof=1)) if len(excess) > 1 else 0.0,
+        "prob_beat_naive": float((excess > 0).mean()),
+        "naive_sharpe_mean": float(naive["Sharpe"].mean()),
+        "smart_sharpe_mean": float(smart["Sharpe"].mean()),
+    }
+    for q, value in zip(QUANTILES, np.quantile(excess, QUANTILES)):
+        summary[f"excess_p{int(q * 100)}"] = float(value)
+    return summary
+
+
+def print_monte_carlo(summary):
+    print("\n" + "=" * 40)
+    print(f"MONTE CARLO: {summary['paths']} paths")
+    print("=" * 40)
+    print(f"{'Excess Mean ($)':<20} | {summary['excess_mean']:>15.2f}")
+    print(f"{'Excess Std ($)':<20} | {summary['excess_std']:>15.2f}")
+    for q in QUANTILES:
+        key = f"excess_p{int(q * 100)}"
+        print(f"{'Excess P' + str(int(q * 100)) + ' ($)':<20} | {summary[key]:>15.2f}")
+    print(f"{'P(Beat Naive)':<20} | {summary['prob_beat_naive']:>15.2%}")
+    print(
+        f"{'Mean Sharpe':<20} | {summary['naive_sharpe_mean']:>7.2f} (naive) "
+        f"| {summary['smart_sharpe_mean']:>7.2f} (oracle)"
+    )
+    print("=" * 40)
+
+
+def run_simulation(steps=SIM_STEPS, seed=42):
     # Setup Environment
-    sim = MarketSimulator(SIM_STEPS, DT_SECONDS, BASE_PRICE, SIGMA_BASE)
+    sim = MarketSimulator(steps, DT_SECONDS, BASE_PRICE, SIGMA_BASE, seed=seed)
     data = sim.get_data()
 
     # Initialize Strategies
@@ -132,8 +486,14 @@ def run_simulation():
 
     strategies = [naive_mm, smart_mm]
 
+    # Fill uniforms for path 0, one independent stream per strategy
+    fills = {
+        strat.name: draw_block(fill_streams(seed, [0], strat.name), steps)[:, 0]
+        for strat in strategies
+    }
+
     print(
-        f"Running Simulation: {SIM_STEPS} blocks ({SIM_STEPS * DT_SECONDS / 60:.1f} mins)..."
+        f"Running Simulation: {steps} blocks ({steps * DT_SECONDS / 60:.1f} mins)..."
     )
 
     # Main Loop
@@ -166,15 +526,18 @@ def run_simulation():
             prob_ask = np.exp(-K_LIQUIDITY * dist_ask)
 
             # Random "Market Arrival" check
-            if np.random.random() < prob_bid:
+            u_bid, u_ask = fills[strat.name][:, t - 10]
+            bought = u_bid < prob_bid
+            sold = u_ask < prob_ask
+            if bought:
                 strat.update_fill(bid, 1.0)  # Buy 1 unit
 
-            if np.random.random() < prob_ask:
+            if sold:
                 strat.update_fill(ask, -1.0)  # Sell 1 unit
 
             # 3. Mark to Market PnL
             nav = strat.cash + (strat.inventory * price)
-            strat.pnl_history.append(nav)
+            strat.metrics.update(nav, strat.inventory, bought, sold)
 
     # --- RESULTS ANALYSIS ---
     print("\n" + "=" * 40)
@@ -183,17 +546,8 @@ def run_simulation():
 
     results = {}
     for strat in strategies:
-        pnl_series = pd.Series(strat.pnl_history)
-        total_ret = pnl_series.iloc[-1] - INITIAL_CASH
-        max_dd = (pnl_series - pnl_series.cummax()).min()
-        vol = pnl_series.diff().std()
-        sharpe = (
-            (pnl_series.diff().mean() / vol) * np.sqrt(365 * 24 * 60 * 60 / DT_SECONDS)
-            if vol > 0
-            else 0
-        )
-
-        results[strat.name] = {"Ret": total_ret, "DD": max_dd, "Sharpe": sharpe}
+        summary = strat.metrics.summary()
+        results[strat.name] = {key: float(values[0]) for key, values in summary.items()}
 
     n_res = results["Naive Avellaneda"]
     s_res = results["Oracle-Aware MM"]
@@ -201,6 +555,7 @@ def run_simulation():
     print(f"{'Total Return ($)':<20} | {n_res['Ret']:>15.2f} | {s_res['Ret']:>15.2f}")
     print(f"{'Max Drawdown ($)':<20} | {n_res['DD']:>15.2f} | {s_res['DD']:>15.2f}")
     print(f"{'Sharpe Ratio':<20} | {n_res['Sharpe']:>15.2f} | {s_res['Sharpe']:>15.2f}")
+    print(f"{'Fills':<20} | {n_res['Fills']:>15.0f} | {s_res['Fills']:>15.0f}")
     print("=" * 40)
 
     # Interpretation
@@ -214,5 +569,51 @@ def run_simulation():
         print("FAIL: Parameters too conservative; missed profitable volume.")
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local ASQ toy backtest")
+    parser.add_argument(
+        "--paths", type=int, default=1, help="Monte Carlo paths (default: 1, single run)"
+    )
+    parser.add_argument("--steps", type=int, default=SIM_STEPS, help="Blocks per path")
+    parser.add_argument(
+        "--batch-paths",
+        type=int,
+        default=BATCH_PATHS,
+        help=f"Paths simulated per batch; bounds memory (default: {BATCH_PATHS})",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Seed (default: 42)")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Process pool size (default: 1, serial)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default=DEFAULT_ENGINE,
+        help=f"Monte Carlo step loop (default: {DEFAULT_ENGINE})",
+    )
+    args = parser.parse_args()
+    if args.steps <= VOL_WINDOW:
+        parser.error(f"--steps must be greater than {VOL_WINDOW} (the vol proxy lookback)")
+
+    if args.paths <= 1:
+        run_simulation(args.steps, args.seed)
+        return 0
+
+    print(
+        f"Running Monte Carlo: {args.paths} paths x {args.steps} blocks "
+        f"(batches of {args.batch_paths})..."
+    )
+    results = run_monte_carlo(
+        args.paths,
+        args.steps,
+        args.batch_paths,
+        args.seed,
+        args.workers,
+        engine=args.engine,
+    )
+    print_monte_carlo(summarize_monte_carlo(results))
+    return 0
+
+
 if __name__ == "__main__":
-    run_simulation()
+    raise SystemExit(main())
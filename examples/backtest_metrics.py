@@ -0,0 +1,251 @@
+"""
+Streaming, O(1)-memory performance metrics for long backtests.
+
+``StreamingMetrics`` replaces "append every NAV, then build a pandas Series"
+with running state that is updated as the backtest advances: peak NAV, max
+drawdown, a Welford mean/variance of per-step NAV changes, fill counts and
+inventory extremes. It is vectorized across paths (one slot per path) and
+two accumulators can be merged, either consecutive chunks of the same paths
+(``merge``) or disjoint sets of paths from different workers (``concat``).
+
+Full NAV history is only kept when ``history_every`` is set, and then only
+every ``history_every``-th step.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+class StreamingMetrics:
+    """
+    Online NAV metrics for ``n_paths`` independent paths.
+
+    Args:
+        n_paths: Number of paths tracked in parallel.
+        initial_nav: NAV before the first step; total return is measured from it.
+        annualization: Multiplier applied to mean/std of NAV changes for Sharpe.
+        history_every: Keep every k-th NAV when > 0; 0 keeps no history.
+        start_step: Global index of the first step fed to this accumulator, so
+            chunks processed separately sample history on the same grid.
+    """
+
+    def __init__(
+        self,
+        n_paths: int = 1,
+        initial_nav: float = 0.0,
+        annualization: float = 1.0,
+        history_every: int = 0,
+        start_step: int = 0,
+    ):
+        self.n_paths = n_paths
+        self.initial_nav = initial_nav
+        self.annualization = annualization
+        self.history_every = history_every
+        self.start_step = start_step
+
+        self.steps = 0
+        self.first_nav = np.full(n_paths, np.nan)
+        self.last_nav = np.full(n_paths, np.nan)
+        self.peak = np.full(n_paths, -np.inf)
+        self.min_nav = np.full(n_paths, np.inf)
+        self.max_dd = np.zeros(n_paths)
+
+        # Welford state over NAV changes (steps - 1 observations)
+        self.ret_count = 0
+        self.ret_mean = np.zeros(n_paths)
+        self.ret_m2 = np.zeros(n_paths)
+
+        self.buys = np.zeros(n_paths)
+        self.sells = np.zeros(n_paths)
+        self.inv_min = np.full(n_paths, np.inf)
+        self.inv_max = np.full(n_paths, -np.inf)
+
+        self.history_steps = []
+        self.history = []
+
+    def update(self, nav, inventory=None, buys=None, sells=None) -> None:
+        """Fold in one step: NAV (and optionally inventory and fills) per path."""
+        nav = np.asarray(nav, dtype=float)
+        if self.steps == 0:
+            self.first_nav = np.broadcast_to(nav, (self.n_paths,)).copy()
+        else:
+            self._add_returns(nav - self.last_nav)
+
+        self.last_nav = np.broadcast_to(nav, (self.n_paths,)).copy()
+        np.maximum(self.peak, nav, out=self.peak)
+        np.minimum(self.min_nav, nav, out=self.min_nav)
+        np.minimum(self.max_dd, nav - self.peak, out=self.max_dd)
+        self._update_book(inventory, buys, sells)
+
+        if self.history_every and (self.start_step + self.steps) % self.history_every == 0:
+            self.history_steps.append(self.start_step + self.steps)
+            self.history.append(self.last_nav.copy())
+        self.steps += 1
+
+    def update_block(self, navs, inventories=None, buys=None, sells=None) -> None:
+        """
+        Fold in ``k`` consecutive steps at once.
+
+        Args:
+            navs: Array shaped ``(n_paths, k)``.
+            inventories: Optional ``(n_paths, k)`` inventory per step.
+            buys: Optional per-path buy count over the block.
+            sells: Optional per-path sell count over the block.
+        """
+        navs = np.asarray(navs, dtype=float).reshape(self.n_paths, -1)
+        k = navs.shape[1]
+        if k == 0:
+            return
+
+        block = StreamingMetrics(
+            self.n_paths,
+            self.initial_nav,
+            self.annualization,
+            self.history_every,
+            self.start_step + self.steps,
+        )
+        block.steps = k
+        block.first_nav = navs[:, 0].copy()
+        block.last_nav = navs[:, -1].copy()
+        block.peak = navs.max(axis=1)
+        block.min_nav = navs.min(axis=1)
+        block.max_dd = (navs - np.maximum.accumulate(navs, axis=1)).min(axis=1)
+
+        if k > 1:
+            diffs = np.diff(navs, axis=1)
+            block.ret_count = k - 1
+            block.ret_mean = diffs.mean(axis=1)
+            block.ret_m2 = ((diffs - block.ret_mean[:, None]) ** 2).sum(axis=1)
+
+        if inventories is not None:
+            inventories = np.asarray(inventories, dtype=float).reshape(self.n_paths, -1)
+            block.inv_min = inventories.min(axis=1)
+            block.inv_max = inventories.max(axis=1)
+        block._update_book(None, buys, sells)
+
+        if self.history_every:
+            offsets = np.arange(k) + block.start_step
+            for col in np.flatnonzero(offsets % self.history_every == 0):
+                block.history_steps.append(int(offsets[col]))
+                block.history.append(navs[:, col].copy())
+
+        self.merge(block)
+
+    def merge(self, later: "StreamingMetrics") -> "StreamingMetrics":
+        """
+        Append ``later``, which covers the steps right after this accumulator.
+
+        Drawdown stays exact: a dip in ``later`` is measured against the larger
+        of both peaks, and the NAV change across the seam joins the Welford state.
+        """
+        if later.steps == 0:
+            return self
+        if self.steps == 0:
+            for name, value in later.__dict__.items():
+                if name == "start_step":
+                    continue
+                if isinstance(value, (np.ndarray, list)):
+                    value = value.copy()
+                setattr(self, name, value)
+            return self
+
+        self.max_dd = np.minimum(
+            np.minimum(self.max_dd, later.max_dd), later.min_nav - self.peak
+        )
+        self.peak = np.maximum(self.peak, later.peak)
+        self.min_nav = np.minimum(self.min_nav, later.min_nav)
+
+        self._add_returns(later.first_nav - self.last_nav)
+        self._merge_moments(later.ret_count, later.ret_mean, later.ret_m2)
+
+        self.last_nav = later.last_nav.copy()
+        self.buys += later.buys
+        self.sells += later.sells
+        np.minimum(self.inv_min, later.inv_min, out=self.inv_min)
+        np.maximum(self.inv_max, later.inv_max, out=self.inv_max)
+        self.history_steps.extend(later.history_steps)
+        self.history.extend(later.history)
+        self.steps += later.steps
+        return self
+
+    @classmethod
+    def concat(cls, parts: Sequence["StreamingMetrics"]) -> "StreamingMetrics":
+        """Combine accumulators over disjoint paths (e.g. one per worker)."""
+        first = parts[0]
+        out = cls(
+            sum(p.n_paths for p in parts),
+            first.initial_nav,
+            first.annualization,
+            first.history_every,
+            first.start_step,
+        )
+        out.steps = first.steps
+        out.ret_count = first.ret_count
+        for name in (
+            "first_nav", "last_nav", "peak", "min_nav", "max_dd", "ret_mean",
+            "ret_m2", "buys", "sells", "inv_min", "inv_max",
+        ):
+            setattr(out, name, np.concatenate([getattr(p, name) for p in parts]))
+        out.history_steps = list(first.history_steps)
+        out.history = [
+            np.concatenate(cols) for cols in zip(*(p.history for p in parts))
+        ]
+        return out
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """
+        Per-path metrics.
+
+        Returns:
+            Dict with ``Ret`` (last NAV minus ``initial_nav``), ``DD`` (max
+            drawdown, <= 0), ``Sharpe``, ``Fills``, ``InvMin`` and ``InvMax``,
+            each an array of length ``n_paths``.
+        """
+        if self.ret_count > 1:
+            vol = np.sqrt(self.ret_m2 / (self.ret_count - 1))
+        else:
+            vol = np.zeros(self.n_paths)
+        safe_vol = np.where(vol > 0, vol, 1.0)
+        sharpe = np.where(vol > 0, self.ret_mean / safe_vol * self.annualization, 0.0)
+        return {
+            "Ret": self.last_nav - self.initial_nav,
+            "DD": self.max_dd.copy(),
+            "Sharpe": sharpe,
+            "Fills": self.buys + self.sells,
+            "InvMin": self.inv_min.copy(),
+            "InvMax": self.inv_max.copy(),
+        }
+
+    def history_array(self) -> Optional[np.ndarray]:
+        """Downsampled NAV history shaped ``(n_paths, samples)``, if kept."""
+        if not self.history:
+            return None
+        return np.stack(self.history, axis=1)
+
+    def _add_returns(self, ret) -> None:
+        self.ret_count += 1
+        delta = ret - self.ret_mean
+        self.ret_mean = self.ret_mean + delta / self.ret_count
+        self.ret_m2 = self.ret_m2 + delta * (ret - self.ret_mean)
+
+    def _merge_moments(self, count, mean, m2) -> None:
+        # Chan et al. pairwise combination of Welford states
+        if count == 0:
+            return
+        total = self.ret_count + count
+        delta = mean - self.ret_mean
+        self.ret_mean = self.ret_mean + delta * (count / total)
+        self.ret_m2 = self.ret_m2 + m2 + delta**2 * (self.ret_count * count / total)
+        self.ret_count = total
+
+    def _update_book(self, inventory, buys, sells) -> None:
+        if inventory is not None:
+            np.minimum(self.inv_min, inventory, out=self.inv_min)
+            np.maximum(self.inv_max, inventory, out=self.inv_max)
+        if buys is not None:
+            self.buys += buys
+        if sells is not None:
+            self.sells += sells
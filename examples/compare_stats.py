@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Compare synthetic MCP data against historical data in one streaming pass.
+
+Every Parquet row group of both datasets is scanned once, in parallel across
+a process pool, into mergeable accumulators (moments, lag sums for the
+return ACFs, min/max, depth and imbalance). Row-group results are folded in
+file order, so returns and autocorrelations across row-group seams are exact.
+Medians and KS p-values come from mergeable KLL sketches; pass ``--exact`` to
+retain the return and spread values and sort them instead.
+The output has the layout of ``examples/outputs/statistical_comparison.csv``
+and ``comparison_summary.json``; it is written to the current directory
+(``--output-dir`` to change), so the committed reference files are never
+overwritten.
+
+Usage:
+    python -m examples.compare_stats --historical hl_btc.parquet \\
+        --synthetic examples/outputs/market_data.parquet --symbol BTC --date 20251201
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from examples.quantile_sketch import KLLSketch, ks_2samp_sketch
+from examples.streaming_stats import LagSums, Moments, kolmogorov_sf
+
+OUTPUT_DIR = Path(".")
+SECONDS_PER_YEAR = 365 * 24 * 3600
+DEPTH_LEVELS = 5
+
+PRICE_COLUMNS = ("price", "mid", "mid_price")
+TIME_COLUMNS = ("timestamp", "ts", "time")
+SIZE_PATTERN = re.compile(r"^(bid|ask)_(?:size|sz|qty|volume)_?(\d+)$")
+
+# Metrics averaged into overall_similarity_pct: volatility, spread and tails.
+SIMILARITY_METRICS = ("volatility_annual", "spread_mean_bps", "returns_kurtosis")
+
+
+@dataclass
+class ColumnSpec:
+    """Which Parquet columns feed each statistic (resolved from the schema)."""
+
+    price: str
+    time: Optional[str] = None
+    spread_bps: Optional[str] = None
+    bid: Optional[str] = None
+    ask: Optional[str] = None
+    bid_sizes: List[str] = field(default_factory=list)
+    ask_sizes: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_schema(cls, names: List[str]) -> "ColumnSpec":
+        price = next((c for c in PRICE_COLUMNS if c in names), None)
+        if price is None:
+            raise ValueError(f"No price column found (tried {PRICE_COLUMNS})")
+        sizes: Dict[str, List[Tuple[int, str]]] = {"bid": [], "ask": []}
+        for name in names:
+            match = SIZE_PATTERN.match(name)
+            if match:
+                sizes[match.group(1)].append((int(match.group(2)), name))
+        return cls(
+            price=price,
+            time=next((c for c in TIME_COLUMNS if c in names), None),
+            spread_bps="spread_bps" if "spread_bps" in names else None,
+            bid="bid" if "bid" in names else None,
+            ask="ask" if "ask" in names else None,
+            bid_sizes=[n for _, n in sorted(sizes["bid"])[:DEPTH_LEVELS]],
+            ask_sizes=[n for _, n in sorted(sizes["ask"])[:DEPTH_LEVELS]],
+        )
+
+    def columns(self) -> List[str]:
+        cols = [self.price, self.time, self.spread_bps, self.bid, self.ask]
+        return [c for c in cols if c] + self.bid_sizes + self.ask_sizes
+
+
+@dataclass
+class ChunkStats:
+    """Mergeable statistics for a contiguous run of rows."""
+
+    records: int = 0
+    first_price: float = math.nan
+    last_price: float = math.nan
+    t_min: float = math.inf
+    t_max: float = -math.inf
+    price: Moments = field(default_factory=Moments)
+    returns: Moments = field(default_factory=Moments)
+    returns_lag: LagSums = field(default_factory=LagSums)
+    sq_returns: Moments = field(default_factory=Moments)
+    sq_returns_lag: LagSums = field(default_factory=LagSums)
+    spread: Moments = field(default_factory=Moments)
+    bid_depth: Moments = field(default_factory=Moments)
+    ask_depth: Moments = field(default_factory=Moments)
+    imbalance: Moments = field(default_factory=Moments)
+    # Order statistics (median, KS): sketches always, raw values when exact
+    return_sketch: KLLSketch = field(default_factory=KLLSketch)
+    spread_sketch: KLLSketch = field(default_factory=KLLSketch)
+    exact: bool = False
+    return_values: List[np.ndarray] = field(default_factory=list)
+    spread_values: List[np.ndarray] = field(default_factory=list)
+
+    @classmethod
+    def from_table(
+        cls, table: pa.Table, spec: ColumnSpec, exact: bool = False
+    ) -> "ChunkStats":
+        def col(name):
+            return table.column(name).to_numpy().astype(float, copy=False)
+
+        prices = col(spec.price)
+        stats = cls(records=len(prices), exact=exact)
+        if len(prices) == 0:
+            return stats
+        stats.first_price = float(prices[0])
+        stats.last_price = float(prices[-1])
+        stats.price = Moments.from_array(prices)
+        stats._add_returns(np.diff(np.log(prices)) * 1e4)
+
+        if spec.time:
+            ts = table.column(spec.time)
+            if pa.types.is_timestamp(ts.type):
+                ts = ts.cast(pa.timestamp("ns")).cast(pa.int64())
+                seconds = ts.to_numpy() / 1e9
+            else:
+                seconds = ts.to_numpy().astype(float)
+            stats.t_min = float(seconds.min())
+            stats.t_max = float(seconds.max())
+
+        if spec.spread_bps:
+            spreads = col(spec.spread_bps)
+        elif spec.bid and spec.ask:
+            spreads = (col(spec.ask) - col(spec.bid)) / prices * 1e4
+        else:
+            spreads = None
+        if spreads is not None:
+            stats.spread = Moments.from_array(spreads)
+            stats.spread_sketch.update(spreads)
+            if exact:
+                stats.spread_values.append(spreads[np.isfinite(spreads)])
+
+        if spec.bid_sizes and spec.ask_sizes:
+            bid_depth = sum(col(c) for c in spec.bid_sizes)
+            ask_depth = sum(col(c) for c in spec.ask_sizes)
+            total = bid_depth + ask_depth
+            with np.errstate(invalid="ignore", divide="ignore"):
+                imbalance = (bid_depth - ask_depth) / total
+            stats.bid_depth = Moments.from_array(bid_depth)
+            stats.ask_depth = Moments.from_array(ask_depth)
+            stats.imbalance = Moments.from_array(imbalance)
+        return stats
+
+    def _add_returns(self, returns: np.ndarray) -> None:
+        returns = returns[np.isfinite(returns)]
+        sq = returns * returns
+        self.returns = self.returns.merge(Moments.from_array(returns))
+        self.returns_lag = self.returns_lag.merge(LagSums.from_array(returns))
+        self.sq_returns = self.sq_returns.merge(Moments.from_array(sq))
+        self.sq_returns_lag = self.sq_returns_lag.merge(LagSums.from_array(sq))
+        self.return_sketch.update(returns)
+        if self.exact:
+            self.return_values.append(returns)
+
+    def merge(self, later: "ChunkStats") -> "ChunkStats":
+        """Fold in the chunk that immediately follows this one."""
+        if later.records == 0:
+            return self
+        if self.records == 0:
+            return later
+        # The return across the seam belongs to neither chunk on its own
+        self._add_returns(np.array([math.log(later.first_price / self.last_price) * 1e4]))
+        self.returns = self.returns.merge(later.returns)
+        self.returns_lag = self.returns_lag.merge(later.returns_lag)
+        self.sq_returns = self.sq_returns.merge(later.sq_returns)
+        self.sq_returns_lag = self.sq_returns_lag.merge(later.sq_returns_lag)
+        self.return_sketch.merge(later.return_sketch)
+        self.return_values.extend(later.return_values)
+
+        self.records += later.records
+        self.last_price = later.last_price
+        self.t_min = min(self.t_min, later.t_min)
+        self.t_max = max(self.t_max, later.t_max)
+        self.price = self.price.merge(later.price)
+        self.spread = self.spread.merge(later.spread)
+        self.bid_depth = self.bid_depth.merge(later.bid_depth)
+        self.ask_depth = self.ask_depth.merge(later.ask_depth)
+        self.imbalance = self.imbalance.merge(later.imbalance)
+        self.spread_sketch.merge(later.spread_sketch)
+        self.spread_values.extend(later.spread_values)
+        return self
+
+    def sample_interval(self) -> float:
+        """Mean seconds between records; 1.0 when there are no timestamps."""
+        if self.records < 2 or not math.isfinite(self.t_max - self.t_min):
+            return 1.0
+        return (self.t_max - self.t_min) / (self.records - 1)
+
+    def sorted_returns(self) -> np.ndarray:
+        return np.sort(np.concatenate(self.return_values)) if self.return_values else np.array([])
+
+    def sorted_spreads(self) -> np.ndarray:
+        return np.sort(np.concatenate(self.spread_values)) if self.spread_values else np.array([])
+
+    def median_return(self) -> float:
+        if self.exact:
+            return _median(self.sorted_returns())
+        return float(self.return_sketch.quantile(0.5)) if self.return_sketch.n else math.nan
+
+    def median_spread(self) -> float:
+        if self.exact:
+            return _median(self.sorted_spreads())
+        return float(self.spread_sketch.quantile(0.5)) if self.spread_sketch.n else math.nan
+
+    def metrics(self) -> Dict[str, float]:
+        """The rows of ``statistical_comparison.csv`` for this dataset."""
+        ret_std = self.returns.std()
+        periods = SECONDS_PER_YEAR / self.sample_interval()
+        return {
+            "returns_mean_bps": self.returns.mean,
+            "returns_std_bps": ret_std,
+            "returns_skewness": self.returns.skewness(),
+            "returns_kurtosis": self.returns.kurtosis(),
+            "returns_min_bps": self.returns.min,
+            "returns_max_bps": self.returns.max,
+            "returns_median_bps": self.median_return(),
+            "volatility_annual": ret_std / 1e4 * math.sqrt(periods) * 100,
+            "spread_mean_bps": self.spread.mean if self.spread.n else math.nan,
+            "spread_std_bps": self.spread.std(),
+            "spread_median_bps": self.median_spread(),
+            "spread_min_bps": self.spread.min if self.spread.n else math.nan,
+            "spread_max_bps": self.spread.max if self.spread.n else math.nan,
+            "bid_depth_5_mean": self.bid_depth.mean if self.bid_depth.n else math.nan,
+            "ask_depth_5_mean": self.ask_depth.mean if self.ask_depth.n else math.nan,
+            "imbalance_mean": self.imbalance.mean if self.imbalance.n else math.nan,
+            "imbalance_std": self.imbalance.std(),
+            "price_mean": self.price.mean,
+            "price_std": self.price.std(),
+            "price_range_pct": (self.price.max - self.price.min) / self.price.mean * 100,
+            "returns_acf_1": self.returns_lag.acf1(self.returns),
+            "sq_returns_acf_1": self.sq_returns_lag.acf1(self.sq_returns),
+        }
+
+
+def _median(sorted_values: np.ndarray) -> float:
+    return float(np.median(sorted_values)) if len(sorted_values) else math.nan
+
+
+def ks_2samp_exact(a: np.ndarray, b: np.ndarray) -> Tuple[float, float]:
+    """
+    Two-sample Kolmogorov-Smirnov test on sorted samples.
+
+    Returns:
+        ``(D, p_value)`` using the asymptotic Kolmogorov distribution with
+        the Stephens small-sample correction.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return math.nan, math.nan
+    grid = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, grid, side="right") / n
+    cdf_b = np.searchsorted(b, grid, side="right") / m
+    d = float(np.abs(cdf_a - cdf_b).max())
+    return d, kolmogorov_sf(d, n, m)
+
+
+def scan_row_group(task: Tuple[str, int, ColumnSpec, bool]) -> ChunkStats:
+    """Process-pool entry point: read one row group and summarize it."""
+    path, index, spec, exact = task
+    source = pa.memory_map(path, "r")
+    try:
+        table = pq.ParquetFile(source).read_row_group(index, columns=spec.columns())
+        return ChunkStats.from_table(table, spec, exact)
+    finally:
+        source.close()
+
+
+def scan_dataset(
+    path: Path, pool: Optional[ProcessPoolExecutor] = None, exact: bool = False
+) -> ChunkStats:
+    """Summarize every row group of ``path`` (in parallel when ``pool`` is given)."""
+    with pa.memory_map(str(path), "r") as source:
+        meta = pq.ParquetFile(source)
+        spec = ColumnSpec.from_schema(meta.schema_arrow.names)
+        tasks = [(str(path), i, spec, exact) for i in range(meta.num_row_groups)]
+
+    chunks = pool.map(scan_row_group, tasks) if pool else map(scan_row_group, tasks)
+    total = ChunkStats()
+    for chunk in chunks:
+        total = total.merge(chunk)
+    return total
+
+
+def _diff_pct(hist: float, syn: float) -> float:
+    if hist == 0:
+        return math.inf if syn != 0 else 0.0
+    # + 0.0 folds -0.0 into 0.0 for the CSV
+    return round((syn - hist) / abs(hist) * 100, 2) + 0.0
+
+
+def compare(
+    historical: ChunkStats, synthetic: ChunkStats, symbol: str, date: str
+) -> Tuple[Dict[str, Tuple[float, float, float]], Dict[str, object]]:
+    """
+    Build the comparison table and summary.
+
+    Returns:
+        ``(rows, summary)`` where ``rows`` maps metric name to
+        ``(historical, synthetic, diff_pct)``.
+    """
+    hist_metrics = historical.metrics()
+    syn_metrics = synthetic.metrics()
+    rows = {
+        name: (hist_metrics[name], syn_metrics[name], _diff_pct(hist_metrics[name], syn_metrics[name]))
+        for name in hist_metrics
+    }
+
+    if historical.exact and synthetic.exact:
+        _, ks_returns = ks_2samp_exact(historical.sorted_returns(), synthetic.sorted_returns())
+        _, ks_spreads = ks_2samp_exact(historical.sorted_spreads(), synthetic.sorted_spreads())
+    else:
+        _, ks_returns = ks_2samp_sketch(historical.return_sketch, synthetic.return_sketch)
+        _, ks_spreads = ks_2samp_sketch(historical.spread_sketch, synthetic.spread_sketch)
+    similarity = [
+        max(0.0, 100.0 - abs(rows[name][2])) if math.isfinite(rows[name][2]) else 0.0
+        for name in SIMILARITY_METRICS
+    ]
+    summary = {
+        "symbol": symbol,
+        "date": date,
+        "historical_records": historical.records,
+        "synthetic_records": synthetic.records,
+        "historical_volatility": hist_metrics["volatility_annual"],
+        "synthetic_volatility": syn_metrics["volatility_annual"],
+        "historical_spread_bps": hist_metrics["spread_mean_bps"],
+        "synthetic_spread_bps": syn_metrics["spread_mean_bps"],
+        "ks_test_returns_pvalue": ks_returns,
+        "ks_test_spreads_pvalue": ks_spreads,
+        "overall_similarity_pct": sum(similarity) / len(similarity),
+    }
+    return rows, summary
+
+
+def write_outputs(
+    rows: Dict[str, Tuple[float, float, float]],
+    summary: Dict[str, object],
+    output_dir: Path,
+    historical_label: str,
+    synthetic_label: str,
+) -> Tuple[Path, Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / "statistical_comparison.csv"
+    json_path = output_dir / "comparison_summary.json"
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["", historical_label, synthetic_label, "Diff %"])
+        for name, (hist, syn, diff) in rows.items():
+            writer.writerow([name, repr(hist), repr(syn), diff])
+    with open(json_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return csv_path, json_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetic vs historical comparison")
+    parser.add_argument("--historical", type=Path, required=True, help="Historical Parquet")
+    parser.add_argument("--synthetic", type=Path, required=True, help="Synthetic Parquet")
+    parser.add_argument("--symbol", default="BTC", help="Symbol (default: BTC)")
+    parser.add_argument("--date", default="", help="Date label, e.g. 20251201")
+    parser.add_argument("--historical-label", default="Historical (Hyperliquid)")
+    parser.add_argument("--synthetic-label", default="Synthetic (MCP)")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size (default: 4)")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=OUTPUT_DIR,
+        help="Where to write the CSV/JSON (default: current directory)",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Exact medians/KS by retaining returns and spreads (O(n) memory)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            historical = scan_dataset(args.historical, pool, args.exact)
+            synthetic = scan_dataset(args.synthetic, pool, args.exact)
+    else:
+        historical = scan_dataset(args.historical, exact=args.exact)
+        synthetic = scan_dataset(args.synthetic, exact=args.exact)
+
+    rows, summary = compare(historical, synthetic, args.symbol, args.date)
+    csv_path, json_path = write_outputs(
+        rows, summary, args.output_dir, args.historical_label, args.synthetic_label
+    )
+    print(f"Compared {historical.records:,} historical vs {synthetic.records:,} synthetic records")
+    print(f"Overall similarity: {summary['overall_similarity_pct']:.2f}%")
+    print(f"Saved {csv_path} and {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Streaming, resumable download of ``/mcp/caches/export/{key}`` Parquet files.
+
+The response is written to ``<output>.part`` in fixed-size chunks while a
+SHA-256 is updated incrementally, so memory stays constant whatever the file
+size. If the connection drops, the next attempt (or the next run) re-hashes
+the partial file from disk and asks for the remainder with an HTTP ``Range``
+request, guarded by ``If-Range`` so a changed export is never stitched onto
+an old prefix (a partial file with no saved ETag or Last-Modified to guard
+with is discarded and fetched again from the start). Finished files are checked from the Parquet footer alone
+(magic bytes, row count, schema) before being renamed into place, and a
+per-row-group Merkle manifest (``merkle_manifest.py``) is written next to
+them for later partial verification and dedupe.
+
+Usage:
+    export ALEATORIC_API_KEY="your-api-key"
+    python -m examples.export_download KEY [KEY ...] --output-dir examples/outputs
+    python -m examples.export_download KEY1 KEY2 KEY3 --parallel 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import httpx
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from examples.aleatoric_client import BASE_URL, AleatoricClient, MissingAPIKeyError
+from examples.merkle_manifest import build_manifest
+
+OUTPUT_DIR = Path(__file__).parent / "outputs"
+CHUNK_SIZE = 1 << 20
+RETRIES = 3
+PARQUET_MAGIC = b"PAR1"
+
+
+class ExportIntegrityError(ValueError):
+    """The downloaded file is not the complete, expected Parquet export."""
+
+
+@dataclass
+class ExportResult:
+    """A verified export on disk."""
+
+    path: Path
+    sha256: str
+    bytes: int
+    num_rows: int
+    num_row_groups: int
+    schema: pa.Schema
+    resumed: bool = False
+    merkle_root: Optional[str] = None
+
+
+def _part_paths(output_path: Path):
+    part = output_path.with_name(output_path.name + ".part")
+    return part, part.with_name(part.name + ".json")
+
+
+def _content_range(resp: httpx.Response):
+    """``(start, end, total)`` from ``Content-Range``; missing parts are ``None``."""
+    value = resp.headers.get("content-range", "")
+    match = re.match(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)", value)
+    if not match:
+        return None, None, None
+    return tuple(int(g) if g and g != "*" else None for g in match.groups())
+
+
+def _hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> "hashlib._Hash":
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest
+
+
+def verify_parquet(
+    path: Path,
+    expected_rows: Optional[int] = None,
+    expected_schema: Optional[pa.Schema] = None,
+) -> pq.FileMetaData:
+    """
+    Check a Parquet file's structure without reading any data pages.
+
+    Reads only the leading magic bytes and the footer; the row count and
+    schema come from the footer metadata.
+
+    Raises:
+        ExportIntegrityError: On a truncated or corrupt file, or when the row
+            count or schema differ from what was expected.
+    """
+    size = path.stat().st_size
+    if size < 12:
+        raise ExportIntegrityError(f"{path}: {size} bytes is too small for Parquet")
+    with open(path, "rb") as f:
+        head = f.read(4)
+        f.seek(-8, os.SEEK_END)
+        tail = f.read(8)
+    footer_len = int.from_bytes(tail[:4], "little")
+    if head != PARQUET_MAGIC or tail[4:] != PARQUET_MAGIC or footer_len + 12 > size:
+        raise ExportIntegrityError(f"{path}: missing Parquet magic or footer (truncated?)")
+
+    try:
+        metadata = pq.read_metadata(path)
+    except (pa.ArrowException, OSError) as exc:
+        raise ExportIntegrityError(f"{path}: unreadable Parquet footer: {exc}") from exc
+    if expected_rows is not None and metadata.num_rows != expected_rows:
+        raise ExportIntegrityError(
+            f"{path}: {metadata.num_rows} rows, expected {expected_rows}"
+        )
+    if expected_schema is not None:
+        schema = metadata.schema.to_arrow_schema()
+        if not schema.equals(expected_schema, check_metadata=False):
+            raise ExportIntegrityError(f"{path}: schema mismatch:\n{schema}")
+    return metadata
+
+
+def _resume_validator(meta_path: Path) -> Optional[str]:
+    """
+    The ``If-Range`` value saved for a partial file, or ``None`` if there is
+    none usable (no sidecar, or neither a strong ETag nor Last-Modified).
+    """
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict):
+        return None
+    etag = meta.get("etag")
+    if etag and not etag.startswith("W/"):  # If-Range needs a strong validator
+        return etag
+    return meta.get("last_modified")
+
+
+def download_export(
+    client: AleatoricClient,
+    cache_key: str,
+    output_path: Path,
+    expected_rows: Optional[int] = None,
+    expected_schema: Optional[pa.Schema] = None,
+    expected_sha256: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    retries: int = RETRIES,
+    write_manifest: bool = True,
+) -> ExportResult:
+    """
+    Stream one export to ``output_path``, resuming any earlier partial file.
+
+    Args:
+        client: API client (may be shared between threads).
+        cache_key: Cache key to export.
+        output_path: Final Parquet path; ``<output_path>.part`` while in flight.
+        expected_rows: Fail unless the footer reports this many rows.
+        expected_schema: Fail unless the footer schema matches.
+        expected_sha256: Fail unless the file hashes to this digest.
+        chunk_size: Bytes per write; bounds memory per download.
+        retries: Extra attempts after a transport error, each one resuming.
+        write_manifest: Hash row groups into ``<output>.merkle.json``.
+
+    Returns:
+        The verified ``ExportResult``.
+
+    Raises:
+        httpx.HTTPError: On an HTTP error status, or when retries run out.
+        ExportIntegrityError: If the completed file fails verification.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part, meta_path = _part_paths(output_path)
+    url = client.url(f"/mcp/caches/export/{cache_key}")
+    resumed = False
+
+    for attempt in range(retries + 1):
+        offset = part.stat().st_size if part.exists() else 0
+        validator = _resume_validator(meta_path) if offset else None
+        if offset and not validator:
+            # Without If-Range a changed export would be stitched onto the old prefix
+            part.unlink()
+            offset = 0
+        request_headers = dict(client.headers)
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            request_headers["If-Range"] = validator
+
+        try:
+            with client.http.stream("GET", url, headers=request_headers) as resp:
+                if resp.status_code == 416 and offset:
+                    if _content_range(resp)[2] == offset:
+                        # Nothing left to send; the part file is already complete
+                        digest = _hash_file(part, chunk_size)
+                        break
+                    part.unlink()
+                    continue
+                resp.raise_for_status()
+                if resp.status_code == 206:
+                    if _content_range(resp)[0] != offset:
+                        raise ExportIntegrityError(
+                            f"{cache_key}: server resumed at the wrong offset "
+                            f"({resp.headers.get('content-range')}, expected {offset})"
+                        )
+                    digest = _hash_file(part, chunk_size)
+                    mode = "ab"
+                    resumed = True
+                else:
+                    # Full body: first attempt, or the server ignored/refused the range
+                    digest = hashlib.sha256()
+                    mode = "wb"
+                meta_path.write_text(
+                    json.dumps(
+                        {
+                            "etag": resp.headers.get("etag"),
+                            "last_modified": resp.headers.get("last-modified"),
+                        }
+                    )
+                )
+                with open(part, mode) as f:
+                    for block in resp.iter_bytes(chunk_size):
+                        f.write(block)
+                        digest.update(block)
+            break
+        except httpx.TransportError as exc:
+            if attempt == retries:
+                raise
+            print(f"  {cache_key}: {exc}; resuming ({attempt + 1}/{retries})", file=sys.stderr)
+    else:
+        raise ExportIntegrityError(f"{cache_key}: incomplete after {retries + 1} attempts")
+
+    sha = digest.hexdigest()
+    if expected_sha256 and sha != expected_sha256.lower():
+        part.unlink()
+        raise ExportIntegrityError(f"{cache_key}: sha256 {sha}, expected {expected_sha256}")
+    metadata = verify_parquet(part, expected_rows, expected_schema)
+
+    os.replace(part, output_path)
+    meta_path.unlink(missing_ok=True)
+    merkle_root = build_manifest(output_path).root if write_manifest else None
+    return ExportResult(
+        path=output_path,
+        sha256=sha,
+        bytes=output_path.stat().st_size,
+        num_rows=metadata.num_rows,
+        num_row_groups=metadata.num_row_groups,
+        schema=metadata.schema.to_arrow_schema(),
+        resumed=resumed,
+        merkle_root=merkle_root,
+    )
+
+
+def download_exports(
+    client: AleatoricClient,
+    cache_keys: Sequence[str],
+    output_dir: Path = OUTPUT_DIR,
+    parallel: int = 4,
+) -> List[ExportResult]:
+    """
+    Download several exports concurrently, ``parallel`` at a time.
+
+    Each download streams in ``CHUNK_SIZE`` blocks, so memory is bounded by
+    ``parallel * CHUNK_SIZE`` regardless of file sizes. Results are returned
+    in the order of ``cache_keys``.
+    """
+
+    def fetch(key: str) -> ExportResult:
+        return download_export(client, key, output_dir / f"{key}.parquet")
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        return list(pool.map(fetch, cache_keys))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Download cached Parquet exports")
+    parser.add_argument("cache_keys", nargs="+", help="Cache key(s) to export")
+    parser.add_argument("--base-url", default=BASE_URL, help="MCP base URL")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help="Destination dir")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent downloads")
+    args = parser.parse_args(argv)
+
+    try:
+        client = AleatoricClient(
+            base_url=args.base_url,
+            timeout=httpx.Timeout(30, read=300),
+            max_connections=args.parallel,
+        )
+    except MissingAPIKeyError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    with client:
+        results = download_exports(client, args.cache_keys, args.output_dir, args.parallel)
+
+    for result in results:
+        note = " (resumed)" if result.resumed else ""
+        print(
+            f"{result.path}: {result.num_rows:,} rows in {result.num_row_groups} row groups, "
+            f"{result.bytes:,} bytes, sha256={result.sha256}, merkle={result.merkle_root}{note}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
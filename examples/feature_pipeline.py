@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Incremental microstructure features over generated Parquet, memoized.
+
+One columnar pass over each source row group derives the per-tick features
+every consumer otherwise recomputes: mid, spread (bps), top-N bid/ask depth,
+depth imbalance, log return, plus the oracle confidence ``ASQMaker`` needs
+and traded volume when present. OHLCV bars are aggregated from the same
+stream, carrying a partially filled bar across chunk boundaries.
+
+Features are memoized per file in ``<name>.features.parquet``, one row group
+per source row group. Its metadata records the feature version and column
+mapping (the cache key) and the source's Merkle leaf hashes
+(``merkle_manifest.py``). A rerun on an unchanged file streams the sidecar
+as-is; when the file is extended or rewritten, row groups whose leaf hash is
+already in the sidecar are copied across and only the new ones are
+computed. Chunks are computed independently: the log return across a chunk
+(or file) boundary is filled in while streaming, never stored.
+
+Usage:
+    python -m examples.feature_pipeline examples/outputs/market_data.parquet
+    python -m examples.feature_pipeline day1.parquet day2.parquet --depth 10 --bars 60 \\
+        --output examples/outputs/bars_1m.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from examples.compare_stats import PRICE_COLUMNS, SIZE_PATTERN, TIME_COLUMNS
+from examples.merkle_manifest import load_manifest
+from examples.replay_feed import CONF_COLUMNS, _to_numpy
+
+# Bump whenever a feature definition changes; old sidecars are then recomputed.
+FEATURE_VERSION = 1
+SIDECAR_SUFFIX = ".features.parquet"
+METADATA_KEY = b"aleatoric.features"
+VOLUME_COLUMNS = ("volume", "trade_size", "qty", "size")
+DEFAULT_DEPTH = 5
+
+
+@dataclass
+class FeatureSpec:
+    """Which source columns feed each feature (resolved from the schema)."""
+
+    price: Optional[str] = None
+    time: Optional[str] = None
+    bid: Optional[str] = None
+    ask: Optional[str] = None
+    spread_bps: Optional[str] = None
+    conf: Optional[str] = None
+    volume: Optional[str] = None
+    bid_sizes: List[str] = field(default_factory=list)
+    ask_sizes: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_schema(cls, names: Sequence[str], depth: int = DEFAULT_DEPTH) -> "FeatureSpec":
+        def pick(candidates):
+            return next((c for c in candidates if c in names), None)
+
+        sizes: Dict[str, List[Tuple[int, str]]] = {"bid": [], "ask": []}
+        for name in names:
+            match = SIZE_PATTERN.match(name)
+            if match:
+                sizes[match.group(1)].append((int(match.group(2)), name))
+        spec = cls(
+            price=pick(PRICE_COLUMNS),
+            time=pick(TIME_COLUMNS),
+            bid="bid" if "bid" in names else None,
+            ask="ask" if "ask" in names else None,
+            spread_bps="spread_bps" if "spread_bps" in names else None,
+            conf=pick(CONF_COLUMNS),
+            volume=pick(VOLUME_COLUMNS),
+            bid_sizes=[n for _, n in sorted(sizes["bid"])[:depth]],
+            ask_sizes=[n for _, n in sorted(sizes["ask"])[:depth]],
+        )
+        if spec.price is None and not (spec.bid and spec.ask):
+            raise ValueError(f"No price column found (tried {PRICE_COLUMNS} and bid/ask)")
+        return spec
+
+    def columns(self) -> List[str]:
+        cols = [self.price, self.time, self.bid, self.ask, self.spread_bps, self.conf, self.volume]
+        return [c for c in cols if c] + self.bid_sizes + self.ask_sizes
+
+    def cache_key(self) -> str:
+        """Identifies the feature definitions; part of every sidecar's metadata."""
+        payload = json.dumps({"version": FEATURE_VERSION, "spec": asdict(self)}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def compute_features(table: pa.Table, spec: FeatureSpec) -> pa.Table:
+    """
+    Per-tick features of one chunk.
+
+    ``log_return`` of the first row is NaN; it depends on the previous chunk
+    and is filled in by ``FeaturePipeline.chunks``.
+    """
+
+    def col(name):
+        return _to_numpy(table.column(name)).astype(np.float64, copy=False)
+
+    out: Dict[str, np.ndarray] = {}
+    if spec.time:
+        out["timestamp"] = col(spec.time)
+    if spec.bid and spec.ask:
+        bid, ask = col(spec.bid), col(spec.ask)
+        mid = (bid + ask) / 2.0
+    else:
+        bid = ask = None
+        mid = col(spec.price)
+    out["mid"] = mid
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if spec.spread_bps:
+            out["spread_bps"] = col(spec.spread_bps)
+        elif bid is not None:
+            out["spread_bps"] = (ask - bid) / mid * 1e4
+
+        if spec.bid_sizes and spec.ask_sizes:
+            bid_depth = sum(col(c) for c in spec.bid_sizes)
+            ask_depth = sum(col(c) for c in spec.ask_sizes)
+            out["bid_depth"] = bid_depth
+            out["ask_depth"] = ask_depth
+            out["imbalance"] = (bid_depth - ask_depth) / (bid_depth + ask_depth)
+
+        log_mid = np.log(mid)
+    returns = np.empty_like(mid)
+    returns[:1] = np.nan
+    np.subtract(log_mid[1:], log_mid[:-1], out=returns[1:])
+    out["log_return"] = returns
+
+    if spec.conf:
+        out["conf"] = col(spec.conf)
+    if spec.volume:
+        out["volume"] = col(spec.volume)
+    return pa.table(out)
+
+
+def sidecar_path(parquet_path: Path) -> Path:
+    """``data.parquet`` -> ``data.features.parquet`` in the same directory."""
+    parquet_path = Path(parquet_path)
+    return parquet_path.with_name(parquet_path.stem + SIDECAR_SUFFIX)
+
+
+def _read_sidecar(path: Path, key: str) -> Tuple[Optional[pq.ParquetFile], Dict[str, object]]:
+    """The sidecar and its metadata, or ``(None, {})`` if missing or for another key."""
+    if not path.exists():
+        return None, {}
+    try:
+        sidecar = pq.ParquetFile(path)
+        meta = json.loads((sidecar.schema_arrow.metadata or {})[METADATA_KEY])
+    except (pa.ArrowException, OSError, KeyError, ValueError):
+        return None, {}
+    if meta.get("key") != key:
+        return None, {}
+    return sidecar, meta
+
+
+@dataclass
+class PipelineStats:
+    chunks_computed: int = 0
+    chunks_reused: int = 0
+    rows: int = 0
+
+
+class FeaturePipeline:
+    """
+    Lazy feature stream over one or more Parquet files, treated as one
+    continuous dataset in the given order.
+
+    Args:
+        paths: Source Parquet files.
+        depth: Book levels summed into ``bid_depth``/``ask_depth``.
+        cache: Read and write ``<name>.features.parquet`` sidecars.
+    """
+
+    def __init__(self, paths: Sequence[Path], depth: int = DEFAULT_DEPTH, cache: bool = True):
+        self.paths = [Path(p) for p in paths]
+        self.depth = depth
+        self.cache = cache
+        self.stats = PipelineStats()
+
+    def _file_chunks(self, path: Path) -> Iterator[pa.Table]:
+        with pa.memory_map(str(path), "r") as source:
+            parquet = pq.ParquetFile(source)
+            spec = FeatureSpec.from_schema(parquet.schema_arrow.names, self.depth)
+
+            def compute(i: int) -> pa.Table:
+                self.stats.chunks_computed += 1
+                return compute_features(parquet.read_row_group(i, columns=spec.columns()), spec)
+
+            if not self.cache:
+                for i in range(parquet.num_row_groups):
+                    yield compute(i)
+                return
+
+            key = spec.cache_key()
+            leaves = [leaf.hash for leaf in load_manifest(path).leaves]
+            out_path = sidecar_path(path)
+            sidecar, meta = _read_sidecar(out_path, key)
+            if sidecar is not None and meta.get("leaves") == leaves:
+                for i in range(sidecar.num_row_groups):
+                    self.stats.chunks_reused += 1
+                    yield sidecar.read_row_group(i)
+                return
+
+            # Extended or changed: copy known chunks, compute the rest
+            known = {h: i for i, h in enumerate(meta.get("leaves", []))}
+            tmp = out_path.with_name(out_path.name + ".tmp")
+            writer = None
+            complete = False
+            try:
+                for i, leaf in enumerate(leaves):
+                    if leaf in known:
+                        self.stats.chunks_reused += 1
+                        chunk = sidecar.read_row_group(known[leaf])
+                    else:
+                        chunk = compute(i)
+                    if writer is None:
+                        metadata = {METADATA_KEY: json.dumps({"key": key, "leaves": leaves})}
+                        schema = chunk.schema.with_metadata(metadata)
+                        writer = pq.ParquetWriter(tmp, schema)
+                    writer.write_table(chunk.replace_schema_metadata(writer.schema.metadata))
+                    yield chunk
+                complete = writer is not None
+            finally:
+                if writer is not None:
+                    writer.close()
+                if complete:
+                    os.replace(tmp, out_path)
+                elif tmp.exists():
+                    tmp.unlink()  # Consumer stopped early; keep the old sidecar
+
+    def chunks(self) -> Iterator[pa.Table]:
+        """Feature tables in dataset order, one per source row group."""
+        prev_mid = math.nan
+        for path in self.paths:
+            for chunk in self._file_chunks(path):
+                if not chunk.num_rows:
+                    continue
+                mid = chunk.column("mid")
+                if math.isfinite(prev_mid):
+                    returns = _to_numpy(chunk.column("log_return")).copy()
+                    returns[0] = math.log(mid[0].as_py() / prev_mid)
+                    index = chunk.schema.get_field_index("log_return")
+                    chunk = chunk.set_column(index, "log_return", pa.array(returns))
+                prev_mid = mid[-1].as_py()
+                self.stats.rows += chunk.num_rows
+                yield chunk.replace_schema_metadata(None)
+
+    def table(self) -> pa.Table:
+        """All features in memory (use ``chunks`` to stream instead)."""
+        return pa.concat_tables(self.chunks())
+
+    def bars(self, interval: float) -> Iterator[pa.Table]:
+        """OHLCV bars of ``mid`` every ``interval`` seconds, streamed per chunk."""
+        return iter_bars(self.chunks(), interval)
+
+
+def _chunk_bars(chunk: pa.Table, interval: float) -> Dict[str, np.ndarray]:
+    ts = _to_numpy(chunk.column("timestamp"))
+    mid = _to_numpy(chunk.column("mid"))
+    if "volume" in chunk.column_names:
+        volume = np.nan_to_num(_to_numpy(chunk.column("volume")))
+    else:
+        volume = np.ones_like(mid)  # No traded volume: count ticks instead
+    bucket = np.floor(ts / interval) * interval
+    starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+    ends = np.append(starts[1:], len(mid))
+    return {
+        "timestamp": bucket[starts],
+        "open": mid[starts],
+        "high": np.maximum.reduceat(mid, starts),
+        "low": np.minimum.reduceat(mid, starts),
+        "close": mid[ends - 1],
+        "volume": np.add.reduceat(volume, starts),
+        "ticks": (ends - starts).astype(np.int64),
+    }
+
+
+def iter_bars(chunks: Iterable[pa.Table], interval: float) -> Iterator[pa.Table]:
+    """
+    Resample a feature stream into bars.
+
+    Each chunk's last bar is held back and merged with the next chunk's first
+    bar when both fall in the same interval, so bars never split at chunk
+    boundaries. Timestamps must be non-decreasing.
+    """
+    pending: Optional[Dict[str, np.ndarray]] = None
+    for chunk in chunks:
+        if "timestamp" not in chunk.column_names:
+            raise ValueError("Bars need a timestamp column in the source data")
+        bars = _chunk_bars(chunk, interval)
+        if pending is not None:
+            if bars["timestamp"][0] == pending["timestamp"][0]:
+                bars["open"][0] = pending["open"][0]
+                bars["high"][0] = max(bars["high"][0], pending["high"][0])
+                bars["low"][0] = min(bars["low"][0], pending["low"][0])
+                bars["volume"][0] += pending["volume"][0]
+                bars["ticks"][0] += pending["ticks"][0]
+            else:
+                yield pa.table(pending)
+        pending = {name: values[-1:] for name, values in bars.items()}
+        if len(bars["timestamp"]) > 1:
+            yield pa.table({name: values[:-1] for name, values in bars.items()})
+    if pending is not None:
+        yield pa.table(pending)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memoized microstructure features")
+    parser.add_argument("paths", nargs="+", type=Path, help="Parquet files, in time order")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="Depth levels per side")
+    parser.add_argument("--bars", type=float, help="Also build OHLCV bars every N seconds")
+    parser.add_argument("--output", type=Path, help="Write the bars here (with --bars)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and skip sidecars")
+    args = parser.parse_args(argv)
+
+    pipeline = FeaturePipeline(args.paths, args.depth, cache=not args.no_cache)
+    start = time.perf_counter()
+    if args.bars:
+        bars = pa.concat_tables(pipeline.bars(args.bars))
+        if args.output:
+            pq.write_table(bars, args.output)
+            print(f"Saved {bars.num_rows:,} bars to {args.output}")
+        else:
+            print(bars.slice(max(0, bars.num_rows - 5)).to_pandas().to_string(index=False))
+    else:
+        for _ in pipeline.chunks():
+            pass
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.stats
+    print(
+        f"{stats.rows:,} rows: {stats.chunks_computed} chunks computed, "
+        f"{stats.chunks_reused} reused from sidecars ({elapsed:.2f}s)"
+    )
+    if not args.no_cache:
+        for path in args.paths:
+            print(f"  {sidecar_path(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,25 +5,201 @@ Simulate funding rates across exchanges via Aleatoric MCP API.
 Demonstrates the `simulate_funding_regime` tool for calculating
 venue-specific funding rates, perp prices, and settlement logic.
 
+Sweep mode runs the whole venue x basis x position-size grid as one
+concurrent batch over a pooled async client, deduplicates identical
+requests, and collects the returned periods into NumPy arrays and a
+Parquet results table for building funding PnL surfaces.
+
 Usage:
     export ALEATORIC_API_KEY="your-api-key"
     python funding_simulation.py
     python funding_simulation.py --exchange binance --periods 24
+    python funding_simulation.py --sweep --basis-bps=-20,-5,0,5,20 --sizes 0.1,1,10
 """
 
 from __future__ import annotations
 
 import argparse
-import os
+import asyncio
 import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if __package__ in (None, ""):
+    # Support running as a script as well as `python -m examples.funding_simulation`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from examples.aleatoric_client import (  # noqa: E402
+    EXCHANGES,
+    AleatoricClient,
+    AsyncAleatoricClient,
+    MissingAPIKeyError,
+    funding_call,
+)
+
+DEFAULT_BASIS_BPS = "-20,-10,-5,0,5,10,20"
+DEFAULT_SIZES = "0.1,1,10"
+DEFAULT_CONCURRENCY = 16
+SWEEP_OUTPUT = Path(__file__).parent / "outputs" / "funding_surface.parquet"
+
+
+@dataclass
+class FundingSurface:
+    """
+    Sweep results on the grid ``exchanges x basis_bps x sizes x periods``.
+
+    ``funding_rate`` and ``pnl`` are NaN where a venue returned fewer periods
+    than requested or the call failed.
+    """
+
+    exchanges: List[str]
+    basis_bps: np.ndarray
+    sizes: np.ndarray
+    funding_rate: np.ndarray
+    pnl: np.ndarray
+    spot: float
+
+    def total_pnl(self) -> np.ndarray:
+        """Summed PnL per ``(exchange, basis, size)`` cell."""
+        return np.nansum(self.pnl, axis=-1)
+
+    def to_table(self) -> pa.Table:
+        """Long-format table: one row per grid cell and funding period."""
+        ex, bi, si, pi = np.indices(self.pnl.shape).reshape(4, -1)
+        basis = self.basis_bps[bi]
+        return pa.table(
+            {
+                "exchange": pa.array(np.asarray(self.exchanges, dtype=object)[ex]),
+                "spot_price": np.full(len(ex), self.spot),
+                "mark_price": self.spot * (1.0 + basis / 1e4),
+                "basis_bps": basis,
+                "position_size": self.sizes[si],
+                "period": pi + 1,
+                "funding_rate": self.funding_rate.ravel(),
+                "pnl": self.pnl.ravel(),
+            }
+        )
+
+
+async def sweep_funding(
+    client: AsyncAleatoricClient,
+    exchanges: Sequence[str],
+    basis_bps: Sequence[float],
+    sizes: Sequence[float],
+    spot: float,
+    periods: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> FundingSurface:
+    """
+    Run ``simulate_funding_regime`` over the full grid as one concurrent batch.
+
+    Grid cells that produce the same request (e.g. repeated basis values) are
+    sent only once; a failed request leaves its cells NaN.
+    """
+    basis = np.asarray(basis_bps, dtype=float)
+    size_arr = np.asarray(sizes, dtype=float)
+    cells = [
+        (i, j, k)
+        for i in range(len(exchanges))
+        for j in range(len(basis))
+        for k in range(len(size_arr))
+    ]
+    marks = spot * (1.0 + basis / 1e4)
+    calls = [
+        funding_call(exchanges[i], spot, float(marks[j]), float(size_arr[k]), periods)
+        for i, j, k in cells
+    ]
+
+    print(
+        f"Sweeping {len(cells)} grid cells ({len({c.key() for c in calls})} unique requests, "
+        f"{concurrency} concurrent)..."
+    )
+    results = await client.call_many(calls, concurrency, return_exceptions=True)
+
+    shape = (len(exchanges), len(basis), len(size_arr), periods)
+    funding_rate = np.full(shape, np.nan)
+    pnl = np.full(shape, np.nan)
+    failed = set()
+    for (i, j, k), result in zip(cells, results):
+        if isinstance(result, Exception):
+            if exchanges[i] not in failed:
+                print(f"  {exchanges[i]} failed: {result}", file=sys.stderr)
+                failed.add(exchanges[i])
+            continue
+        rows = [p.raw for p in result.periods[:periods]]
+        funding_rate[i, j, k, : len(rows)] = [p.get("funding_rate", np.nan) for p in rows]
+        pnl[i, j, k, : len(rows)] = [p.get("pnl", np.nan) for p in rows]
+
+    return FundingSurface(list(exchanges), basis, size_arr, funding_rate, pnl, spot)
+
+
+def _parse_floats(text: str) -> List[float]:
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+# Options taking a comma-separated list that may start with a negative number
+LIST_OPTIONS = ("--basis-bps", "--sizes")
+
 
-import httpx
+def _attach_list_values(argv: Sequence[str]) -> List[str]:
+    """
+    Rewrite ``--basis-bps -20,-5`` as ``--basis-bps=-20,-5``.
 
-BASE_URL = "https://mcp.aleatoric.systems"
-EXCHANGES = ["binance"]
+    argparse reads a separate value that starts with ``-`` and is not a plain
+    number as an unknown option, so both spellings are accepted this way.
+    """
+    out: List[str] = []
+    for arg in argv:
+        if out and out[-1] in LIST_OPTIONS and not arg.startswith("--"):
+            out[-1] = f"{out[-1]}={arg}"
+        else:
+            out.append(arg)
+    return out
 
 
-def main() -> int:
+async def _sweep(args: argparse.Namespace) -> FundingSurface:
+    async with AsyncAleatoricClient(max_connections=args.concurrency) as client:
+        return await sweep_funding(
+            client,
+            args.exchanges or EXCHANGES,
+            _parse_floats(args.basis_bps),
+            _parse_floats(args.sizes),
+            args.spot,
+            args.periods,
+            args.concurrency,
+        )
+
+
+def run_sweep(args: argparse.Namespace) -> int:
+    surface = asyncio.run(_sweep(args))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(surface.to_table(), args.output)
+
+    # nansum maps all-NaN cells to 0; mask them so failures never look "best"
+    totals = np.where(np.isnan(surface.pnl).all(axis=-1), -np.inf, surface.total_pnl())
+    print(f"Spot: ${args.spot:,.2f} | Periods: {args.periods}")
+    print("-" * 60)
+    for i, exchange in enumerate(surface.exchanges):
+        if not np.isfinite(totals[i]).any():
+            print(f"{exchange.upper():<12} no results")
+            continue
+        j, k = np.unravel_index(np.argmax(totals[i]), totals[i].shape)
+        print(
+            f"{exchange.upper():<12} best basis={surface.basis_bps[j]:+.1f}bps "
+            f"size={surface.sizes[k]:g} -> PnL=${totals[i, j, k]:+,.2f}"
+        )
+    print("-" * 60)
+    print(f"Saved {surface.pnl.size} period rows to {args.output}")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Simulate funding rates")
     parser.add_argument(
         "--exchange",
@@ -35,44 +211,58 @@ def main() -> int:
     parser.add_argument("--mark", type=float, default=50100.0, help="Mark price")
     parser.add_argument("--position", type=float, default=1.0, help="Position size")
     parser.add_argument("--periods", type=int, default=10, help="Funding periods")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--sweep", action="store_true", help="Run the venue x basis x size grid concurrently"
+    )
+    parser.add_argument(
+        "--exchanges",
+        nargs="+",
+        choices=EXCHANGES,
+        help="Sweep venues (default: all six)",
+    )
+    parser.add_argument(
+        "--basis-bps",
+        default=DEFAULT_BASIS_BPS,
+        help=f"Sweep mark/spot basis in bps, comma separated (default: {DEFAULT_BASIS_BPS})",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Sweep position sizes, comma separated (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Max in-flight sweep requests (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=SWEEP_OUTPUT, help="Sweep results Parquet"
+    )
+    args = parser.parse_args(_attach_list_values(sys.argv[1:] if argv is None else argv))
 
-    api_key = os.getenv("ALEATORIC_API_KEY")
-    if not api_key:
-        print("Error: Set ALEATORIC_API_KEY environment variable", file=sys.stderr)
+    try:
+        if args.sweep:
+            return run_sweep(args)
+        client = AleatoricClient()
+    except MissingAPIKeyError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
         return 1
 
-    headers = {"X-API-Key": api_key}
-
-    payload = {
-        "exchange": args.exchange,
-        "spot_price": args.spot,
-        "mark_price": args.mark,
-        "position_size": args.position,
-        "num_periods": args.periods,
-    }
-
-    with httpx.Client(timeout=30) as client:
-        resp = client.post(
-            f"{BASE_URL}/mcp/simulate_funding_regime",
-            json=payload,
-            headers=headers,
+    with client:
+        result = client.simulate_funding(
+            args.exchange, args.spot, args.mark, args.position, args.periods
         )
-        resp.raise_for_status()
-        result = resp.json()
 
     print(f"Exchange: {args.exchange.upper()}")
     print(f"Spot: ${args.spot:,.2f} | Mark: ${args.mark:,.2f}")
     print("-" * 60)
 
-    for i, period in enumerate(result.get("periods", []), 1):
-        rate = period.get("funding_rate", 0) * 100
-        pnl = period.get("pnl", 0)
-        print(f"Period {i:2d}: Rate={rate:+.4f}% | PnL=${pnl:+,.2f}")
+    for i, period in enumerate(result.periods, 1):
+        print(f"Period {i:2d}: Rate={period.funding_rate * 100:+.4f}% | PnL=${period.pnl:+,.2f}")
 
-    total_pnl = sum(p.get("pnl", 0) for p in result.get("periods", []))
     print("-" * 60)
-    print(f"Total PnL: ${total_pnl:+,.2f}")
+    print(f"Total PnL: ${result.total_pnl:+,.2f}")
 
     return 0
 
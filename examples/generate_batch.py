@@ -6,6 +6,8 @@ This script demonstrates the correct workflow for creating large historical data
 1. Define a SimulationManifest (config)
 2. Call POST /data/generate with duration_seconds
 3. Download the resulting Parquet file from the returned URL
+4. Sketch each chunk (KLL quantiles) and save ``<output>.sketch.json`` alongside
+5. Hash each row group (one per chunk) into a Merkle manifest, ``<output>.merkle.json``
 
 Usage:
     python generate_batch.py --symbol BTCUSDT --days 1 --output btc_1day.parquet
@@ -19,47 +21,38 @@ import time
 from pathlib import Path
 from typing import Optional, List
 
-import httpx
+if __package__ in (None, ""):
+    # Support `python examples/generate_batch.py` as well as `python -m examples.generate_batch`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from examples.aleatoric_client import BASE_URL, AsyncAleatoricClient
 
 # Default configuration
-MCP_BASE_URL = os.getenv("MCP_BASE_URL", "https://mcp.aleatoric.systems")
+MCP_BASE_URL = BASE_URL
 API_KEY = os.getenv("ALEATORIC_API_KEY")
 
 
 async def generate_chunk(
-    client: httpx.AsyncClient,
+    client: AsyncAleatoricClient,
     symbol: str,
     duration: int,
     seed: int,
     chunk_index: int,
-    base_url: str,
-    api_key: str,
 ) -> bytes:
     """Generate and download a single chunk."""
-    payload = {
-        "config": {
-            "symbol": symbol,
-            "seed": seed,
-        },
-        "duration_seconds": duration,
+    config = {
+        "symbol": symbol,
+        "seed": seed,
     }
-    headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
-    
+
     print(f"  [Chunk {chunk_index}] Requesting generation ({duration}s)...")
-    resp = await client.post(f"{base_url}/data/generate", headers=headers, json=payload, timeout=300.0)
-    resp.raise_for_status()
-    result = resp.json()
-    
-    download_url = result["download_url"]
-    if download_url.startswith("/"):
-        download_url = f"{base_url}{download_url}"
-        
+    result = await client.generate(config, duration)
+
     print(f"  [Chunk {chunk_index}] Downloading...")
-    dl_resp = await client.get(download_url, timeout=300.0)
-    dl_resp.raise_for_status()
-    
-    print(f"  [Chunk {chunk_index}] Complete ({len(dl_resp.content)} bytes)")
-    return dl_resp.content
+    content = await client.download(result.download_url)
+
+    print(f"  [Chunk {chunk_index}] Complete ({len(content)} bytes)")
+    return content
 
 
 async def generate_batch_parallel(
@@ -80,7 +73,8 @@ async def generate_batch_parallel(
     
     print(f"Generating {symbol} for {total_duration}s in {num_chunks} chunks (max {concurrency} parallel)...")
     
-    async with httpx.AsyncClient() as client:
+    # One pooled client: generation and download requests share connections
+    async with AsyncAleatoricClient(api_key, base_url, max_connections=concurrency) as client:
         tasks = []
         for i in range(num_chunks):
             chunk_duration = min(chunk_size, total_duration - (i * chunk_size))
@@ -91,7 +85,7 @@ async def generate_batch_parallel(
             chunk_seed = seed + i 
             
             tasks.append(
-                generate_chunk(client, symbol, chunk_duration, chunk_seed, i, base_url, api_key)
+                generate_chunk(client, symbol, chunk_duration, chunk_seed, i)
             )
             
         # Run with semaphore
@@ -104,19 +98,16 @@ async def generate_batch_parallel(
         results = await asyncio.gather(*(sem_task(t) for t in tasks))
         
     # Merge logic (simplified: sequential write or PyArrow)
-    # For this script, we'll try to use Pandas to merge if available, else save individual files
+    # For this script, we'll try to use PyArrow to merge if available, else save individual files
     try:
-        import pandas as pd
-        from io import BytesIO
-        
         print("Merging chunks...")
-        dfs = [pd.read_parquet(BytesIO(content)) for content in results]
-        full_df = pd.concat(dfs, ignore_index=True)
-        full_df.to_parquet(output_file)
-        print(f"Successfully saved merged file to {output_file} ({len(full_df)} rows)")
+        rows, sketch_path, manifest = merge_chunks(results, output_file)
+        print(f"Successfully saved merged file to {output_file} ({rows} rows)")
+        print(f"Saved quantile sketches to {sketch_path}")
+        print(f"Saved Merkle manifest (root {manifest.root[:16]}...) for {len(manifest.leaves)} row groups")
         
     except ImportError:
-        print("Pandas not found. Saving individual chunks.")
+        print("PyArrow/NumPy not found. Saving individual chunks.")
         base_path = Path(output_file).parent
         stem = Path(output_file).stem
         for i, content in enumerate(results):
@@ -125,6 +116,42 @@ async def generate_batch_parallel(
             print(f"Saved {out_path}")
 
 
+def merge_chunks(chunks: List[bytes], output_file: str):
+    """
+    Merge downloaded Parquet chunks into ``output_file`` with its sidecars.
+
+    Each chunk is written as exactly one row group, whatever its size, so
+    Merkle leaves line up with generation windows. Also writes the merged
+    quantile sketches (``.sketch.json``) and the Merkle manifest
+    (``.merkle.json``). Raises ImportError without pyarrow or numpy, which
+    are only imported here so that the rest of the script works without them.
+
+    Returns:
+        ``(rows, sketch_path, manifest)``.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from examples.merkle_manifest import build_manifest
+    from examples.quantile_sketch import SketchSet, save_sidecar
+
+    tables = [pq.read_table(pa.BufferReader(content)) for content in chunks]
+    schema = tables[0].schema
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for table in tables:
+            # One row group per generated chunk, so Merkle leaves line up with chunks
+            writer.write_table(table.cast(schema), row_group_size=max(table.num_rows, 1))
+
+    # Quantile sketches per chunk, merged in order, stored next to the Parquet
+    sketches = SketchSet()
+    for table in tables:
+        sketches.merge(SketchSet.from_table(table))
+    sketch_path = save_sidecar(sketches, Path(output_file))
+
+    rows = sum(table.num_rows for table in tables)
+    return rows, sketch_path, build_manifest(Path(output_file))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate synthetic market data batch")
     parser.add_argument("--symbol", type=str, default="BTCUSDT", help="Trading symbol")
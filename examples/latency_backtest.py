@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Latency-aware ASQ backtest on an event-time schedule.
+
+``asq_test.py`` quotes and fills in the same step as each price update.
+Here the exchange and the strategy are separated by latency: every exchange
+tick reaches ``ASQMaker`` after a feed delay, its requote reaches the
+exchange after an order delay and replaces the live ladder there, and
+acknowledgements and fill notices travel back after an ack delay. All of
+these are timestamped events in a ``TimerWheel`` (``event_scheduler.py``)
+at microsecond resolution, so quotes can be picked off by prices they have
+not seen yet, and a newer quote can overtake an older one in flight (the
+older one is then dropped on arrival).
+
+Each channel's latency distribution is configurable (``const``, ``uniform``,
+``exp``, ``normal``, ``lognormal``) and drawn from its own ``latency`` stream
+(``rng_streams.py``), so runs are reproducible and changing one channel
+leaves the others' draws untouched. Every run is compared against the same
+market with zero latency.
+
+Usage:
+    python -m examples.latency_backtest --steps 200000
+    python -m examples.latency_backtest --feed lognormal:1ms,0.5 --order uniform:2ms,6ms \\
+        --ack const:500us --dt 0.002
+    python -m examples.latency_backtest --parquet examples/outputs/market_data.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from examples.asq import ASQMaker, StratConfig
+from examples.asq_test import BASE_PRICE, INITIAL_CASH, SIGMA_BASE, generate_paths
+from examples.backtest_metrics import StreamingMetrics
+from examples.event_scheduler import LatencyModel, LatencySampler, TimerWheel
+from examples.rng_streams import FILL_BLOCK, stream
+
+# Event kinds on the wheel
+MARKET_DATA, QUOTE_ARRIVAL, ACK, FILL = range(4)
+
+TICK_SECONDS = 1e-6  # Wheel resolution
+DT_SECONDS = 0.005  # Exchange tick interval of the synthetic market
+SIM_STEPS = 100_000
+# Per exchange tick, a resting level fills with probability exp(-k * distance in bps)
+FILL_K_BPS = 0.05
+DEFAULT_LATENCY = {
+    "feed": "lognormal:1ms,0.5",
+    "order": "lognormal:2ms,0.5",
+    "ack": "lognormal:1ms,0.5",
+}
+CHANNELS = tuple(DEFAULT_LATENCY)
+
+
+@dataclass
+class LatencyProfile:
+    """Latency of each channel between strategy and exchange."""
+
+    feed: LatencyModel
+    order: LatencyModel
+    ack: LatencyModel
+
+    @classmethod
+    def parse(cls, feed: str, order: str, ack: str) -> "LatencyProfile":
+        return cls(LatencyModel.parse(feed), LatencyModel.parse(order), LatencyModel.parse(ack))
+
+    @classmethod
+    def zero(cls) -> "LatencyProfile":
+        return cls.parse("const:0", "const:0", "const:0")
+
+    def __str__(self) -> str:
+        return f"feed={self.feed} order={self.order} ack={self.ack}"
+
+
+@dataclass
+class LatencyResult:
+    """Outcome of one latency-aware run."""
+
+    metrics: StreamingMetrics
+    ticks: int = 0
+    events: int = 0
+    quotes_sent: int = 0
+    quotes_live: int = 0
+    quotes_overtaken: int = 0  # Arrived after a newer quote; dropped
+    fills: int = 0
+    crossed_fills: int = 0  # Filled because the market had moved through the quote
+    rtt_us: List[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        metrics = {key: float(values[0]) for key, values in self.metrics.summary().items()}
+        rtt = np.asarray(self.rtt_us)
+        return {
+            "Ret": metrics["Ret"],
+            "DD": metrics["DD"],
+            "Sharpe": metrics["Sharpe"],
+            "Fills": float(self.fills),
+            "Crossed %": 100.0 * self.crossed_fills / self.fills if self.fills else 0.0,
+            "Quotes sent": float(self.quotes_sent),
+            "Overtaken %": (
+                100.0 * self.quotes_overtaken / self.quotes_sent if self.quotes_sent else 0.0
+            ),
+            "RTT p50 (us)": float(np.median(rtt)) if len(rtt) else 0.0,
+            "RTT p99 (us)": float(np.quantile(rtt, 0.99)) if len(rtt) else 0.0,
+            "Events/s": self.events / self.elapsed if self.elapsed else 0.0,
+        }
+
+
+class _Uniforms:
+    """Fill uniforms from one stream, drawn ``FILL_BLOCK`` at a time."""
+
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+        self.block: List[float] = []
+        self.pos = 0
+
+    def __call__(self) -> float:
+        if self.pos == len(self.block):
+            self.block = self.rng.random(FILL_BLOCK).tolist()
+            self.pos = 0
+        value = self.block[self.pos]
+        self.pos += 1
+        return value
+
+
+def _ladder(quotes: Dict, side: str, sign: float) -> List[List[float]]:
+    """``[[price, size], ...]`` for one side of ``ASQMaker.get_quotes()``."""
+    ref = quotes["oracle_price"]
+    return [
+        [ref * (1.0 + sign * level["offset_bps"] / 1e4), level["size"]]
+        for level in quotes[side]
+    ]
+
+
+def run_latency_backtest(
+    prices: np.ndarray,
+    confs: np.ndarray,
+    timestamps: np.ndarray,
+    latency: LatencyProfile,
+    seed: int = 42,
+    path: int = 0,
+    config: Optional[StratConfig] = None,
+    symbol: str = "SOL-PERP",
+    requote_every: int = 1,
+    fill_k_bps: float = FILL_K_BPS,
+) -> LatencyResult:
+    """
+    Replay one price path through ``ASQMaker`` with latency on every hop.
+
+    Within an exchange tick, events due by its time fire first (market data,
+    quote arrivals, acks, fill notices), so with zero latency a quote made
+    from tick ``i`` is live for tick ``i``'s fills as in ``asq_test.py``.
+    Resting levels then fill against the exchange price, are removed once
+    filled, and the fill notice is scheduled back to the strategy, whose
+    inventory only changes when the notice arrives.
+
+    Args:
+        prices, confs: Oracle price and confidence per exchange tick.
+        timestamps: Exchange tick times in seconds (non-decreasing).
+        latency: Per-channel latency models.
+        seed, path: Select the latency and fill streams.
+        config: ``ASQMaker`` parameters (defaults to ``StratConfig()``).
+        symbol: Label for the maker.
+        requote_every: Requote on every n-th market data arrival.
+        fill_k_bps: Fill intensity decay per bps of distance from the price.
+    """
+    start = time.perf_counter()
+    maker = ASQMaker(symbol, config or StratConfig())
+    # One warning per breaker transition would flood the console
+    maker.logger.setLevel(logging.ERROR)
+    annualization = float(np.sqrt(365 * 24 * 3600 / max(np.diff(timestamps).mean(), 1e-9)))
+    result = LatencyResult(StreamingMetrics(1, INITIAL_CASH, annualization))
+
+    feed, order, ack = (
+        LatencySampler(getattr(latency, channel), stream(seed, path, "latency", channel))
+        for channel in CHANNELS
+    )
+    uniform = _Uniforms(stream(seed, path, "fills", "latency"))
+    ticks = np.rint((timestamps - timestamps[0]) / TICK_SECONDS).astype(np.int64).tolist()
+    price_list, conf_list, ts_list = prices.tolist(), confs.tolist(), timestamps.tolist()
+
+    wheel = TimerWheel()
+    schedule = wheel.schedule
+    cash, inventory = INITIAL_CASH, 0.0  # At the exchange
+    known_inventory = 0.0  # As the strategy has been told
+    live_id, bids, asks = -1, [], []
+    pending = {}  # Quote id -> (bids, asks) in flight
+    feed_clock = 0  # Market data is delivered in order
+    arrivals = 0
+    navs = np.empty(FILL_BLOCK)
+    inventories = np.empty(FILL_BLOCK)
+    buys = sells = 0
+    col = 0
+
+    for i, now in enumerate(ticks):
+        price = price_list[i]
+        feed_clock = max(feed_clock, now + feed())
+        schedule(feed_clock, MARKET_DATA, i)
+
+        for when, kind, a, b in wheel.pop_until(now):
+            result.events += 1
+            if kind == MARKET_DATA:
+                maker.on_tick(price_list[a], conf_list[a], ts_list[a], known_inventory)
+                arrivals += 1
+                if arrivals % requote_every:
+                    continue
+                quotes = maker.get_quotes()
+                if quotes["status"] != "ACTIVE":
+                    continue
+                result.quotes_sent += 1
+                pending[result.quotes_sent] = (
+                    _ladder(quotes, "bids", -1.0),
+                    _ladder(quotes, "asks", 1.0),
+                )
+                schedule(when + order(), QUOTE_ARRIVAL, result.quotes_sent, float(when))
+            elif kind == QUOTE_ARRIVAL:
+                ladders = pending.pop(a)
+                if a < live_id:
+                    result.quotes_overtaken += 1
+                    continue
+                live_id, (bids, asks) = a, ladders
+                result.quotes_live += 1
+                schedule(when + ack(), ACK, a, b)
+            elif kind == ACK:
+                result.rtt_us.append(when - b)
+            else:  # FILL notice
+                known_inventory += b
+
+        # Exchange: resting levels fill against the current price
+        for levels, sign in ((bids, 1.0), (asks, -1.0)):
+            for level in levels:
+                level_price, size = level
+                if not size:
+                    continue
+                distance = sign * (price - level_price) / price * 1e4
+                if distance > 0.0 and uniform() >= math.exp(-fill_k_bps * distance):
+                    continue
+                cash -= sign * level_price * size
+                inventory += sign * size
+                level[1] = 0.0
+                result.fills += 1
+                result.crossed_fills += distance <= 0.0
+                if sign > 0:
+                    buys += 1
+                else:
+                    sells += 1
+                schedule(now + ack(), FILL, 0, sign * size)
+
+        navs[col] = cash + inventory * price
+        inventories[col] = inventory
+        col += 1
+        if col == FILL_BLOCK:
+            result.metrics.update_block(navs, inventories, buys=buys, sells=sells)
+            col = buys = sells = 0
+
+    result.metrics.update_block(navs[:col], inventories[:col], buys=buys, sells=sells)
+    result.ticks = len(ticks)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def load_parquet(paths: Sequence[str]):
+    """``(prices, confs, timestamps)`` from generated Parquet via ``replay_feed``."""
+    from examples.replay_feed import ParquetReplayFeed
+
+    batches = list(ParquetReplayFeed(paths))
+    return tuple(
+        np.concatenate([getattr(batch, name) for batch in batches])
+        for name in ("prices", "confs", "timestamps")
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency-aware ASQ backtest")
+    parser.add_argument("--steps", type=int, default=SIM_STEPS, help="Synthetic exchange ticks")
+    parser.add_argument("--dt", type=float, default=DT_SECONDS, help="Seconds between ticks")
+    parser.add_argument("--parquet", nargs="+", help="Replay these files instead")
+    parser.add_argument("--seed", type=int, default=42, help="Seed (default: 42)")
+    for channel, default in DEFAULT_LATENCY.items():
+        parser.add_argument(f"--{channel}", default=default, help=f"{channel} latency ({default})")
+    parser.add_argument("--requote-every", type=int, default=1, help="Requote every n-th update")
+    parser.add_argument("--fill-k", type=float, default=FILL_K_BPS, help="Fill decay per bps")
+    args = parser.parse_args(argv)
+
+    if args.parquet:
+        prices, confs, timestamps = load_parquet(args.parquet)
+    else:
+        prices, confs = generate_paths(
+            args.seed, [0], args.steps, args.dt, BASE_PRICE, SIGMA_BASE
+        )
+        prices, confs = prices[0], confs[0]
+        timestamps = np.arange(len(prices)) * args.dt
+
+    profile = LatencyProfile.parse(args.feed, args.order, args.ack)
+    print(f"Exchange ticks: {len(prices):,}; latency {profile}")
+    runs = {}
+    for label, latency in (("Zero latency", LatencyProfile.zero()), ("With latency", profile)):
+        runs[label] = run_latency_backtest(
+            prices,
+            confs,
+            timestamps,
+            latency,
+            args.seed,
+            requote_every=args.requote_every,
+            fill_k_bps=args.fill_k,
+        ).summary()
+
+    print("\n" + "=" * 52)
+    print(f"{'METRIC':<16} | {'ZERO LATENCY':>15} | {'WITH LATENCY':>15}")
+    print("=" * 52)
+    for key in runs["Zero latency"]:
+        zero, lagged = runs["Zero latency"][key], runs["With latency"][key]
+        print(f"{key:<16} | {zero:>15,.2f} | {lagged:>15,.2f}")
+    print("=" * 52)
+    cost = runs["Zero latency"]["Ret"] - runs["With latency"]["Ret"]
+    print(f"\nLatency cost: ${cost:,.2f} of return")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
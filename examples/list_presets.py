@@ -9,64 +9,67 @@ Usage:
     export ALEATORIC_API_KEY="your-api-key"
     python list_presets.py
     python list_presets.py --venue hyperliquid
+    python list_presets.py --venue binance okx   # fetched concurrently
+    python list_presets.py --all-venues
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-import os
 import sys
+from pathlib import Path
 
-import httpx
+if __package__ in (None, ""):
+    # Support `python examples/list_presets.py` as well as `python -m examples.list_presets`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-BASE_URL = "https://mcp.aleatoric.systems"
-EXCHANGES = ["binance", "hyperliquid", "okx", "bybit", "cme", "sgx"]
+from examples.aleatoric_client import EXCHANGES, AleatoricClient, MissingAPIKeyError  # noqa: E402
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Explore presets and venues")
     parser.add_argument("--presets", action="store_true", help="List presets only")
-    parser.add_argument("--venue", choices=EXCHANGES, help="Get specific venue details")
+    parser.add_argument(
+        "--venue", nargs="+", choices=EXCHANGES, help="Get specific venue details"
+    )
+    parser.add_argument(
+        "--all-venues", action="store_true", help="Get details for all six venues"
+    )
     parser.add_argument("--manifest", action="store_true", help="Show MCP manifest")
     args = parser.parse_args()
 
-    api_key = os.getenv("ALEATORIC_API_KEY")
-    if not api_key:
-        print("Error: Set ALEATORIC_API_KEY environment variable", file=sys.stderr)
+    try:
+        client = AleatoricClient()
+    except MissingAPIKeyError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
         return 1
 
-    headers = {"X-API-Key": api_key}
-
-    with httpx.Client(timeout=30) as client:
+    with client:
         if args.manifest:
-            resp = client.get(f"{BASE_URL}/mcp/manifest", headers=headers)
-            resp.raise_for_status()
-            manifest = resp.json()
-            print(f"Server: {manifest['server']['name']} v{manifest['server']['version']}")
-            print(f"\nTools ({len(manifest['capabilities']['tools'])}):")
-            for name, info in manifest["capabilities"]["tools"].items():
+            manifest = client.manifest()
+            print(f"Server: {manifest.name} v{manifest.version}")
+            print(f"\nTools ({len(manifest.tools)}):")
+            for name, info in manifest.tools.items():
                 print(f"  - {name}: {info['description'][:50]}...")
             return 0
 
-        if args.venue:
-            resp = client.get(f"{BASE_URL}/mcp/venues/{args.venue}", headers=headers)
-            resp.raise_for_status()
-            print(json.dumps(resp.json(), indent=2))
+        if args.venue or args.all_venues:
+            venues = client.venues(EXCHANGES if args.all_venues else args.venue)
+            if len(venues) == 1:
+                print(json.dumps(next(iter(venues.values())).raw, indent=2))
+            else:
+                print(json.dumps({name: v.raw for name, v in venues.items()}, indent=2))
             return 0
 
         # Default: show presets
-        resp = client.get(f"{BASE_URL}/mcp/presets", headers=headers)
-        resp.raise_for_status()
-        presets = resp.json()
-
         print("Available Presets:")
         print("-" * 50)
-        for preset in presets.get("presets", []):
-            print(f"\n  {preset['name']}")
-            print(f"    Exchange: {preset.get('exchange', 'N/A')}")
-            print(f"    Type: {preset.get('type', 'N/A')}")
-            print(f"    {preset.get('description', '')}")
+        for preset in client.presets():
+            print(f"\n  {preset.name}")
+            print(f"    Exchange: {preset.exchange or 'N/A'}")
+            print(f"    Type: {preset.type or 'N/A'}")
+            print(f"    {preset.description}")
 
     return 0
 
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Offline SimulationManifest validation and canonical config hashing.
+
+The JSON Schema from ``/mcp/config/schema`` is fetched once, cached on disk
+under its version, and compiled into a tree of small Python closures, so a
+config is checked without walking the schema dict each time. The canonical
+hash is SHA-256 over the config (schema defaults applied) serialized as
+compact JSON with sorted keys. It is cross-checked against
+``/mcp/config/validate`` once per schema version; if the server disagrees,
+callers should fall back to the server hash.
+
+The compiler covers the JSON Schema subset Pydantic emits (``type``,
+``properties``, ``required``, ``additionalProperties``, ``enum``, ``const``,
+numeric and length bounds, ``pattern``, ``items``, ``$ref``, ``anyOf``,
+``oneOf``, ``allOf``). Other keywords are ignored; the server remains the
+authority on anything the local check accepts.
+
+Usage:
+    export ALEATORIC_API_KEY="your-api-key"
+    python -m examples.manifest_validator configs.jsonl
+    python -m examples.manifest_validator configs.jsonl --offline
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from examples.aleatoric_client import (
+    BASE_URL,
+    SCHEMA_PATH,
+    AleatoricClient,
+    MissingAPIKeyError,
+)
+
+CACHE_DIR = Path(
+    os.getenv("ALEATORIC_CACHE_DIR", Path.home() / ".cache" / "aleatoric")
+) / "schema"
+
+# Known-good config for the one-off hash cross-check; the server must accept it
+# for its hash to say anything about ours
+PROBE_CONFIG: Dict[str, Any] = {"symbol": "BTC", "seed": 42}
+
+# A check appends "path: message" strings to the error list it is given.
+Check = Callable[[Any, str, List[str]], None]
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "integer": lambda v: (
+        isinstance(v, int) and not isinstance(v, bool)
+        or isinstance(v, float) and v.is_integer()
+    ),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+
+def canonical_json(config: Dict[str, Any]) -> str:
+    """Compact JSON with sorted keys; the input to the canonical hash."""
+    return json.dumps(config, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def schema_version(schema: Dict[str, Any]) -> str:
+    """Declared schema version, else a content hash of the schema itself."""
+    for key in ("version", "$id"):
+        if isinstance(schema.get(key), str) and schema[key]:
+            return re.sub(r"[^A-Za-z0-9._-]", "_", schema[key])
+    return hashlib.sha256(canonical_json(schema).encode()).hexdigest()[:16]
+
+
+class SchemaCompiler:
+    """Compile a JSON Schema dict into a single ``Check`` closure."""
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self._refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Any = None) -> Check:
+        schema = self.root if schema is None else schema
+        if schema is True or schema == {}:
+            return _accept
+        if schema is False:
+            return _reject
+
+        checks: List[Check] = []
+        if "$ref" in schema:
+            checks.append(self._ref(schema["$ref"]))
+        if "type" in schema:
+            checks.append(_type_check(schema["type"]))
+        if "enum" in schema:
+            checks.append(_enum_check(schema["enum"]))
+        if "const" in schema:
+            checks.append(_enum_check([schema["const"]]))
+        checks += _number_checks(schema)
+        checks += _string_checks(schema)
+        if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+            checks.append(self._object_check(schema))
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            checks.append(self._array_check(schema))
+        for branch in schema.get("allOf", []):
+            checks.append(self.compile(branch))
+        for key, exactly_one in (("anyOf", False), ("oneOf", True)):
+            if key in schema:
+                branches = [self.compile(s) for s in schema[key]]
+                checks.append(self._any_of(branches, exactly_one))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+
+        return check_all
+
+    def _ref(self, ref: str) -> Check:
+        if ref in self._refs:
+            return self._refs[ref]
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $ref is supported, got {ref!r}")
+
+        # Register a forwarder first so recursive definitions terminate
+        slot: List[Check] = []
+        self._refs[ref] = lambda value, path, errors: slot[0](value, path, errors)
+        target: Any = self.root
+        for part in ref[2:].split("/"):
+            target = target[part.replace("~1", "/").replace("~0", "~")]
+        slot.append(self.compile(target))
+        return self._refs[ref]
+
+    def _object_check(self, schema: Dict[str, Any]) -> Check:
+        props = {name: self.compile(s) for name, s in schema.get("properties", {}).items()}
+        required = list(schema.get("required", []))
+        extra = schema.get("additionalProperties", True)
+        extra_check = None if extra is True else self.compile(extra)
+
+        def check(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path or '$'}: missing required property '{name}'")
+            for name, item in value.items():
+                sub = props.get(name)
+                if sub is not None:
+                    sub(item, f"{path}.{name}" if path else name, errors)
+                elif extra_check is not None:
+                    if extra is False:
+                        errors.append(f"{path or '$'}: unexpected property '{name}'")
+                    else:
+                        extra_check(item, f"{path}.{name}" if path else name, errors)
+
+        return check
+
+    def _array_check(self, schema: Dict[str, Any]) -> Check:
+        item_check = self.compile(schema["items"]) if "items" in schema else None
+        lo = schema.get("minItems")
+        hi = schema.get("maxItems")
+
+        def check(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if lo is not None and len(value) < lo:
+                errors.append(f"{path}: expected at least {lo} items")
+            if hi is not None and len(value) > hi:
+                errors.append(f"{path}: expected at most {hi} items")
+            if item_check is not None:
+                for i, item in enumerate(value):
+                    item_check(item, f"{path}[{i}]", errors)
+
+        return check
+
+    @staticmethod
+    def _any_of(branches: List[Check], exactly_one: bool) -> Check:
+        def check(value, path, errors):
+            passed = 0
+            for branch in branches:
+                branch_errors: List[str] = []
+                branch(value, path, branch_errors)
+                if not branch_errors:
+                    passed += 1
+                    if not exactly_one:
+                        return
+            if passed == 0:
+                errors.append(f"{path}: does not match any allowed schema")
+            elif exactly_one and passed > 1:
+                errors.append(f"{path}: matches {passed} schemas, expected exactly one")
+
+        return check
+
+
+# Fills schema defaults into a value, returning a new value
+Fill = Callable[[Any], Any]
+
+
+class DefaultsCompiler:
+    """
+    Compile the ``default``s of a JSON Schema into a ``Fill`` closure.
+
+    Defaults are applied at every level: nested objects (inline, behind
+    ``$ref``, merged through ``allOf`` or the one object branch of an
+    ``anyOf``/``oneOf``) and array items get theirs too, including inside a
+    default that is itself an object.
+    """
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self._refs: Dict[str, Optional[Fill]] = {}
+
+    def compile(self, schema: Any = None) -> Optional[Fill]:
+        """The fill for ``schema``, or ``None`` if it sets no defaults."""
+        schema = self.root if schema is None else schema
+        if not isinstance(schema, dict):
+            return None
+
+        fills = [self._object_fill(schema), self._array_fill(schema)]
+        fills.append(self._ref(schema["$ref"]) if "$ref" in schema else None)
+        fills += [self.compile(branch) for branch in schema.get("allOf", [])]
+        for key in ("anyOf", "oneOf"):
+            # Only an unambiguous alternative, e.g. Optional[Model] next to null
+            branches = [self.compile(branch) for branch in schema.get(key, [])]
+            branches = [fill for fill in branches if fill is not None]
+            if len(branches) == 1:
+                fills += branches
+        fills = [fill for fill in fills if fill is not None]
+
+        if len(fills) <= 1:
+            return fills[0] if fills else None
+
+        def fill_all(value):
+            for fill in fills:
+                value = fill(value)
+            return value
+
+        return fill_all
+
+    def _ref(self, ref: str) -> Optional[Fill]:
+        if ref in self._refs:
+            return self._refs[ref]
+        if not ref.startswith("#/"):
+            raise ValueError(f"Only local $ref is supported, got {ref!r}")
+
+        # Register a forwarder first so recursive definitions terminate
+        slot: List[Optional[Fill]] = []
+        self._refs[ref] = lambda value: slot[0](value) if slot[0] else value
+        target: Any = self.root
+        for part in ref[2:].split("/"):
+            target = target[part.replace("~1", "/").replace("~0", "~")]
+        slot.append(self.compile(target))
+        self._refs[ref] = slot[0]
+        return slot[0]
+
+    def _object_fill(self, schema: Dict[str, Any]) -> Optional[Fill]:
+        defaults: Dict[str, Any] = {}
+        nested: Dict[str, Fill] = {}
+        for name, prop in schema.get("properties", {}).items():
+            if isinstance(prop, dict) and "default" in prop:
+                defaults[name] = prop["default"]
+            sub = self.compile(prop)
+            if sub is not None:
+                nested[name] = sub
+        if not defaults and not nested:
+            return None
+
+        def fill(value):
+            if not isinstance(value, dict):
+                return value
+            out = {**defaults, **value}
+            for name, sub in nested.items():
+                if name in out:
+                    out[name] = sub(out[name])
+            return out
+
+        return fill
+
+    def _array_fill(self, schema: Dict[str, Any]) -> Optional[Fill]:
+        item_fill = self.compile(schema["items"]) if "items" in schema else None
+        if item_fill is None:
+            return None
+
+        def fill(value):
+            return [item_fill(item) for item in value] if isinstance(value, list) else value
+
+        return fill
+
+
+def _accept(value, path, errors):
+    return None
+
+
+def _reject(value, path, errors):
+    errors.append(f"{path}: not allowed")
+
+
+def _type_check(types: Any) -> Check:
+    names = [types] if isinstance(types, str) else list(types)
+    tests = [_TYPES[n] for n in names if n in _TYPES]
+    label = " | ".join(names)
+
+    def check(value, path, errors):
+        if not any(test(value) for test in tests):
+            errors.append(f"{path}: expected {label}, got {type(value).__name__}")
+
+    return check
+
+
+def _enum_check(allowed: List[Any]) -> Check:
+    def check(value, path, errors):
+        # 1 == True in Python, so compare with the bool/number distinction kept
+        if not any(
+            value == a and (type(value) is bool) == (type(a) is bool) for a in allowed
+        ):
+            errors.append(f"{path}: {value!r} not in {allowed!r}")
+
+    return check
+
+
+def _number_checks(schema: Dict[str, Any]) -> List[Check]:
+    bounds = [
+        ("minimum", lambda v, b: v >= b, ">="),
+        ("maximum", lambda v, b: v <= b, "<="),
+        ("exclusiveMinimum", lambda v, b: v > b, ">"),
+        ("exclusiveMaximum", lambda v, b: v < b, "<"),
+    ]
+    checks: List[Check] = []
+    for key, test, op in bounds:
+        if isinstance(schema.get(key), (int, float)) and not isinstance(schema[key], bool):
+            checks.append(_bound_check(schema[key], test, op))
+    return checks
+
+
+def _bound_check(bound: float, test: Callable[[float, float], bool], op: str) -> Check:
+    def check(value, path, errors):
+        if _TYPES["number"](value) and not test(value, bound):
+            errors.append(f"{path}: {value!r} is not {op} {bound!r}")
+
+    return check
+
+
+def _string_checks(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    lo = schema.get("minLength")
+    hi = schema.get("maxLength")
+    if lo is not None or hi is not None:
+
+        def length(value, path, errors):
+            if isinstance(value, str):
+                if lo is not None and len(value) < lo:
+                    errors.append(f"{path}: shorter than {lo} characters")
+                if hi is not None and len(value) > hi:
+                    errors.append(f"{path}: longer than {hi} characters")
+
+        checks.append(length)
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+
+        def pattern(value, path, errors):
+            if isinstance(value, str) and not regex.search(value):
+                errors.append(f"{path}: does not match /{regex.pattern}/")
+
+        checks.append(pattern)
+    return checks
+
+
+class ManifestValidator:
+    """
+    Compiled validator and canonical hasher for one schema version.
+
+    Args:
+        schema: SimulationManifest JSON Schema.
+        hash_verified: Whether ``hash`` was confirmed against the server for
+            this schema version (``None`` if not checked yet).
+    """
+
+    def __init__(self, schema: Dict[str, Any], hash_verified: Optional[bool] = None):
+        self.schema = schema
+        self.version = schema_version(schema)
+        self.hash_verified = hash_verified
+        self._check = SchemaCompiler(schema).compile()
+        self._fill = DefaultsCompiler(schema).compile() or (lambda value: value)
+
+    def errors(self, config: Any) -> List[str]:
+        """All schema violations in ``config`` (empty if valid)."""
+        errors: List[str] = []
+        self._check(config, "", errors)
+        return errors
+
+    def normalize(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """``config`` with schema defaults filled in at every level."""
+        return self._fill(config)
+
+    def hash(self, config: Dict[str, Any]) -> str:
+        """Canonical SHA-256 hex digest of the normalized config."""
+        return hashlib.sha256(canonical_json(self.normalize(config)).encode()).hexdigest()
+
+    def validate(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Local equivalent of ``/mcp/config/validate``'s response."""
+        errors = self.errors(config)
+        if errors:
+            return {"valid": False, "errors": errors}
+        return {"valid": True, "hash": self.hash(config), "config": self.normalize(config)}
+
+    def validate_many(self, configs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.validate(config) for config in configs]
+
+    def matches_server_hash(self, config: Dict[str, Any], server_hash: Optional[str]) -> bool:
+        """True if the server's hash equals (or is a prefix of) the local one."""
+        if not server_hash:
+            return False
+        return self.hash(config).startswith(str(server_hash).lower())
+
+
+def _cache_paths(cache_dir: Path) -> Tuple[Path, Path]:
+    return cache_dir / "latest.json", cache_dir / "versions"
+
+
+def _read_cached(cache_dir: Path) -> Optional[Dict[str, Any]]:
+    latest, versions = _cache_paths(cache_dir)
+    try:
+        meta = json.loads(latest.read_text())
+        meta["schema"] = json.loads((versions / f"{meta['version']}.json").read_text())
+        return meta
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cached(cache_dir: Path, meta: Dict[str, Any]) -> None:
+    latest, versions = _cache_paths(cache_dir)
+    versions.mkdir(parents=True, exist_ok=True)
+    schema_file = versions / f"{meta['version']}.json"
+    if not schema_file.exists():
+        schema_file.write_text(json.dumps(meta["schema"], indent=2))
+    latest.write_text(json.dumps({k: v for k, v in meta.items() if k != "schema"}, indent=2))
+
+
+def load_validator(
+    client: Optional[AleatoricClient],
+    cache_dir: Path = CACHE_DIR,
+    probe_config: Dict[str, Any] = PROBE_CONFIG,
+) -> ManifestValidator:
+    """
+    Return a validator for the current schema, touching the network at most
+    twice: one conditional schema GET, and one ``/mcp/config/validate`` call
+    per schema version until the hash has been cross-checked.
+
+    The cross-check only counts when the server accepts ``probe_config`` and
+    returns a hash; otherwise ``hash_verified`` stays ``None`` (and is not
+    cached) so the next run tries again.
+
+    Args:
+        client: API client, or ``None`` to run purely from the cache.
+        cache_dir: Where schema versions and the hash check are cached.
+        probe_config: Known-good config used for the hash cross-check.
+
+    Raises:
+        RuntimeError: If offline and nothing is cached yet.
+    """
+    cached = _read_cached(cache_dir)
+    if client is None:
+        if cached is None:
+            raise RuntimeError(f"No cached schema in {cache_dir}; run once with network access")
+        return ManifestValidator(cached["schema"], cached.get("hash_verified"))
+
+    # The on-disk copy seeds the client's ETag cache, so an unchanged schema is a 304
+    if cached:
+        client.seed_cache(SCHEMA_PATH, cached.get("etag"), cached["schema"])
+    schema = client.config_schema()
+    version = schema_version(schema)
+    meta = {"version": version, "etag": client.etag(SCHEMA_PATH), "schema": schema}
+    if cached and cached.get("version") == version and cached.get("hash_verified") is not None:
+        meta["hash_verified"] = cached["hash_verified"]
+    meta["fetched_at"] = time.time()
+
+    validator = ManifestValidator(schema, meta.get("hash_verified"))
+    if validator.hash_verified is None and not validator.errors(probe_config):
+        server = client.validate_config(probe_config)
+        if server.valid and server.hash:
+            validator.hash_verified = validator.matches_server_hash(probe_config, server.hash)
+            meta["hash_verified"] = validator.hash_verified
+
+    _write_cached(cache_dir, meta)
+    return validator
+
+
+def _read_configs(path: Path) -> List[Dict[str, Any]]:
+    text = path.read_text()
+    if path.suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate configs against the cached schema")
+    parser.add_argument("configs", type=Path, help="JSON config, JSON list or JSONL file")
+    parser.add_argument("--offline", action="store_true", help="Use the cached schema only")
+    parser.add_argument("--base-url", default=BASE_URL, help="MCP base URL")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="Schema cache dir")
+    args = parser.parse_args(argv)
+
+    configs = _read_configs(args.configs)
+    if args.offline:
+        validator = load_validator(None, cache_dir=args.cache_dir)
+    else:
+        try:
+            client = AleatoricClient(base_url=args.base_url)
+        except MissingAPIKeyError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        with client:
+            validator = load_validator(client, args.cache_dir)
+
+    start = time.perf_counter()
+    results = validator.validate_many(configs)
+    elapsed = time.perf_counter() - start
+
+    invalid = [(i, r) for i, r in enumerate(results) if not r["valid"]]
+    for i, result in invalid[:20]:
+        print(f"#{i}: {'; '.join(result['errors'])}")
+    print(
+        f"Schema {validator.version}: {len(results) - len(invalid)}/{len(results)} valid "
+        f"in {elapsed * 1e3:.1f} ms"
+    )
+    if validator.hash_verified is False:
+        print("Warning: local hash differs from the server's; use server hashes")
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
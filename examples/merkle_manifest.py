@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Per-row-group Merkle manifests for Parquet datasets.
+
+Each row group is one leaf, hashed from its decoded column values (names,
+types, validity and values; not the compressed bytes, Arrow encoding or
+file metadata), so two files with the same rows in the same row groups
+share every leaf hash even when written by different tools or pyarrow
+versions. Leaves are folded pairwise into a
+binary SHA-256 tree whose root stands in for the whole dataset. The
+manifest is stored next to the file as ``<name>.merkle.json``.
+
+Comparing two manifests checks the roots first and descends only into
+subtrees whose hashes differ, so locating one divergent hour in a year of
+data touches ``O(log n)`` nodes. Because leaf hashes depend only on
+content, they also key a dedupe index of identical windows across runs.
+
+Usage:
+    python -m examples.merkle_manifest build data.parquet
+    python -m examples.merkle_manifest diff run1.parquet run2.parquet
+    python -m examples.merkle_manifest dedupe day*.parquet --index windows.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST_SUFFIX = ".merkle.json"
+MANIFEST_VERSION = 2  # 2: canonical column hashing, rehashed odd nodes
+TIME_COLUMNS = ("timestamp", "ts", "time")
+
+# Domain separation keeps a leaf from ever colliding with an inner node
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def _update(sha, data: bytes) -> None:
+    """Length-prefixed, so consecutive fields cannot run into each other."""
+    sha.update(len(data).to_bytes(8, "little"))
+    sha.update(data)
+
+
+def _hash_column(sha, name: str, array: pa.Array) -> None:
+    """
+    Feed one column's logical content to ``sha``: name, type, validity and
+    values, with no schema metadata, buffer offsets or bytes behind nulls.
+    """
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()  # Same values, same hash, encoded or not
+    kind = array.type
+    _update(sha, name.encode())
+    _update(sha, str(kind).encode())
+    _update(sha, len(array).to_bytes(8, "little"))
+    if pa.types.is_null(kind):
+        return
+    valid = array.is_valid().to_numpy(zero_copy_only=False)
+    _update(sha, np.packbits(valid, bitorder="little").tobytes())
+
+    if pa.types.is_boolean(kind):
+        _update(sha, (array.fill_null(False).to_numpy(zero_copy_only=False)).tobytes())
+    elif (
+        pa.types.is_string(kind) or pa.types.is_binary(kind)
+        or pa.types.is_large_string(kind) or pa.types.is_large_binary(kind)
+    ):
+        array = array.fill_null(pa.scalar(b"", kind))
+        large = pa.types.is_large_string(kind) or pa.types.is_large_binary(kind)
+        _, offsets_buf, data_buf = array.buffers()
+        offsets = np.frombuffer(offsets_buf, dtype=np.int64 if large else np.int32)
+        offsets = offsets[array.offset:array.offset + len(array) + 1]
+        _update(sha, np.diff(offsets).astype(np.int64).tobytes())
+        data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.zeros(0, np.uint8)
+        _update(sha, data[offsets[0]:offsets[-1]].tobytes())
+    elif _byte_width(kind):
+        # Fixed width (numbers, temporals, decimals, fixed-size binary): raw
+        # values of this slice with null slots zeroed
+        width = _byte_width(kind)
+        raw = np.frombuffer(array.buffers()[1], dtype=np.uint8)
+        raw = raw[array.offset * width:(array.offset + len(array)) * width].reshape(-1, width).copy()
+        raw[~valid] = 0
+        _update(sha, raw.tobytes())
+    else:
+        # Nested types: no fixed buffer layout to normalize; hash the values
+        _update(sha, json.dumps(array.to_pylist(), default=str).encode())
+
+
+def _byte_width(kind: pa.DataType) -> int:
+    """Bytes per value of a flat fixed-width type, else 0 (nested or variable width)."""
+    if pa.types.is_nested(kind):
+        return 0
+    try:
+        bits = kind.bit_width  # Raises ValueError for variable-width types
+    except ValueError:
+        return 0
+    return bits // 8 if bits % 8 == 0 else 0
+
+
+def hash_table(table: pa.Table) -> str:
+    """
+    Leaf hash of one window: SHA-256 over its columns' canonical values.
+
+    Independent of schema metadata, chunking, dictionary encoding and the
+    pyarrow version that read or wrote the data.
+    """
+    sha = hashlib.sha256(_LEAF)
+    for name, column in zip(table.column_names, table.columns):
+        _hash_column(sha, name, column.combine_chunks())
+    return sha.hexdigest()
+
+
+def _node(left: str, right: Optional[str] = None) -> str:
+    """Inner node over two children, or over a lone child at the end of a level."""
+    return hashlib.sha256(
+        _NODE + bytes.fromhex(left) + (bytes.fromhex(right) if right else b"")
+    ).hexdigest()
+
+
+def tree_levels(leaves: Sequence[str]) -> List[List[str]]:
+    """
+    All tree levels, leaves first and the root level last.
+
+    An odd node at the end of a level is rehashed alone with the node
+    prefix, so every inner hash is domain-separated from leaves, and node
+    ``i`` of level ``L`` always covers leaves ``[i * 2**L, (i + 1) * 2**L)``.
+    """
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        prev = levels[-1]
+        nxt = [_node(prev[i], prev[i + 1]) for i in range(0, len(prev) - 1, 2)]
+        if len(prev) % 2:
+            nxt.append(_node(prev[-1]))
+        levels.append(nxt)
+    return levels
+
+
+@dataclass
+class Leaf:
+    """One row group (time window) of a dataset."""
+
+    index: int
+    start_row: int
+    rows: int
+    hash: str
+    t_min: Optional[str] = None
+    t_max: Optional[str] = None
+
+
+@dataclass
+class MerkleManifest:
+    """Leaf hashes of a dataset plus the Merkle root over them."""
+
+    leaves: List[Leaf] = field(default_factory=list)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(leaf.rows for leaf in self.leaves)
+
+    @property
+    def root(self) -> str:
+        if not self.leaves:
+            return hashlib.sha256(_LEAF).hexdigest()
+        return tree_levels([leaf.hash for leaf in self.leaves])[-1][0]
+
+    def add_table(
+        self, table: pa.Table, t_min: Optional[str] = None, t_max: Optional[str] = None
+    ) -> Leaf:
+        """Append ``table`` as the next window, e.g. while a file is written."""
+        leaf = Leaf(
+            len(self.leaves), self.num_rows, table.num_rows, hash_table(table), t_min, t_max
+        )
+        self.leaves.append(leaf)
+        return leaf
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": MANIFEST_VERSION,
+            "algorithm": "sha256",
+            "rows": self.num_rows,
+            "root": self.root,
+            "leaves": [asdict(leaf) for leaf in self.leaves],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "MerkleManifest":
+        return cls([Leaf(**leaf) for leaf in data["leaves"]])
+
+
+@dataclass
+class ManifestDiff:
+    """Where two manifests diverge."""
+
+    mismatched: List[int]  # Leaf indices present in both with different hashes
+    only_in_first: List[int]
+    only_in_second: List[int]
+    nodes_compared: int
+
+    @property
+    def identical(self) -> bool:
+        return not (self.mismatched or self.only_in_first or self.only_in_second)
+
+
+def diff(first: MerkleManifest, second: MerkleManifest) -> ManifestDiff:
+    """
+    Compare two manifests top-down, skipping every subtree whose hash agrees.
+
+    Nodes are compared only where both trees cover exactly the same leaf
+    range; leaves past the shorter dataset are reported as one-sided.
+    """
+    a = tree_levels([leaf.hash for leaf in first.leaves])
+    b = tree_levels([leaf.hash for leaf in second.leaves])
+    n_a, n_b = len(first.leaves), len(second.leaves)
+    common = min(n_a, n_b)
+    mismatched: List[int] = []
+    compared = 0
+
+    def visit(level: int, index: int) -> None:
+        nonlocal compared
+        start = index << level
+        if start >= common:
+            return
+        end = (index + 1) << level
+        same_span = min(end, n_a) == min(end, n_b)
+        if same_span and level < len(a) and level < len(b):
+            compared += 1
+            if a[level][index] == b[level][index]:
+                return
+        if level == 0:
+            mismatched.append(index)
+            return
+        visit(level - 1, 2 * index)
+        visit(level - 1, 2 * index + 1)
+
+    if common:
+        visit(max(len(a), len(b)) - 1, 0)
+    return ManifestDiff(
+        mismatched=mismatched,
+        only_in_first=list(range(common, n_a)),
+        only_in_second=list(range(common, n_b)),
+        nodes_compared=compared,
+    )
+
+
+def _time_bounds(
+    metadata: pq.FileMetaData, row_group: int
+) -> Tuple[Optional[str], Optional[str]]:
+    names = metadata.schema.to_arrow_schema().names
+    for name in TIME_COLUMNS:
+        if name in names:
+            stats = metadata.row_group(row_group).column(names.index(name)).statistics
+            if stats is not None and stats.has_min_max:
+                return str(stats.min), str(stats.max)
+    return None, None
+
+
+def manifest_path(parquet_path: Path) -> Path:
+    """``data.parquet`` -> ``data.merkle.json`` in the same directory."""
+    parquet_path = Path(parquet_path)
+    return parquet_path.with_name(parquet_path.stem + MANIFEST_SUFFIX)
+
+
+def source_fingerprint(parquet_path: Path) -> Dict[str, object]:
+    """
+    File size plus SHA-256 of the Parquet footer (row group offsets, sizes and
+    column statistics), so a file rewritten in place with the same number of
+    rows still reads as changed, while a byte-identical copy does not.
+    """
+    size = os.path.getsize(parquet_path)
+    with open(parquet_path, "rb") as f:
+        f.seek(max(size - 8, 0))
+        tail = f.read(8)
+        footer_len = int.from_bytes(tail[:4], "little") if len(tail) == 8 else 0
+        f.seek(max(size - 8 - footer_len, 0))
+        footer = f.read(footer_len + 8)
+    return {"size": size, "footer_sha256": hashlib.sha256(footer).hexdigest()}
+
+
+def save_manifest(manifest: MerkleManifest, parquet_path: Path) -> Path:
+    path = manifest_path(parquet_path)
+    data = dict(manifest.to_dict(), source=source_fingerprint(parquet_path))
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+    return path
+
+
+def build_manifest(parquet_path: Path) -> MerkleManifest:
+    """Hash ``parquet_path`` one row group at a time and write its manifest."""
+    manifest = MerkleManifest()
+    with pa.memory_map(str(parquet_path), "r") as source:
+        parquet = pq.ParquetFile(source)
+        for i in range(parquet.num_row_groups):
+            manifest.add_table(parquet.read_row_group(i), *_time_bounds(parquet.metadata, i))
+    save_manifest(manifest, parquet_path)
+    return manifest
+
+
+def load_manifest(parquet_path: Path) -> MerkleManifest:
+    """
+    Load the manifest for ``parquet_path``, rebuilding it when missing or stale.
+
+    A manifest is stale when the file's size or footer hash differs from
+    the ones recorded with it (see ``source_fingerprint``).
+    """
+    path = manifest_path(parquet_path)
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+        if (
+            data.get("version") == MANIFEST_VERSION
+            and data.get("source") == source_fingerprint(parquet_path)
+        ):
+            return MerkleManifest.from_dict(data)
+    return build_manifest(Path(parquet_path))
+
+
+class DedupeIndex:
+    """
+    Content-addressed index of windows: leaf hash -> first place it was seen.
+
+    Persisted as JSON so identical windows are recognised across runs.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.windows: Dict[str, Dict[str, object]] = {}
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                self.windows = json.load(f)
+
+    def add(self, parquet_path: Path, manifest: MerkleManifest) -> List[Tuple[Leaf, Dict]]:
+        """Register every window; return ``(leaf, earlier location)`` duplicates."""
+        duplicates = []
+        for leaf in manifest.leaves:
+            seen = self.windows.get(leaf.hash)
+            if seen is None:
+                self.windows[leaf.hash] = {
+                    "path": str(parquet_path),
+                    "row_group": leaf.index,
+                    "rows": leaf.rows,
+                }
+            elif (seen["path"], seen["row_group"]) != (str(parquet_path), leaf.index):
+                duplicates.append((leaf, seen))
+        return duplicates
+
+    def save(self) -> None:
+        if self.path:
+            with open(self.path, "w") as f:
+                json.dump(self.windows, f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merkle manifests for Parquet datasets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Write <name>.merkle.json next to each file")
+    build.add_argument("paths", nargs="+", type=Path)
+    cmp = sub.add_parser("diff", help="Locate diverging row groups between two datasets")
+    cmp.add_argument("first", type=Path)
+    cmp.add_argument("second", type=Path)
+    dedupe = sub.add_parser("dedupe", help="Find windows identical to earlier ones")
+    dedupe.add_argument("paths", nargs="+", type=Path)
+    dedupe.add_argument("--index", type=Path, help="Persistent index JSON (across runs)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for path in args.paths:
+            manifest = build_manifest(path)
+            print(
+                f"{manifest_path(path)}: {len(manifest.leaves)} row groups, "
+                f"{manifest.num_rows:,} rows, root={manifest.root}"
+            )
+        return 0
+
+    if args.command == "diff":
+        first, second = load_manifest(args.first), load_manifest(args.second)
+        result = diff(first, second)
+        if result.identical:
+            print(f"Identical (root {first.root})")
+            return 0
+        for i in result.mismatched:
+            leaf = first.leaves[i]
+            window = f" [{leaf.t_min} .. {leaf.t_max}]" if leaf.t_min else ""
+            print(f"Row group {i}: rows {leaf.start_row}-{leaf.start_row + leaf.rows - 1}{window}")
+        if result.only_in_first or result.only_in_second:
+            print(
+                f"Extra row groups: {len(result.only_in_first)} only in {args.first}, "
+                f"{len(result.only_in_second)} only in {args.second}"
+            )
+        print(
+            f"{len(result.mismatched)} differing row groups "
+            f"({result.nodes_compared} nodes compared)"
+        )
+        return 1
+
+    index = DedupeIndex(args.index)
+    duplicate_rows = 0
+    for path in args.paths:
+        for leaf, seen in index.add(path, load_manifest(path)):
+            duplicate_rows += leaf.rows
+            print(f"{path}#{leaf.index} == {seen['path']}#{seen['row_group']} ({leaf.rows:,} rows)")
+    index.save()
+    print(f"{duplicate_rows:,} duplicate rows across {len(args.paths)} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Mergeable KLL quantile sketches for distribution checks at scale.
+
+A ``KLLSketch`` summarizes any number of values in a few thousand weighted
+samples with a rank error of roughly ``1.7 / k``, and tracks a hard bound on
+that error (``rank_error``) that the KS test allows for. Sketches are built per
+Parquet row group (or per downloaded chunk), merged across chunks and
+symbols, and persisted as a JSON sidecar next to the Parquet file. Approximate
+quantiles, CDFs, histograms and two-sample KS tests then run on the sidecars
+alone, without rescanning the raw data.
+
+Usage:
+    python -m examples.quantile_sketch build examples/outputs/market_data.parquet
+    python -m examples.quantile_sketch ks hist.parquet examples/outputs/market_data.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from examples.merkle_manifest import source_fingerprint
+from examples.streaming_stats import kolmogorov_sf
+
+DEFAULT_K = 1000
+SIDECAR_SUFFIX = ".sketch.json"
+SIDECAR_VERSION = 2  # 2: sketches carry their rank-error bound
+
+PRICE_COLUMNS = ("price", "mid", "mid_price")
+
+# Capacity shrinks by this factor per level below the top (KLL paper's c)
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    KLL sketch (Karnin, Lang, Liberty 2016) over float values.
+
+    Level ``h`` holds items of weight ``2**h``. When a level overflows it is
+    sorted and every other item is promoted to the next level. The choice of
+    odd or even items alternates deterministically, so building the same
+    data in the same order always yields the same sketch.
+
+    Compacting level ``h`` moves any rank by at most ``2**h``, so the sum of
+    those weights over all compactions (``error``) bounds the rank error of
+    every ``cdf`` and ``quantile`` answer.
+
+    Args:
+        k: Accuracy parameter; normalized rank error is about ``1.7 / k``.
+    """
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.error = 0.0
+        self._compactions = 0
+
+    @property
+    def rank_error(self) -> float:
+        """Upper bound on the normalized rank error of any answer."""
+        return self.error / self.n if self.n else 0.0
+
+    def update(self, values: Iterable[float]) -> "KLLSketch":
+        """Add a batch of values (non-finite values are ignored)."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold ``other`` into this sketch (order of merges does not matter for accuracy)."""
+        if other.n == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self.error += other.error
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY**depth)))
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind at this level
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[: len(items) - len(keep)]
+                offset = self._compactions % 2
+                self._compactions += 1
+                self.error += 2.0**h
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], pairs[offset::2]])
+                self.levels[h] = keep
+                # The top level may have grown, which tightens lower capacities
+                h = 0
+                continue
+            h += 1
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def cdf(self, x) -> np.ndarray:
+        """Approximate fraction of values <= ``x`` (scalar or array)."""
+        items, weights = self._weighted()
+        if len(items) == 0:
+            return np.full(np.shape(x), np.nan)
+        cum = np.concatenate([[0.0], np.cumsum(weights)])
+        idx = np.searchsorted(items, x, side="right")
+        return cum[idx] / cum[-1]
+
+    def quantile(self, q) -> np.ndarray:
+        """Approximate value at rank ``q`` in ``[0, 1]`` (scalar or array)."""
+        items, weights = self._weighted()
+        if len(items) == 0:
+            return np.full(np.shape(q), np.nan)
+        q = np.asarray(q, dtype=float)
+        cum = np.cumsum(weights) / weights.sum()
+        idx = np.minimum(np.searchsorted(cum, q, side="left"), len(items) - 1)
+        out = items[idx]
+        # Exact extremes are tracked separately
+        out = np.where(q <= 0.0, self.min, np.where(q >= 1.0, self.max, out))
+        return out if out.ndim else float(out)
+
+    def histogram(self, edges) -> np.ndarray:
+        """Approximate counts of values in each ``[edges[i], edges[i+1])`` bin."""
+        return np.diff(self.cdf(np.asarray(edges, dtype=float))) * self.n
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "compactions": self._compactions,
+            "error": self.error,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "KLLSketch":
+        sketch = cls(int(data["k"]))
+        sketch.n = int(data["n"])
+        sketch.min = math.inf if data["min"] is None else float(data["min"])
+        sketch.max = -math.inf if data["max"] is None else float(data["max"])
+        sketch._compactions = int(data.get("compactions", 0))
+        sketch.error = float(data["error"])
+        sketch.levels = [np.asarray(level, dtype=float) for level in data["levels"]]
+        return sketch
+
+
+def ks_2samp_sketch(a: KLLSketch, b: KLLSketch) -> Tuple[float, float]:
+    """
+    Approximate two-sample KS test from two sketches.
+
+    The statistic is evaluated on the union of retained items, so it is off
+    by at most ``a.rank_error + b.rank_error``. At large ``n`` that error
+    alone would look significant, so the p-value is computed from ``D``
+    less this bound: the smallest distance the data are certain to have.
+    Differences within the sketches' accuracy therefore never reject.
+
+    Returns:
+        ``(D, p_value)``
+    """
+    if a.n == 0 or b.n == 0:
+        return math.nan, math.nan
+    grid = np.concatenate(a.levels + b.levels)
+    d = float(np.abs(a.cdf(grid) - b.cdf(grid)).max())
+    return d, kolmogorov_sf(max(d - a.rank_error - b.rank_error, 0.0), a.n, b.n)
+
+
+class SketchSet:
+    """
+    Sketches of one dataset: log returns (bps), spreads (bps) and prices.
+
+    Keeps the first and last price so that the return across the seam of two
+    consecutive chunks is included when they are merged.
+    """
+
+    COLUMNS = ("returns_bps", "spread_bps", "price")
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.rows = 0
+        self.first_price = math.nan
+        self.last_price = math.nan
+        self.sketches = {name: KLLSketch(k) for name in self.COLUMNS}
+
+    def __getitem__(self, name: str) -> KLLSketch:
+        return self.sketches[name]
+
+    @classmethod
+    def from_table(cls, table: pa.Table, k: int = DEFAULT_K) -> "SketchSet":
+        """Sketch one chunk (a row group, a record batch, a downloaded file)."""
+        out = cls(k)
+        names = table.column_names
+        price_col = next((c for c in PRICE_COLUMNS if c in names), None)
+        if price_col is None or table.num_rows == 0:
+            return out
+        prices = table.column(price_col).to_numpy().astype(float, copy=False)
+        out.rows = len(prices)
+        out.first_price = float(prices[0])
+        out.last_price = float(prices[-1])
+        out["price"].update(prices)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["returns_bps"].update(np.diff(np.log(prices)) * 1e4)
+            if "spread_bps" in names:
+                spreads = table.column("spread_bps").to_numpy()
+            elif "bid" in names and "ask" in names:
+                bid = table.column("bid").to_numpy()
+                ask = table.column("ask").to_numpy()
+                spreads = (ask - bid) / prices * 1e4
+            else:
+                spreads = np.empty(0)
+        out["spread_bps"].update(spreads)
+        return out
+
+    def merge(self, other: "SketchSet", contiguous: bool = True) -> "SketchSet":
+        """
+        Fold in ``other``.
+
+        Args:
+            other: Sketches of another chunk or dataset.
+            contiguous: ``other`` directly follows this chunk in time (adds
+                the seam return). Use ``False`` to pool different symbols.
+        """
+        if other.rows == 0:
+            return self
+        if contiguous and self.rows:
+            seam = math.log(other.first_price / self.last_price) * 1e4
+            self["returns_bps"].update([seam])
+        for name, sketch in other.sketches.items():
+            self.sketches[name].merge(sketch)
+        if not self.rows:
+            self.first_price = other.first_price
+        self.last_price = other.last_price
+        self.rows += other.rows
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "version": SIDECAR_VERSION,
+            "k": self.k,
+            "rows": self.rows,
+            "first_price": self.first_price,
+            "last_price": self.last_price,
+            "sketches": {name: s.to_dict() for name, s in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "SketchSet":
+        out = cls(int(data["k"]))
+        out.rows = int(data["rows"])
+        out.first_price = float(data["first_price"])
+        out.last_price = float(data["last_price"])
+        out.sketches = {
+            name: KLLSketch.from_dict(s) for name, s in data["sketches"].items()
+        }
+        return out
+
+
+def sidecar_path(parquet_path: Path) -> Path:
+    """``data.parquet`` -> ``data.sketch.json`` in the same directory."""
+    parquet_path = Path(parquet_path)
+    return parquet_path.with_name(parquet_path.stem + SIDECAR_SUFFIX)
+
+
+def save_sidecar(sketches: SketchSet, parquet_path: Path) -> Path:
+    """Write the sidecar, keyed on the content of the (already written) Parquet file."""
+    path = sidecar_path(parquet_path)
+    data = dict(sketches.to_dict(), source=source_fingerprint(parquet_path))
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def build_sidecar(parquet_path: Path, k: int = DEFAULT_K) -> SketchSet:
+    """Sketch ``parquet_path`` row group by row group and write its sidecar."""
+    with pa.memory_map(str(parquet_path), "r") as source:
+        parquet = pq.ParquetFile(source)
+        sketches = SketchSet(k)
+        for i in range(parquet.num_row_groups):
+            sketches.merge(SketchSet.from_table(parquet.read_row_group(i), k))
+    save_sidecar(sketches, parquet_path)
+    return sketches
+
+
+def load_sidecar(parquet_path: Path, k: int = DEFAULT_K) -> SketchSet:
+    """
+    Load the sidecar for ``parquet_path``, rebuilding it when missing or stale.
+
+    A sidecar is stale unless the file's size and footer hash match the ones
+    recorded with it (see ``merkle_manifest.source_fingerprint``), so a file
+    rewritten with the same number of rows is sketched again.
+    """
+    path = sidecar_path(parquet_path)
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+        if (
+            data.get("version") == SIDECAR_VERSION
+            and data.get("source") == source_fingerprint(parquet_path)
+        ):
+            return SketchSet.from_dict(data)
+    return build_sidecar(Path(parquet_path), k)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KLL sketch sidecars for Parquet datasets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Write <name>.sketch.json next to each file")
+    build.add_argument("paths", nargs="+", type=Path)
+    build.add_argument("--k", type=int, default=DEFAULT_K, help=f"Accuracy (default: {DEFAULT_K})")
+    ks = sub.add_parser("ks", help="Approximate KS test between two datasets")
+    ks.add_argument("first", type=Path)
+    ks.add_argument("second", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for path in args.paths:
+            sketches = build_sidecar(path, args.k)
+            q = sketches["returns_bps"].quantile([0.01, 0.5, 0.99])
+            print(
+                f"{sidecar_path(path)}: {sketches.rows:,} rows, returns p1/p50/p99 = "
+                f"{q[0]:.3f}/{q[1]:.3f}/{q[2]:.3f} bps"
+            )
+        return 0
+
+    first = load_sidecar(args.first)
+    second = load_sidecar(args.second)
+    for name in ("returns_bps", "spread_bps"):
+        d, p = ks_2samp_sketch(first[name], second[name])
+        error = first[name].rank_error + second[name].rank_error
+        print(f"{name}: D={d:.4f} (+/- {error:.4f}) p={p:.3e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
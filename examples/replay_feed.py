@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Replay MCP-generated Parquet into ``ASQMaker`` at constant memory.
+
+The file is opened through a memory-mapped Arrow source and read one record
+batch at a time, so a multi-GB, multi-day dataset starts replaying
+immediately and only one batch of columns is resident at once. Price and
+confidence columns are handed to ``ASQMaker.on_ticks`` as NumPy views of the
+Arrow buffers; no DataFrame is ever built.
+
+Arrow IPC files (``.arrow``), such as those the MCP bridge spools for
+tabular tool results, replay the same way, given as a path or as the
+``file://`` URI the bridge returned; their columns are read
+straight out of the mapped file with no copy.
+
+Usage:
+    python -m examples.replay_feed examples/outputs/market_data.parquet
+    python -m examples.replay_feed day1.parquet day2.parquet --batch-size 131072
+    python -m examples.replay_feed file:///dev/shm/aleatoric-spool-<uid>/<hash>.arrow
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from examples.asq import ASQMaker, StratConfig
+
+# Column names tried in order; the first present in the file wins.
+PRICE_COLUMNS = ("price", "mid", "mid_price", "oracle_price")
+CONF_COLUMNS = ("oracle_conf", "conf", "confidence")
+TIME_COLUMNS = ("timestamp", "ts", "time")
+
+DEFAULT_BATCH_SIZE = 65_536
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+@dataclass
+class TickBatch:
+    """One record batch of ticks as NumPy arrays (views where Arrow allows)."""
+
+    prices: np.ndarray
+    confs: np.ndarray
+    timestamps: np.ndarray  # Seconds since epoch, float64
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def _local_path(path: Union[str, Path]) -> Path:
+    text = str(path)
+    return Path(text[len("file://"):]) if text.startswith("file://") else Path(text)
+
+
+def open_arrow(path: Union[str, Path]) -> pa.Table:
+    """
+    Memory-map an Arrow IPC file (path or ``file://`` URI) as a Table.
+
+    The columns are views of the mapped file; nothing is decoded or copied.
+    """
+    source = pa.memory_map(str(_local_path(path)), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def _pick(names: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    for name in candidates:
+        if name in names:
+            return name
+    return None
+
+
+def _to_numpy(array: Union[pa.Array, pa.ChunkedArray]) -> np.ndarray:
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_timestamp(array.type):
+        unit = array.type.unit
+        scale = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}[unit]
+        return array.cast(pa.int64()).to_numpy(zero_copy_only=False) * scale
+    return array.to_numpy(zero_copy_only=array.null_count == 0)
+
+
+class ParquetReplayFeed:
+    """
+    Lazy, memory-mapped iterator over ticks in Parquet or Arrow IPC files.
+
+    Files are replayed in the order given (e.g. one per day). The confidence
+    column falls back to half the bid/ask spread when the dataset has no
+    oracle confidence, and to zero when it has neither.
+
+    Args:
+        paths: Parquet file(s) to replay.
+        batch_size: Rows per record batch; bounds resident memory.
+        price_column: Override the auto-detected price column.
+        conf_column: Override the auto-detected confidence column.
+        time_column: Override the auto-detected timestamp column.
+    """
+
+    def __init__(
+        self,
+        paths: Union[str, Path, Sequence[Union[str, Path]]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        price_column: Optional[str] = None,
+        conf_column: Optional[str] = None,
+        time_column: Optional[str] = None,
+    ):
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.paths = [_local_path(p) for p in paths]
+        self.batch_size = batch_size
+        self.price_column = price_column
+        self.conf_column = conf_column
+        self.time_column = time_column
+
+    def num_rows(self) -> int:
+        """Total rows from file footers only (no data pages are read)."""
+        total = 0
+        for path in self.paths:
+            if path.suffix in ARROW_SUFFIXES:
+                with pa.memory_map(str(path), "r") as source:
+                    reader = pa.ipc.open_file(source)
+                    total += sum(
+                        reader.get_batch(i).num_rows for i in range(reader.num_record_batches)
+                    )
+            else:
+                total += pq.ParquetFile(path, memory_map=True).metadata.num_rows
+        return total
+
+    def __iter__(self) -> Iterator[TickBatch]:
+        for path in self.paths:
+            yield from self._iter_file(path)
+
+    def _batches(self, path: Path, source: pa.MemoryMappedFile, columns: List[str]):
+        if path.suffix in ARROW_SUFFIXES:
+            table = pa.ipc.open_file(source).read_all().select(columns)
+            return table.to_batches(max_chunksize=self.batch_size)
+        return pq.ParquetFile(source).iter_batches(batch_size=self.batch_size, columns=columns)
+
+    def _iter_file(self, path: Path) -> Iterator[TickBatch]:
+        source = pa.memory_map(str(path), "r")
+        try:
+            if path.suffix in ARROW_SUFFIXES:
+                names = pa.ipc.open_file(source).schema.names
+            else:
+                names = pq.ParquetFile(source).schema_arrow.names
+
+            price_col = self.price_column or _pick(names, PRICE_COLUMNS)
+            if price_col is None:
+                raise ValueError(f"{path}: no price column (tried {PRICE_COLUMNS})")
+            conf_col = self.conf_column or _pick(names, CONF_COLUMNS)
+            time_col = self.time_column or _pick(names, TIME_COLUMNS)
+            spread_cols = ["bid", "ask"] if {"bid", "ask"} <= set(names) else []
+
+            columns = [price_col]
+            columns += [conf_col] if conf_col else spread_cols
+            columns += [time_col] if time_col else []
+
+            offset = 0
+            for batch in self._batches(path, source, columns):
+                prices = _to_numpy(batch.column(price_col))
+                if conf_col:
+                    confs = _to_numpy(batch.column(conf_col))
+                elif spread_cols:
+                    confs = (_to_numpy(batch.column("ask")) - _to_numpy(batch.column("bid"))) / 2.0
+                else:
+                    confs = np.zeros(len(prices))
+                if time_col:
+                    timestamps = _to_numpy(batch.column(time_col))
+                else:
+                    timestamps = np.arange(offset, offset + len(prices), dtype=float)
+                offset += len(prices)
+                yield TickBatch(prices, confs, timestamps)
+        finally:
+            source.close()
+
+
+def replay(
+    maker: ASQMaker, feed: ParquetReplayFeed, inventory: float = 0.0
+) -> dict:
+    """
+    Drive ``maker`` through every tick of ``feed``.
+
+    Returns:
+        Running totals: ``ticks``, ``batches``, ``circuit_breaker_pct``,
+        ``sigma_mean`` and the quotes after the final tick.
+    """
+    ticks = 0
+    batches = 0
+    breaker_ticks = 0
+    sigma_sum = 0.0
+    for batch in feed:
+        state = maker.on_ticks(batch.prices, batch.confs, batch.timestamps, inventory)
+        ticks += len(batch)
+        batches += 1
+        breaker_ticks += int(state["circuit_breaker"].sum())
+        sigma_sum += float(state["sigma_annual"].sum())
+
+    return {
+        "ticks": ticks,
+        "batches": batches,
+        "circuit_breaker_pct": 100.0 * breaker_ticks / ticks if ticks else 0.0,
+        "sigma_mean": sigma_sum / ticks if ticks else 0.0,
+        "final_quotes": maker.get_quotes(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay Parquet ticks into ASQMaker")
+    parser.add_argument(
+        "paths", nargs="+", help="Parquet/Arrow file(s) or file:// URIs, replayed in order"
+    )
+    parser.add_argument("--symbol", default="BTC", help="Symbol label (default: BTC)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per record batch (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument("--inventory", type=float, default=0.0, help="Held inventory")
+    args = parser.parse_args(argv)
+
+    feed = ParquetReplayFeed(args.paths, batch_size=args.batch_size)
+    maker = ASQMaker(args.symbol, StratConfig())
+    # One warning per breaker transition would flood the console on replay
+    maker.logger.setLevel(logging.ERROR)
+
+    print(f"Replaying {feed.num_rows():,} ticks from {len(feed.paths)} file(s)...")
+    result = replay(maker, feed, args.inventory)
+
+    quotes = result["final_quotes"]
+    print(f"Ticks: {result['ticks']:,} in {result['batches']} batches")
+    print(f"Circuit breaker active: {result['circuit_breaker_pct']:.2f}% of ticks")
+    print(f"Mean sigma (annual): {result['sigma_mean']:.4f}")
+    if quotes.get("status") == "ACTIVE":
+        print(
+            f"Final: price={quotes['oracle_price']:.2f} "
+            f"half_spread={quotes['half_spread_bps']:.2f}bps skew={quotes['skew_bps']:.4f}bps"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
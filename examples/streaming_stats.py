@@ -0,0 +1,178 @@
+"""
+Mergeable streaming accumulators for single-pass dataset statistics.
+
+Each accumulator is built from one chunk of data (a Parquet row group, a
+record batch) with ``from_array`` and combined with ``merge``. Merging is
+exact, so chunks can be scanned in parallel and folded together afterwards
+in their original order.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Moments:
+    """
+    Count, mean, central moments (M2..M4), min and max of a sample.
+
+    Combination uses the pairwise update of Pébay (2008), which stays stable
+    when the mean is large relative to the spread (e.g. BTC prices).
+    """
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    m3: float = 0.0
+    m4: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    @classmethod
+    def from_array(cls, x: np.ndarray) -> "Moments":
+        x = np.asarray(x, dtype=float)
+        x = x[np.isfinite(x)]
+        if len(x) == 0:
+            return cls()
+        mean = float(x.mean())
+        d = x - mean
+        d2 = d * d
+        return cls(
+            n=len(x),
+            mean=mean,
+            m2=float(d2.sum()),
+            m3=float((d2 * d).sum()),
+            m4=float((d2 * d2).sum()),
+            min=float(x.min()),
+            max=float(x.max()),
+        )
+
+    def merge(self, other: "Moments") -> "Moments":
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        d_n = delta / n
+        m2 = self.m2 + other.m2 + delta * d_n * na * nb
+        m3 = (
+            self.m3
+            + other.m3
+            + delta * d_n * d_n * na * nb * (na - nb)
+            + 3.0 * d_n * (na * other.m2 - nb * self.m2)
+        )
+        m4 = (
+            self.m4
+            + other.m4
+            + delta * d_n**3 * na * nb * (na * na - na * nb + nb * nb)
+            + 6.0 * d_n * d_n * (na * na * other.m2 + nb * nb * self.m2)
+            + 4.0 * d_n * (na * other.m3 - nb * self.m3)
+        )
+        return Moments(
+            n=n,
+            mean=self.mean + d_n * nb,
+            m2=m2,
+            m3=m3,
+            m4=m4,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+        )
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), as ``pandas.Series.std``."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan
+
+    def skewness(self) -> float:
+        """Bias-corrected skewness, as ``pandas.Series.skew``."""
+        n = self.n
+        if n < 3 or self.m2 == 0:
+            return math.nan
+        g1 = math.sqrt(n) * self.m3 / self.m2**1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+    def kurtosis(self) -> float:
+        """Bias-corrected excess kurtosis, as ``pandas.Series.kurt``."""
+        n = self.n
+        if n < 4 or self.m2 == 0:
+            return math.nan
+        g2 = n * self.m4 / (self.m2 * self.m2) - 3.0
+        return ((n + 1) * g2 + 6.0) * (n - 1) / ((n - 2) * (n - 3))
+
+
+@dataclass
+class LagSums:
+    """
+    Sums needed for the lag-1 autocorrelation of an ordered sequence.
+
+    Keeps ``sum(x[t] * x[t-1])`` plus the first and last element, so the
+    cross term at the seam between two consecutive chunks can be restored on
+    merge. Chunks must be merged in sequence order.
+    """
+
+    n: int = 0
+    total: float = 0.0
+    lag: float = 0.0
+    first: float = math.nan
+    last: float = math.nan
+
+    @classmethod
+    def from_array(cls, x: np.ndarray) -> "LagSums":
+        x = np.asarray(x, dtype=float)
+        if len(x) == 0:
+            return cls()
+        return cls(
+            n=len(x),
+            total=float(x.sum()),
+            lag=float(np.dot(x[1:], x[:-1])),
+            first=float(x[0]),
+            last=float(x[-1]),
+        )
+
+    def merge(self, later: "LagSums") -> "LagSums":
+        if later.n == 0:
+            return self
+        if self.n == 0:
+            return later
+        return LagSums(
+            n=self.n + later.n,
+            total=self.total + later.total,
+            lag=self.lag + later.lag + self.last * later.first,
+            first=self.first,
+            last=later.last,
+        )
+
+    def acf1(self, moments: Moments) -> float:
+        """
+        Lag-1 sample autocorrelation (the ``statsmodels.tsa.acf`` estimator),
+        using the matching ``Moments`` for the mean and M2.
+        """
+        if self.n < 2 or moments.m2 == 0:
+            return math.nan
+        mu = moments.mean
+        cross = (
+            self.lag
+            - mu * (2.0 * self.total - self.first - self.last)
+            + (self.n - 1) * mu * mu
+        )
+        return cross / moments.m2
+
+
+def kolmogorov_sf(d: float, n: int, m: int) -> float:
+    """Asymptotic p-value of a two-sample KS statistic ``d``."""
+    en = math.sqrt(n * m / (n + m))
+    lam = (en + 0.12 + 0.11 / en) * d
+    if lam < 0.2:
+        return 1.0
+    total = 0.0
+    for k in range(1, 101):
+        term = 2.0 * (-1) ** (k - 1) * math.exp(-2.0 * k * k * lam * lam)
+        total += term
+        if abs(term) < 1e-300 or abs(term) <= 1e-12 * abs(total):
+            break
+    return min(max(total, 0.0), 1.0)
@@ -10,18 +10,58 @@ Usage:
     python validate_config.py
     python validate_config.py --show-schema
     python validate_config.py --config-file my_config.json
+    python validate_config.py --local            # cached schema, local hash
+    python validate_config.py --local --offline  # no network at all
+
+``--local`` validates against the cached, compiled schema
+(``manifest_validator.py``) and only falls back to the server when the local
+hash has not been confirmed to match it.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-import os
 import sys
+from pathlib import Path
+
+if __package__ in (None, ""):
+    # Support `python examples/validate_config.py` as well as `python -m examples.validate_config`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from examples.aleatoric_client import AleatoricClient, MissingAPIKeyError  # noqa: E402
+from examples.manifest_validator import load_validator  # noqa: E402
+
+
+def default_config(symbol: str, seed: int) -> dict:
+    return {
+        "symbol": symbol,
+        "seed": seed,
+        "tick_size": 0.01,
+        "lot_size": 0.001,
+        "initial_mid": 50000.0,
+        "initial_spread_bps": 1.0,
+        "book_depth": 10,
+        "volatility": 0.02,
+        "drift": 0.0,
+        "mean_reversion": 0.1,
+    }
+
 
-import httpx
+def load_config(args: argparse.Namespace) -> dict:
+    if args.config_file:
+        with open(args.config_file) as f:
+            return json.load(f)
+    return default_config(args.symbol, args.seed)
 
-BASE_URL = "https://mcp.aleatoric.systems"
+
+def print_result(result: dict) -> int:
+    if result.get("valid"):
+        print(f"Valid! Hash: {result.get('hash')}")
+        print(json.dumps(result.get("config", {}), indent=2))
+        return 0
+    print(f"Invalid: {result.get('errors', [])}")
+    return 1
 
 
 def main() -> int:
@@ -30,57 +70,43 @@ def main() -> int:
     parser.add_argument("--show-schema", action="store_true", help="Print JSON Schema")
     parser.add_argument("--symbol", default="BTC", help="Symbol (default: BTC)")
     parser.add_argument("--seed", type=int, default=42, help="Seed (default: 42)")
+    parser.add_argument(
+        "--local", action="store_true", help="Validate and hash locally (cached schema)"
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="With --local, never touch the network"
+    )
     args = parser.parse_args()
 
-    api_key = os.getenv("ALEATORIC_API_KEY")
-    if not api_key:
-        print("Error: Set ALEATORIC_API_KEY environment variable", file=sys.stderr)
-        return 1
+    if args.local and args.offline:
+        validator = load_validator(None)
+        config = load_config(args)
+        print(f"Validating locally (schema {validator.version}): symbol={config.get('symbol')}")
+        return print_result(validator.validate(config))
 
-    headers = {"X-API-Key": api_key}
+    try:
+        client = AleatoricClient()
+    except MissingAPIKeyError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
 
-    with httpx.Client(timeout=30) as client:
+    with client:
         if args.show_schema:
-            resp = client.get(f"{BASE_URL}/mcp/config/schema", headers=headers)
-            resp.raise_for_status()
-            print(json.dumps(resp.json(), indent=2))
+            print(json.dumps(client.config_schema(), indent=2))
             return 0
 
-        if args.config_file:
-            with open(args.config_file) as f:
-                config = json.load(f)
-        else:
-            config = {
-                "symbol": args.symbol,
-                "seed": args.seed,
-                "tick_size": 0.01,
-                "lot_size": 0.001,
-                "initial_mid": 50000.0,
-                "initial_spread_bps": 1.0,
-                "book_depth": 10,
-                "volatility": 0.02,
-                "drift": 0.0,
-                "mean_reversion": 0.1,
-            }
+        config = load_config(args)
 
-        print(f"Validating: symbol={config.get('symbol')}, seed={config.get('seed')}")
+        if args.local:
+            validator = load_validator(client)
+            result = validator.validate(config)
+            if validator.hash_verified or not result["valid"]:
+                print(f"Validated locally (schema {validator.version})")
+                return print_result(result)
+            print("Local hash not confirmed for this schema version; asking the server")
 
-        resp = client.post(
-            f"{BASE_URL}/mcp/config/validate",
-            json={"config": config},
-            headers=headers,
-        )
-        resp.raise_for_status()
-        result = resp.json()
-
-        if result.get("valid"):
-            print(f"Valid! Hash: {result.get('hash')}")
-            print(json.dumps(result.get("config", {}), indent=2))
-        else:
-            print(f"Invalid: {result.get('errors', [])}")
-            return 1
-
-    return 0
+        print(f"Validating: symbol={config.get('symbol')}, seed={config.get('seed')}")
+        return print_result(client.validate_config(config).raw)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,8 @@
 
 This script demonstrates a minimal, publicly runnable validation flow:
 1) Health check + preset discovery
-2) Deterministic config validation (same config -> same hash)
+2) Deterministic config validation (same config -> same hash), checked by
+   recomputing the server's hash locally from the cached schema
 3) Optional cache export to Parquet for downstream inspection
 
 Run:
@@ -18,35 +19,41 @@ artifact:
 from __future__ import annotations
 
 import argparse
-import hashlib
-import os
 import sys
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 import httpx
 
-DEFAULT_BASE_URL = "https://mcp.aleatoric.systems"
+if __package__ in (None, ""):
+    # Support running as a script as well as `python -m examples.validation_showcase`
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from examples.aleatoric_client import (  # noqa: E402
+    BASE_URL,
+    HEALTH,
+    PRESETS,
+    AleatoricClient,
+    MissingAPIKeyError,
+    Preset,
+    ValidationResult,
+)
+from examples.export_download import ExportIntegrityError, download_export  # noqa: E402
+from examples.manifest_validator import load_validator  # noqa: E402
+
+DEFAULT_BASE_URL = BASE_URL
 OUTPUT_PATH = Path(__file__).parent / "outputs" / "validation_demo.parquet"
 
 
-def health_check(client: httpx.Client, base_url: str, headers: Dict[str, str]) -> None:
-    resp = client.get(f"{base_url}/mcp/health", headers=headers)
-    resp.raise_for_status()
-    data = resp.json()
-    print(f"Health: {data}")
+def health_check(health: Dict[str, Any]) -> None:
+    print(f"Health: {health}")
 
 
-def list_presets(client: httpx.Client, base_url: str, headers: Dict[str, str]) -> None:
-    resp = client.get(f"{base_url}/mcp/presets", headers=headers)
-    resp.raise_for_status()
-    presets = resp.json().get("presets", [])
+def list_presets(presets: List[Preset]) -> None:
     print(f"Found {len(presets)} presets. Showing first 3:")
     for preset in presets[:3]:
-        name = preset.get("name", "unknown")
-        exchange = preset.get("exchange", "n/a")
-        ptype = preset.get("type", "n/a")
-        print(f"  - {name} (exchange={exchange}, type={ptype})")
+        exchange = preset.exchange or "n/a"
+        print(f"  - {preset.name} (exchange={exchange}, type={preset.type or 'n/a'})")
 
 
 def build_config(symbol: str, seed: int, duration: int) -> Dict[str, object]:
@@ -66,28 +73,20 @@ def build_config(symbol: str, seed: int, duration: int) -> Dict[str, object]:
     }
 
 
-def validate_config(
-    client: httpx.Client, base_url: str, headers: Dict[str, str], config: Dict[str, object]
-) -> Dict[str, object]:
-    resp = client.post(f"{base_url}/mcp/config/validate", json={"config": config}, headers=headers)
-    resp.raise_for_status()
-    return resp.json()
+def validate_config(client: AleatoricClient, config: Dict[str, object]) -> ValidationResult:
+    return client.validate_config(config)
 
 
 def download_cache(
-    client: httpx.Client,
-    base_url: str,
-    headers: Dict[str, str],
-    cache_key: str,
-    output_path: Path,
+    client: AleatoricClient, cache_key: str, output_path: Path
 ) -> Tuple[Path, str]:
-    resp = client.get(f"{base_url}/mcp/caches/export/{cache_key}", headers=headers)
-    resp.raise_for_status()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_bytes(resp.content)
-    sha = hashlib.sha256(resp.content).hexdigest()
-    print(f"Saved Parquet to {output_path} (sha256={sha}, bytes={len(resp.content)})")
-    return output_path, sha
+    # Streams to disk with an incremental hash and resumes an interrupted run
+    result = download_export(client, cache_key, output_path)
+    print(
+        f"Saved Parquet to {output_path} (sha256={result.sha256}, bytes={result.bytes}, "
+        f"rows={result.num_rows}, row_groups={result.num_row_groups})"
+    )
+    return result.path, result.sha256
 
 
 def main() -> int:
@@ -108,34 +107,44 @@ def main() -> int:
     )
     args = parser.parse_args()
 
-    api_key = os.getenv("ALEATORIC_API_KEY")
-    if not api_key:
-        print("Error: Set ALEATORIC_API_KEY environment variable", file=sys.stderr)
+    try:
+        client = AleatoricClient(base_url=args.base_url)
+    except MissingAPIKeyError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
         return 1
 
-    headers = {"X-API-Key": api_key}
-
-    with httpx.Client(timeout=30) as client:
-        health_check(client, args.base_url, headers)
-        if not args.skip_presets:
-            list_presets(client, args.base_url, headers)
+    with client:
+        # Health and presets are independent; fetch them concurrently
+        if args.skip_presets:
+            health_check(client.health())
+        else:
+            health, presets = client.call_many([HEALTH, PRESETS])
+            health_check(health)
+            list_presets(presets)
 
         config = build_config(args.symbol, args.seed, args.duration)
-        first = validate_config(client, args.base_url, headers, config)
-        second = validate_config(client, args.base_url, headers, config)
-
-        print(f"Validation #1: valid={first.get('valid')} hash={first.get('hash')}")
-        print(f"Validation #2: valid={second.get('valid')} hash={second.get('hash')}")
-        if first.get("hash") != second.get("hash"):
-            print("Warning: Hash mismatch on identical configs (expected deterministic hash)")
+        first = validate_config(client, config)
+        print(f"Server validation: valid={first.valid} hash={first.hash}")
+
+        # The local canonical hash stands in for a second server round trip
+        validator = load_validator(client)
+        local = validator.validate(config)
+        print(f"Local validation:  valid={local['valid']} hash={local.get('hash')}")
+        if validator.matches_server_hash(config, first.hash):
+            print(f"Deterministic hash confirmed locally (schema {validator.version})")
         else:
-            print("Deterministic hash confirmed for identical configs")
-
-        cache_key = args.cache_key or first.get("cache_key") or first.get("hash")
+            second = validate_config(client, config)
+            print(f"Server validation #2: hash={second.hash}")
+            if first.hash != second.hash:
+                print("Warning: Hash mismatch on identical configs (expected deterministic hash)")
+            else:
+                print("Deterministic hash confirmed by the server (local hash scheme differs)")
+
+        cache_key = args.cache_key or first.cache_key or first.hash
         if cache_key:
             try:
-                download_cache(client, args.base_url, headers, cache_key, args.output)
-            except httpx.HTTPError as exc:
+                download_cache(client, cache_key, args.output)
+            except (httpx.HTTPError, ExportIntegrityError) as exc:
                 print(f"Cache export failed for key={cache_key}: {exc}")
         else:
             print("No cache key provided or returned; skipping export.")
@@ -7,41 +7,123 @@ remote Aleatoric Production API via the standard MCP JSON-RPC 2.0 protocol.
 It enables compatibility with clients that require a local stdio transport
 (like MCP Inspector or Claude Desktop running locally).
 
+Modes:
+    python server.py             stdio bridge for one MCP host (default)
+    python server.py --daemon    one shared bridge serving many hosts over a
+                                 Unix domain socket
+    python server.py --connect   thin stdio shim that relays one host to the
+                                 daemon, starting it on first use
+
+In daemon mode every session shares one upstream connection pool, the
+response cache, the Arrow spool and the upstream concurrency limit.
+
 Protocol Version: 2024-11-05
 Server Version: 0.4.7
 """
 
+import argparse
+import base64
+import hashlib
 import json
 import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 import httpx
 
+try:
+    import pyarrow as pa
+    HAVE_ARROW = True
+except ImportError:  # Arrow spool is optional; datasets then stay inline JSON
+    HAVE_ARROW = False
+
 # Configuration
 API_BASE_URL = os.getenv("MCP_BASE_URL", "https://mcp.aleatoric.systems")
 API_KEY = os.getenv("ALEATORIC_API_KEY")
 
-if not API_KEY:
-    sys.stderr.write("Error: ALEATORIC_API_KEY must be set.\n")
-    sys.exit(1)
-
 MCP_PROTOCOL_VERSION = "2024-11-05"
 SERVER_NAME = "aleatoric-bridge"
 SERVER_VERSION = "0.4.7"
 
+# Arrow IPC spool (opt-in with ALEATORIC_SPOOL=1): tabular tool results are
+# also written here as memory-mappable files, and the result gains a pointer
+# to the file next to the inline JSON, which the MCP host still sees.
+# /dev/shm keeps the files in shared memory on Linux.
+SPOOL_ENABLED = HAVE_ARROW and os.getenv("ALEATORIC_SPOOL", "0") == "1"
+_UID = os.getuid() if hasattr(os, "getuid") else None
+SPOOL_DIR = os.getenv("ALEATORIC_SPOOL_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    f"aleatoric-spool-{_UID if _UID is not None else 'user'}",
+)
+SPOOL_MIN_ROWS = int(os.getenv("ALEATORIC_SPOOL_MIN_ROWS", "100"))
+SPOOL_MAX_BYTES = int(os.getenv("ALEATORIC_SPOOL_MAX_BYTES", str(2 << 30)))
+ARROW_MIME_TYPE = "application/vnd.apache.arrow.file"
+DATASET_KEYS = ("data", "rows", "records", "ticks", "trades", "candles", "book")
+
+# Shared upstream state (one per process; in daemon mode, shared by all sessions)
+MAX_UPSTREAM = int(os.getenv("ALEATORIC_MAX_UPSTREAM", "8"))
+CACHE_TTL = float(os.getenv("ALEATORIC_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("ALEATORIC_CACHE_MAX_ENTRIES", "512"))
+# Listing methods and tools whose result depends only on their arguments
+CACHEABLE_METHODS = {"tools/list", "resources/list", "resources/templates/list", "prompts/list"}
+CACHEABLE_TOOLS = {
+    "get_presets",
+    "get_venue_details",
+    "get_config_schema",
+    "validate_config",
+}
+# Random draws unless seeded: only cached when the arguments carry a seed
+SEEDED_TOOLS = {"simulate_funding_regime", "generate_dataset"}
+# A daemon serves every shim with its own API key and base URL, so shims
+# only share a daemon started with the same pair: the pair's hash is in the
+# default socket name and is checked in a handshake on connect
+BRIDGE_IDENTITY = hashlib.sha256(f"{API_KEY or ''}\0{API_BASE_URL}".encode()).hexdigest()[:16]
+IDENTITY_METHOD = "aleatoric/bridgeIdentity"
+DEFAULT_SOCKET = os.getenv("ALEATORIC_BRIDGE_SOCKET") or os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"aleatoric-bridge-{_UID if _UID is not None else 'user'}-{BRIDGE_IDENTITY}.sock",
+)
+
+_http = None
+_http_lock = threading.Lock()
+_upstream_slots = threading.BoundedSemaphore(MAX_UPSTREAM)
+_cache = OrderedDict()
+_inflight = {}
+_cache_lock = threading.Lock()
+
 
 def log(msg):
     sys.stderr.write(f"[Aleatoric Bridge] {msg}\n")
     sys.stderr.flush()
 
 
+def get_http():
+    """The process-wide pooled upstream client, created on first use."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            limits = httpx.Limits(
+                max_connections=MAX_UPSTREAM, max_keepalive_connections=MAX_UPSTREAM
+            )
+            _http = httpx.Client(timeout=120.0, limits=limits)
+        return _http
+
+
 def proxy_to_remote(req):
     """
     Proxy a JSON-RPC request to the remote Aleatoric MCP endpoint.
     The remote server implements the standard MCP JSON-RPC 2.0 protocol.
     """
     try:
-        with httpx.Client(timeout=120.0) as client:
-            resp = client.post(
+        with _upstream_slots:
+            resp = get_http().post(
                 f"{API_BASE_URL}/mcp",
                 headers={
                     "X-API-Key": API_KEY,
@@ -49,8 +131,8 @@ def proxy_to_remote(req):
                 },
                 json=req
             )
-            resp.raise_for_status()
-            return resp.json()
+        resp.raise_for_status()
+        return resp.json()
     except httpx.HTTPStatusError as e:
         log(f"HTTP error from remote: {e.response.status_code} - {e.response.text}")
         return {
@@ -70,6 +152,299 @@ def proxy_to_remote(req):
         }
 
 
+def _as_table(value):
+    """
+    Return a pyarrow Table if `value` looks like a dataset: a list of flat
+    records, or a dict of equal-length column lists. Otherwise None.
+    """
+    if isinstance(value, list) and len(value) >= SPOOL_MIN_ROWS:
+        if not all(isinstance(row, dict) for row in value):
+            return None
+        # Columns from every record's keys, not just the first one's (from_pylist
+        # would silently drop fields that only later records carry)
+        keys = dict.fromkeys(key for row in value for key in row)
+        try:
+            return pa.Table.from_pydict({key: [row.get(key) for row in value] for key in keys})
+        except (pa.ArrowException, TypeError, ValueError):
+            return None
+    if isinstance(value, dict) and value:
+        columns = list(value.values())
+        if not all(isinstance(c, list) for c in columns):
+            return None
+        length = len(columns[0])
+        if length < SPOOL_MIN_ROWS or any(len(c) != length for c in columns):
+            return None
+        try:
+            return pa.Table.from_pydict(value)
+        except (pa.ArrowException, TypeError, ValueError):
+            return None
+    return None
+
+
+def _find_dataset(payload):
+    """
+    Locate the dataset in a decoded tool result.
+
+    Returns (table, key) where key is the top-level field that held it, or
+    None when the whole payload is the dataset. Returns (None, None) if the
+    payload is not tabular.
+    """
+    table = _as_table(payload)
+    if table is not None:
+        return table, None
+    if isinstance(payload, dict):
+        for key in DATASET_KEYS:
+            table = _as_table(payload.get(key))
+            if table is not None:
+                return table, key
+    return None, None
+
+
+def _trim_spool(keep):
+    """Delete the oldest spool files until the spool fits SPOOL_MAX_BYTES."""
+    entries = []
+    for name in os.listdir(SPOOL_DIR):
+        path = os.path.join(SPOOL_DIR, name)
+        if name.endswith(".arrow") and path != keep:
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= SPOOL_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _ensure_spool_dir():
+    """
+    Create the spool directory user-only (0700), or check an existing one.
+
+    Raises OSError if it is a symlink, belongs to another user, or is
+    readable by others, since spooled datasets and planted files would
+    then cross between users.
+    """
+    os.makedirs(os.path.dirname(SPOOL_DIR) or ".", exist_ok=True)
+    try:
+        os.mkdir(SPOOL_DIR, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(SPOOL_DIR)
+    if not stat.S_ISDIR(st.st_mode):
+        raise OSError(f"{SPOOL_DIR} is not a directory")
+    if _UID is not None:
+        if st.st_uid != _UID:
+            raise OSError(f"{SPOOL_DIR} belongs to uid {st.st_uid}, not {_UID}")
+        if st.st_mode & 0o077:
+            os.chmod(SPOOL_DIR, 0o700)
+
+
+def _same_contents(path, data, digest):
+    """True if the file at `path` holds exactly `data` (sha256 `digest`)."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        return sha.hexdigest() == digest
+    except OSError:
+        return False
+
+
+def spool_table(table):
+    """
+    Write `table` to the spool as an Arrow IPC file and return its path.
+
+    Files are named by content hash, so a repeated dataset reuses the file
+    already on disk once its contents are checked. The write goes to a
+    user-only temp file first and is renamed, so readers never see a
+    partial file.
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    data = sink.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+
+    _ensure_spool_dir()
+    path = os.path.join(SPOOL_DIR, f"{digest[:32]}.arrow")
+    if _same_contents(path, data, digest):
+        os.utime(path)
+    else:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        _trim_spool(path)
+    return path
+
+
+def spool_uri(path):
+    return "file://" + os.path.abspath(path)
+
+
+def offload_datasets(resp):
+    """
+    Spool tabular JSON text in a tools/call result as Arrow IPC files.
+
+    Each such text item is kept as is and followed by a text item
+    ``{"arrow": {"uri", "field", "rows", "schema"}}`` whose ``file://`` URI
+    points at the spooled file, so local consumers can memory-map the
+    columns while the MCP host still reads the rows inline.
+    """
+    if not SPOOL_ENABLED or not isinstance(resp, dict):
+        return resp
+    result = resp.get("result")
+    if not isinstance(result, dict) or not isinstance(result.get("content"), list):
+        return resp
+
+    content = []
+    for item in result["content"]:
+        if not (isinstance(item, dict) and item.get("type") == "text"):
+            content.append(item)
+            continue
+        try:
+            payload = json.loads(item.get("text", ""))
+        except (TypeError, ValueError):
+            content.append(item)
+            continue
+        table, key = _find_dataset(payload)
+        if table is None:
+            content.append(item)
+            continue
+
+        content.append(item)
+        try:
+            path = spool_table(table)
+        except OSError as e:
+            log(f"Arrow spool write failed, returning inline JSON only: {e}")
+            continue
+
+        pointer = {
+            "arrow": {
+                "uri": spool_uri(path),
+                "field": key,
+                "rows": table.num_rows,
+                "schema": {f.name: str(f.type) for f in table.schema},
+            }
+        }
+        content.append({"type": "text", "text": json.dumps(pointer)})
+        log(f"Spooled {table.num_rows} rows to {path}")
+
+    result["content"] = content
+    return resp
+
+
+def read_spool_resource(req):
+    """
+    Answer resources/read for a spooled Arrow file locally (the remote server
+    does not know about it). Returns None for any other URI.
+    """
+    uri = req.get("params", {}).get("uri", "")
+    if not uri.startswith("file://"):
+        return None
+    path = os.path.realpath(uri[len("file://"):])
+    if os.path.dirname(path) != os.path.realpath(SPOOL_DIR) or not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        blob = base64.b64encode(f.read()).decode("ascii")
+    return {
+        "jsonrpc": "2.0",
+        "id": req.get("id"),
+        "result": {
+            "contents": [{"uri": uri, "mimeType": ARROW_MIME_TYPE, "blob": blob}]
+        },
+    }
+
+
+def _has_seed(arguments):
+    """True if `arguments` (or a config nested in them) sets a seed."""
+    if not isinstance(arguments, dict):
+        return False
+    if arguments.get("seed") is not None:
+        return True
+    return any(_has_seed(value) for value in arguments.values() if isinstance(value, dict))
+
+
+def cache_key(req):
+    """Key for a cacheable request (method + canonical params), else None."""
+    method = req.get("method")
+    params = req.get("params") or {}
+    tool = params.get("name") if method == "tools/call" else None
+    if (
+        method in CACHEABLE_METHODS
+        or tool in CACHEABLE_TOOLS
+        or tool in SEEDED_TOOLS and _has_seed(params.get("arguments"))
+    ):
+        return json.dumps([method, params], sort_keys=True, separators=(",", ":"))
+    return None
+
+
+def _spool_files_exist(resp):
+    """False if a cached result points at a spool file that has since been evicted."""
+    for item in resp.get("result", {}).get("content", []):
+        text = item.get("text", "") if isinstance(item, dict) else ""
+        if not text.startswith('{"arrow":'):
+            continue  # Skip the inline rows without decoding them
+        uri = json.loads(text)["arrow"]["uri"]
+        if not os.path.exists(uri[len("file://"):]):
+            return False
+    return True
+
+
+def cached_call(req, fetch):
+    """
+    Serve `req` from the shared cache, or call `fetch(req)` once.
+
+    Identical requests that arrive while the first is still in flight wait
+    for its result instead of going upstream again. Only successful results
+    are cached (not JSON-RPC errors, nor tool results flagged ``isError``);
+    the response id is always rewritten to the caller's.
+    """
+    key = cache_key(req)
+    if key is None or CACHE_TTL <= 0:
+        return fetch(req)
+
+    while True:
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry and entry[0] > time.monotonic() and _spool_files_exist(entry[1]):
+                _cache.move_to_end(key)
+                return dict(entry[1], id=req.get("id"))
+            waiter = _inflight.get(key)
+            if waiter is None:
+                _inflight[key] = threading.Event()
+                break
+        waiter.wait()
+        # Leader finished: loop to read its cached result (or lead a retry)
+
+    try:
+        resp = fetch(req)
+        if isinstance(resp, dict) and "result" in resp and not resp["result"].get("isError"):
+            with _cache_lock:
+                _cache[key] = (time.monotonic() + CACHE_TTL, resp)
+                _cache.move_to_end(key)
+                while len(_cache) > CACHE_MAX_ENTRIES:
+                    _cache.popitem(last=False)
+        return resp
+    finally:
+        with _cache_lock:
+            _inflight.pop(key).set()
+
+
+def _fetch(req):
+    resp = proxy_to_remote(req)
+    if req.get("method") == "tools/call":
+        resp = offload_datasets(resp)
+    return resp
+
+
 def handle_request(req):
     """
     Handle an incoming JSON-RPC request.
@@ -98,23 +473,29 @@ def handle_request(req):
             }
         }
 
+    # Lets a shim check that the daemon uses its API key and base URL
+    if method == IDENTITY_METHOD:
+        return {"jsonrpc": "2.0", "id": msg_id, "result": {"identity": BRIDGE_IDENTITY}}
+
     # Notifications don't need a response
     if method == "notifications/initialized":
         return None
 
+    if method == "resources/read" and SPOOL_ENABLED:
+        local = read_spool_resource(req)
+        if local is not None:
+            return local
+
     # All other methods are proxied to the remote server
     # This includes: ping, tools/list, tools/call
-    return proxy_to_remote(req)
-
+    return cached_call(req, _fetch)
 
-def main():
-    log(f"Starting stdio bridge server v{SERVER_VERSION}...")
-    log(f"Remote endpoint: {API_BASE_URL}/mcp")
-    log(f"Protocol version: {MCP_PROTOCOL_VERSION}")
 
+def serve_stream(reader, writer):
+    """Answer newline-delimited JSON-RPC from `reader` until EOF."""
     while True:
         try:
-            line = sys.stdin.readline()
+            line = reader.readline()
             if not line:
                 break
 
@@ -122,8 +503,8 @@ def main():
             resp = handle_request(req)
 
             if resp:
-                sys.stdout.write(json.dumps(resp) + "\n")
-                sys.stdout.flush()
+                writer.write(json.dumps(resp) + "\n")
+                writer.flush()
 
         except json.JSONDecodeError as e:
             log(f"Invalid JSON: {e}")
@@ -132,12 +513,239 @@ def main():
                 "id": None,
                 "error": {"code": -32700, "message": "Parse error"}
             }
-            sys.stdout.write(json.dumps(error_resp) + "\n")
-            sys.stdout.flush()
+            writer.write(json.dumps(error_resp) + "\n")
+            writer.flush()
         except Exception as e:
             log(f"Loop error: {e}")
             break
 
 
+def _peer_uid(sock):
+    """Uid of the process at the other end of a Unix socket, or None if unknown."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None  # Linux only; elsewhere the socket's 0600 mode is the guard
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def _same_user(sock):
+    uid = _peer_uid(sock)
+    return uid is None or _UID is None or uid == _UID
+
+
+class _Session(socketserver.StreamRequestHandler):
+    """One MCP host connected to the daemon."""
+
+    def handle(self):
+        server = self.server
+        if not _same_user(self.connection):
+            log(f"Rejected connection from uid {_peer_uid(self.connection)}")
+            return
+        with server.sessions_lock:
+            server.sessions += 1
+        try:
+            reader = self.connection.makefile("r", encoding="utf-8")
+            writer = self.connection.makefile("w", encoding="utf-8")
+            serve_stream(reader, writer)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with server.sessions_lock:
+                server.sessions -= 1
+                server.last_active = time.monotonic()
+
+
+def run_daemon(socket_path, idle_exit=0.0):
+    """
+    Serve every connecting MCP host on `socket_path` from this one process.
+
+    Exits after `idle_exit` seconds with no sessions (0 = never).
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            log(f"Daemon already running on {socket_path}")
+            return 0
+        except OSError:
+            os.unlink(socket_path)  # Stale socket from a dead daemon
+        finally:
+            probe.close()
+
+    old_umask = os.umask(0o177)  # Socket is usable by this user only
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, _Session)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    server.sessions = 0
+    server.sessions_lock = threading.Lock()
+    server.last_active = time.monotonic()
+
+    if idle_exit > 0:
+        def watch_idle():
+            while True:
+                time.sleep(min(idle_exit, 5.0))
+                with server.sessions_lock:
+                    idle = server.sessions == 0 and (
+                        time.monotonic() - server.last_active > idle_exit
+                    )
+                if idle:
+                    log(f"Idle for {idle_exit:.0f}s, shutting down")
+                    server.shutdown()
+                    return
+
+        threading.Thread(target=watch_idle, daemon=True).start()
+
+    log(f"Daemon listening on {socket_path} (max {MAX_UPSTREAM} upstream requests)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def _check_daemon(sock):
+    """
+    Why the daemon behind `sock` must not serve this shim, or None if it can.
+
+    It must run as this user and with this process's API key and base URL.
+    """
+    if not _same_user(sock):
+        return f"it runs as uid {_peer_uid(sock)}"
+    hello = {"jsonrpc": "2.0", "id": IDENTITY_METHOD, "method": IDENTITY_METHOD}
+    sock.sendall(json.dumps(hello).encode() + b"\n")
+    # Nothing else is sent before the host's first request, so this is the whole reply
+    reply = b""
+    while not reply.endswith(b"\n"):
+        data = sock.recv(4096)
+        if not data:
+            break
+        reply += data
+    try:
+        identity = json.loads(reply)["result"]["identity"]
+    except (ValueError, KeyError, TypeError):
+        return "it did not answer the identity handshake"
+    if identity != BRIDGE_IDENTITY:
+        return "it uses a different ALEATORIC_API_KEY or MCP_BASE_URL"
+    return None
+
+
+def run_shim(socket_path, autostart=True, idle_exit=900.0):
+    """
+    Relay this process's stdio to the daemon, starting the daemon if needed.
+    """
+    sock = _connect(socket_path)
+    if sock is None and autostart:
+        if not API_KEY:
+            sys.stderr.write("Error: ALEATORIC_API_KEY must be set to start the daemon.\n")
+            return 1
+        log(f"Starting bridge daemon on {socket_path}")
+        subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--daemon",
+                "--socket",
+                socket_path,
+                "--idle-exit",
+                str(idle_exit),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + 10.0
+        while sock is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            sock = _connect(socket_path)
+    if sock is None:
+        log(f"Could not reach bridge daemon on {socket_path}")
+        return 1
+    problem = _check_daemon(sock)
+    if problem:
+        sock.close()
+        log(f"Refusing the bridge daemon on {socket_path}: {problem}")
+        return 1
+
+    def upstream():
+        stdin = sys.stdin.buffer
+        try:
+            for line in iter(stdin.readline, b""):
+                sock.sendall(line)
+        except OSError:
+            pass
+        finally:
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    threading.Thread(target=upstream, daemon=True).start()
+    stdout = sys.stdout.buffer
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        stdout.write(data)
+        stdout.flush()
+    sock.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aleatoric MCP bridge")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--daemon", action="store_true", help="Serve many MCP hosts over a Unix socket"
+    )
+    mode.add_argument(
+        "--connect", action="store_true", help="Relay stdio to the daemon (starts it if needed)"
+    )
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument(
+        "--idle-exit",
+        type=float,
+        default=None,
+        help="Daemon exits after this many idle seconds (default: never; 900 when autostarted)",
+    )
+    parser.add_argument(
+        "--no-autostart", action="store_true", help="With --connect, fail if no daemon is running"
+    )
+    args = parser.parse_args()
+
+    if args.connect:
+        idle_exit = 900.0 if args.idle_exit is None else args.idle_exit
+        return run_shim(args.socket, not args.no_autostart, idle_exit)
+
+    if not API_KEY:
+        sys.stderr.write("Error: ALEATORIC_API_KEY must be set.\n")
+        return 1
+
+    log(f"Starting {'daemon' if args.daemon else 'stdio'} bridge server v{SERVER_VERSION}...")
+    log(f"Remote endpoint: {API_BASE_URL}/mcp")
+    log(f"Protocol version: {MCP_PROTOCOL_VERSION}")
+    if SPOOL_ENABLED:
+        log(f"Arrow spool: {SPOOL_DIR} (datasets >= {SPOOL_MIN_ROWS} rows)")
+
+    if args.daemon:
+        return run_daemon(args.socket, args.idle_exit or 0.0)
+    serve_stream(sys.stdin, sys.stdout)
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from examples.aleatoric_client import (  # noqa: E402
+    AleatoricClient,
+    AsyncAleatoricClient,
+    ValidationResult,
+)
+
+BASE_URL = "https://example.test"
+
+
+def _validation_handler(requests):
+    """Answers ``/mcp/config/validate`` with a hash derived from the config's seed."""
+    lock = threading.Lock()
+
+    def handler(request):
+        config = json.loads(request.content)["config"]
+        with lock:
+            requests.append(config)
+        return httpx.Response(200, json={"valid": True, "hash": f"h{config['seed']}"})
+
+    return handler
+
+
+def test_conditional_get_reuses_cached_body_on_304():
+    """A repeat GET sends If-None-Match and a 304 returns the cached body."""
+    schema = {"type": "object", "properties": {"symbol": {"type": "string"}}}
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=schema, headers={"etag": '"v1"'})
+
+    with AleatoricClient("test", BASE_URL, transport=httpx.MockTransport(handler)) as client:
+        assert client.config_schema() == schema
+        assert client.etag(requests[0].url.path) == '"v1"'
+        assert client.config_schema() == schema
+
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert requests[1].headers["x-api-key"] == "test"
+
+
+def test_call_many_sends_duplicates_once_in_input_order():
+    """Identical calls share one request; results line up with the inputs."""
+    requests = []
+    transport = httpx.MockTransport(_validation_handler(requests))
+    configs = [{"seed": 1}, {"seed": 2}, {"seed": 1}, {"seed": 3}, {"seed": 2}]
+
+    with AleatoricClient("test", BASE_URL, transport=transport) as client:
+        results = client.validate_configs(configs)
+
+    assert [r.hash for r in results] == ["h1", "h2", "h1", "h3", "h2"]
+    assert all(isinstance(r, ValidationResult) for r in results)
+    assert results[0] is results[2]
+    assert sorted(c["seed"] for c in requests) == [1, 2, 3]
+
+
+def test_async_call_many_sends_duplicates_once_in_input_order():
+    """The async client deduplicates and orders the same way."""
+    requests = []
+    transport = httpx.MockTransport(_validation_handler(requests))
+    configs = [{"seed": 2}, {"seed": 2}, {"seed": 1}]
+
+    async def run():
+        async with AsyncAleatoricClient("test", BASE_URL, transport=transport) as client:
+            return await client.validate_configs(configs)
+
+    assert [r.hash for r in asyncio.run(run())] == ["h2", "h2", "h1"]
+    assert sorted(c["seed"] for c in requests) == [1, 2]
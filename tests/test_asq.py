@@ -0,0 +1,46 @@
+import logging
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from examples.asq import ASQMaker, StratConfig  # noqa: E402
+
+
+def _ticks(n=400):
+    rng = np.random.default_rng(5)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    confs = prices * 5e-4  # 5 bps: below the 15 bps breaker threshold
+    confs[150:180] = prices[150:180] * 40e-4  # Uncertainty spike trips the breaker mid-batch
+    prices[60] = 0.0  # Invalid tick: ignored
+    return prices, confs, np.arange(n, dtype=float)
+
+
+def test_on_ticks_matches_on_tick_loop(caplog):
+    """Batched ticks leave the same per-tick sigma, breaker and quotes as scalar calls."""
+    prices, confs, stamps = _ticks()
+    scalar, batched = ASQMaker("BTC", StratConfig()), ASQMaker("BTC", StratConfig())
+
+    sigma, breaker, quotes = [], [], []
+    with caplog.at_level(logging.ERROR):
+        for price, conf, ts in zip(prices, confs, stamps):
+            scalar.on_tick(price, conf, ts, inventory=3.0)
+            sigma.append(max(math.sqrt(scalar.vol_variance), scalar.cfg.sigma_min))
+            breaker.append(scalar.circuit_breaker)
+            quotes.append(scalar.get_quotes())
+
+        out = {"sigma_annual": [], "circuit_breaker": []}
+        batched_quotes = []
+        bounds = [0, 1, 61, 155, 170, 400]  # Batches ending inside and after the spike
+        for lo, hi in zip(bounds, bounds[1:]):
+            part = batched.on_ticks(prices[lo:hi], confs[lo:hi], stamps[lo:hi], inventory=3.0)
+            for key in out:
+                out[key].extend(part[key].tolist())
+            batched_quotes.append((hi - 1, batched.get_quotes()))
+
+    assert any(breaker) and not breaker[-1]
+    assert out["sigma_annual"] == sigma
+    assert out["circuit_breaker"] == breaker
+    for index, quote in batched_quotes:
+        assert quote == quotes[index]
@@ -0,0 +1,44 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from examples.asq_kernel import HAVE_NUMBA, quote_fill_block, quote_fill_block_py  # noqa: E402
+from examples.asq_test import run_monte_carlo  # noqa: E402
+
+
+def _block_inputs(paths=4, steps=500):
+    rng = np.random.default_rng(3)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 1e-3, (paths, steps)), axis=1))
+    confs = prices * rng.uniform(0.0, 0.003, (paths, steps))
+    vols = rng.uniform(0.2, 1.0, (paths, steps))
+    return prices, confs, vols, rng.random((paths, steps)), rng.random((paths, steps))
+
+
+def _run(kernel, inputs, use_signal):
+    paths, steps = inputs[0].shape
+    cash, inventory = np.full(paths, 10_000.0), np.zeros(paths)
+    navs, inventories, fills = np.empty((paths, steps)), np.empty((paths, steps)), np.zeros((2, paths))
+    kernel(*inputs, use_signal, 0.1, 1.5, 0.0015, 5.0, cash, inventory, navs, inventories, fills)
+    return cash, inventory, navs, inventories, fills
+
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="numba not installed")
+@pytest.mark.parametrize("use_signal", [False, True])
+def test_compiled_kernel_matches_python_fallback(use_signal):
+    """The njit-compiled kernel and the interpreted function agree."""
+    inputs = _block_inputs()
+    for compiled, interpreted in zip(_run(quote_fill_block, inputs, use_signal),
+                                     _run(quote_fill_block_py, inputs, use_signal)):
+        np.testing.assert_allclose(compiled, interpreted, rtol=1e-12, atol=1e-9)
+
+
+def test_kernel_engine_matches_numpy_engine():
+    """Both Monte Carlo engines give the same per-path metrics, across fill blocks."""
+    numpy = run_monte_carlo(3, steps=5_000, batch_paths=3, engine="numpy")
+    kernel = run_monte_carlo(3, steps=5_000, batch_paths=3, engine="kernel")
+
+    for name, metrics in numpy.items():
+        expected, actual = metrics.summary(), kernel[name].summary()
+        for key in expected:
+            np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-6, err_msg=f"{name} {key}")
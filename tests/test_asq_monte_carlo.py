@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from examples.asq_test import VOL_WINDOW, run_monte_carlo  # noqa: E402
+
+
+def _summaries(results):
+    return {name: metrics.summary() for name, metrics in results.items()}
+
+
+def _assert_same(left, right):
+    assert left.keys() == right.keys()
+    for name in left:
+        for key in left[name]:
+            np.testing.assert_array_equal(left[name][key], right[name][key], err_msg=f"{name} {key}")
+
+
+def test_monte_carlo_independent_of_batch_size():
+    """Splitting the paths into batches does not change any path's result."""
+    reference = _summaries(run_monte_carlo(7, steps=300, batch_paths=7, engine="numpy"))
+
+    for batch_paths in (1, 3):
+        results = run_monte_carlo(7, steps=300, batch_paths=batch_paths, engine="numpy")
+        _assert_same(_summaries(results), reference)
+
+
+def test_monte_carlo_rejects_steps_within_vol_window():
+    """Runs too short to trade a single step fail instead of reporting NaN."""
+    with pytest.raises(ValueError, match="VOL_WINDOW"):
+        run_monte_carlo(3, steps=VOL_WINDOW)
+
+
+def test_monte_carlo_independent_of_workers():
+    """A process pool gives exactly the serial result (per-path RNG streams)."""
+    serial = run_monte_carlo(6, steps=300, batch_paths=2, engine="numpy")
+    parallel = run_monte_carlo(6, steps=300, batch_paths=2, workers=3, engine="numpy")
+
+    _assert_same(_summaries(parallel), _summaries(serial))
+
+
+def test_path_streams_do_not_depend_on_neighbours():
+    """Path i is drawn from its own streams, whichever paths share its batch."""
+    from examples.asq_test import BASE_PRICE, DT_SECONDS, SIGMA_BASE, generate_paths
+
+    together = generate_paths(42, range(4), 50, DT_SECONDS, BASE_PRICE, SIGMA_BASE)
+    alone = generate_paths(42, [2], 50, DT_SECONDS, BASE_PRICE, SIGMA_BASE)
+
+    np.testing.assert_array_equal(together[0][2], alone[0][0])
+    np.testing.assert_array_equal(together[1][2], alone[1][0])
+    assert not np.array_equal(together[0][1], together[0][2])
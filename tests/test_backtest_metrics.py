@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from examples.backtest_metrics import StreamingMetrics  # noqa: E402
+
+INITIAL = 10_000.0
+ANNUALIZATION = 250.0
+
+
+def _pandas_metrics(nav):
+    """The full-history pandas computation StreamingMetrics replaces."""
+    series = pd.Series(nav)
+    vol = series.diff().std()
+    return {
+        "Ret": series.iloc[-1] - INITIAL,
+        "DD": (series - series.cummax()).min(),
+        "Sharpe": series.diff().mean() / vol * ANNUALIZATION if vol > 0 else 0.0,
+    }
+
+
+def _navs(paths=3, steps=1000):
+    rng = np.random.default_rng(7)
+    return INITIAL + np.cumsum(rng.normal(0.05, 5.0, size=(paths, steps)), axis=1)
+
+
+def _check(metrics, navs):
+    summary = metrics.summary()
+    for p, nav in enumerate(navs):
+        expected = _pandas_metrics(nav)
+        for key, value in expected.items():
+            assert summary[key][p] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+def test_update_block_matches_pandas():
+    """Blocks of any width give the full-history Ret, DD and Sharpe."""
+    navs = _navs()
+    for width in (1, 7, 256, navs.shape[1]):
+        metrics = StreamingMetrics(len(navs), INITIAL, ANNUALIZATION)
+        for start in range(0, navs.shape[1], width):
+            metrics.update_block(navs[:, start:start + width])
+        _check(metrics, navs)
+
+
+def test_merge_and_concat_match_pandas():
+    """Consecutive chunks merge, and disjoint path sets concatenate, exactly."""
+    navs = _navs(paths=4)
+    parts = []
+    for rows in (slice(0, 1), slice(1, 4)):
+        head = StreamingMetrics(rows.stop - rows.start, INITIAL, ANNUALIZATION)
+        tail = StreamingMetrics(rows.stop - rows.start, INITIAL, ANNUALIZATION)
+        head.update_block(navs[rows, :333])
+        for step in range(333, navs.shape[1]):
+            tail.update(navs[rows, step])
+        parts.append(head.merge(tail))
+
+    _check(StreamingMetrics.concat(parts), navs)
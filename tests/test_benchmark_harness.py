@@ -0,0 +1,16 @@
+from benchmarks.harness import Result, compare
+
+
+def _result(name, ops_per_sec):
+    return Result(name, "op", 1, ops_per_sec, ops_per_sec, 100.0, 10.0)
+
+
+def test_case_tolerance_widens_the_run_tolerance():
+    """A noisy case may fall further than the run's tolerance before it regresses."""
+    baseline = {"cases": {name: {"ops_per_sec": 100.0} for name in ("quiet", "noisy")}}
+    results = [_result("quiet", 65.0), _result("noisy", 65.0)]
+
+    changes = compare(results, baseline, 0.25, {"noisy": 0.4})
+
+    regressed = {c.name for c in changes if c.metric == "ops_per_sec" and c.regressed}
+    assert regressed == {"quiet"}
@@ -0,0 +1,77 @@
+import heapq
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from examples.asq_test import BASE_PRICE, SIGMA_BASE, generate_paths  # noqa: E402
+from examples.event_scheduler import TimerWheel  # noqa: E402
+from examples.latency_backtest import DT_SECONDS, LatencyProfile, run_latency_backtest  # noqa: E402
+
+
+def _fuzz(seed, bits=3, levels=3):
+    """Run one random schedule through a small wheel and a heapq reference."""
+    rng = random.Random(seed)
+    horizon = 1 << (bits * levels)
+    wheel = TimerWheel(start=rng.randrange(1000), bits=bits, levels=levels)
+    reference = []  # (time, label)
+    ids = {}
+    label = 0
+    fired, expected = [], []
+
+    def schedule(now, span):
+        nonlocal label
+        time = now + rng.randrange(-2, span)  # Past times fire at now
+        ids[label] = wheel.schedule(time, 1, label)
+        heapq.heappush(reference, (max(time, now), label))
+        label += 1
+
+    for _ in range(200):
+        schedule(wheel.now, 3 * horizon)  # Some land past the horizon (overflow)
+    cancelled = set(rng.sample(range(label), 40))
+    for event in cancelled:
+        wheel.cancel(ids[event])
+
+    for _ in range(60):
+        until = wheel.now + rng.randrange(horizon // 2)
+        for time, kind, event, _ in wheel.pop_until(until):
+            fired.append((time, event))
+            if rng.random() < 0.3:  # Schedule while iterating, sometimes due by ``until``
+                schedule(time, horizon)
+        while reference and reference[0][0] <= until:
+            expected.append(heapq.heappop(reference))
+    for time, kind, event, _ in wheel.drain():
+        fired.append((time, event))
+    expected += sorted(reference)
+
+    expected = [(time, event) for time, event in expected if event not in cancelled]
+    assert [time for time, _ in fired] == sorted(time for time, _ in fired)
+    assert sorted(fired) == sorted(expected)
+    assert [time for time, _ in fired] == [time for time, _ in expected]
+    assert len(wheel) == 0
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_timer_wheel_matches_heapq(seed):
+    """Firing times match a heap, with cancellations, reentrant scheduling and overflow."""
+    _fuzz(seed)
+
+
+def test_capacity_presizes_event_slots():
+    """A capacity hint allocates the buffers once."""
+    wheel = TimerWheel(capacity=5000)
+    for i in range(5000):
+        wheel.schedule(i)
+    assert len(wheel._time) == 5000
+    assert [event[0] for event in wheel.drain()] == list(range(5000))
+
+
+def test_zero_latency_backtest_has_no_crossed_fills_or_overtaken_quotes():
+    """With every delay at zero, quotes always price the current tick."""
+    prices, confs = generate_paths(7, [0], 5000, DT_SECONDS, BASE_PRICE, SIGMA_BASE)
+    timestamps = np.arange(prices.shape[1]) * DT_SECONDS
+    result = run_latency_backtest(prices[0], confs[0], timestamps, LatencyProfile.zero(), seed=7)
+    assert result.quotes_sent > 0 and result.fills > 0
+    assert result.crossed_fills == 0
+    assert result.quotes_overtaken == 0
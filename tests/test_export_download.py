@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from examples.export_download import download_export  # noqa: E402
+
+
+class FakeClient:
+    """Just enough of ``AleatoricClient`` for ``download_export``."""
+
+    def __init__(self, handler):
+        self.headers = {"X-API-Key": "test"}
+        self.http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    def url(self, path):
+        return f"https://example.test{path}"
+
+
+def _parquet(values):
+    buf = io.BytesIO()
+    pq.write_table(pa.table({"x": values}), buf)
+    return buf.getvalue()
+
+
+def test_partial_file_without_validator_restarts_from_zero(tmp_path):
+    """A .part with no saved ETag/Last-Modified is refetched whole, not ranged."""
+    body = _parquet(list(range(100)))
+    output = tmp_path / "export.parquet"
+    (tmp_path / "export.parquet.part").write_bytes(_parquet([-1] * 100)[:50])
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=body)
+
+    result = download_export(FakeClient(handler), "key", output, write_manifest=False)
+
+    assert "range" not in requests[0].headers
+    assert output.read_bytes() == body
+    assert not result.resumed
+
+
+def test_partial_file_with_etag_resumes_with_if_range(tmp_path):
+    """A .part with a saved strong ETag asks for the rest, guarded by If-Range."""
+    body = _parquet(list(range(100)))
+    output = tmp_path / "export.parquet"
+    (tmp_path / "export.parquet.part").write_bytes(body[:50])
+    (tmp_path / "export.parquet.part.json").write_text('{"etag": "\\"v1\\"", "last_modified": null}')
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        headers = {"content-range": f"bytes 50-{len(body) - 1}/{len(body)}", "etag": '"v1"'}
+        return httpx.Response(206, content=body[50:], headers=headers)
+
+    result = download_export(FakeClient(handler), "key", output, write_manifest=False)
+
+    assert requests[0].headers["range"] == "bytes=50-"
+    assert requests[0].headers["if-range"] == '"v1"'
+    assert output.read_bytes() == body
+    assert result.resumed
@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from examples.feature_pipeline import FeaturePipeline  # noqa: E402
+
+
+def _write(path, seed, rows=500):
+    prices = 100.0 + np.random.default_rng(seed).normal(0, 0.1, rows).cumsum()
+    table = pa.table({"timestamp": np.arange(rows, dtype=np.int64), "price": prices})
+    pq.write_table(table, path, row_group_size=100)
+    return prices
+
+
+def test_rewritten_file_with_same_row_count_is_recomputed(tmp_path):
+    """Cached features follow the file's content, not just its row count."""
+    path = tmp_path / "data.parquet"
+    _write(path, seed=1)
+    FeaturePipeline([path]).table()
+
+    prices = _write(path, seed=2)
+    pipeline = FeaturePipeline([path])
+    mids = pipeline.table().column("mid").to_numpy()
+
+    assert pipeline.stats.chunks_reused == 0
+    np.testing.assert_allclose(mids, prices)
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("pyarrow")
+
+from examples.funding_simulation import _attach_list_values, _parse_floats  # noqa: E402
+
+
+def test_negative_list_values_parse_with_or_without_equals():
+    """``--basis-bps -20,-5`` reaches argparse as ``--basis-bps=-20,-5``."""
+    argv = ["--sweep", "--basis-bps", "-20,-5,0,5,20", "--sizes", "0.1,1,10"]
+
+    assert _attach_list_values(argv) == ["--sweep", "--basis-bps=-20,-5,0,5,20", "--sizes=0.1,1,10"]
+    assert _attach_list_values(["--basis-bps=-20,-5"]) == ["--basis-bps=-20,-5"]
+    assert _attach_list_values(["--basis-bps", "--sweep"]) == ["--basis-bps", "--sweep"]
+    assert _parse_floats("-20,-5,0,5,20") == [-20.0, -5.0, 0.0, 5.0, 20.0]
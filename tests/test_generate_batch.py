@@ -0,0 +1,46 @@
+import io
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("httpx")
+
+from examples.generate_batch import merge_chunks  # noqa: E402
+
+
+def _chunk(start, rows):
+    buffer = io.BytesIO()
+    table = pa.table({"timestamp": list(range(start, start + rows)), "price": [100.0] * rows})
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def test_merge_writes_one_row_group_per_chunk(tmp_path):
+    """Unequal chunks still map one-to-one onto row groups and Merkle leaves."""
+    sizes = [3000, 2900, 3100, 1000]
+    starts = [sum(sizes[:i]) for i in range(len(sizes))]
+    output = tmp_path / "merged.parquet"
+
+    rows, _, manifest = merge_chunks([_chunk(s, n) for s, n in zip(starts, sizes)], str(output))
+
+    metadata = pq.ParquetFile(output).metadata
+    assert rows == sum(sizes)
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == sizes
+    assert [leaf.rows for leaf in manifest.leaves] == sizes
+
+
+def test_loads_without_pyarrow_and_falls_back(monkeypatch):
+    """Without pyarrow the module still imports and merge_chunks raises ImportError."""
+    import importlib
+    import sys
+
+    for name in ("pyarrow", "pyarrow.parquet", "numpy"):
+        monkeypatch.setitem(sys.modules, name, None)
+    for name in ("examples.generate_batch", "examples.merkle_manifest", "examples.quantile_sketch"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    module = importlib.import_module("examples.generate_batch")
+
+    with pytest.raises(ImportError):
+        module.merge_chunks([b""], "unused.parquet")
@@ -0,0 +1,74 @@
+from examples.aleatoric_client import ValidationResult
+from examples.manifest_validator import PROBE_CONFIG, ManifestValidator, load_validator
+
+SCHEMA = {
+    "version": "1",
+    "type": "object",
+    "required": ["symbol"],
+    "properties": {
+        "symbol": {"type": "string"},
+        "seed": {"type": "integer", "default": 0},
+        "book": {"$ref": "#/$defs/Book", "default": {}},
+        "fees": {"anyOf": [{"$ref": "#/$defs/Fees"}, {"type": "null"}], "default": None},
+    },
+    "$defs": {
+        "Book": {
+            "type": "object",
+            "properties": {
+                "depth": {"type": "integer", "default": 10},
+                "levels": {"type": "array", "items": {"$ref": "#/$defs/Level"}},
+            },
+        },
+        "Level": {"type": "object", "properties": {"size": {"type": "number", "default": 1.0}}},
+        "Fees": {"type": "object", "properties": {"maker_bps": {"type": "number", "default": 1.0}}},
+    },
+}
+
+
+class FakeClient:
+    """Serves ``SCHEMA`` and answers validation with ``response``."""
+
+    def __init__(self, response):
+        self.response = response
+        self.probes = []
+
+    def seed_cache(self, path, etag, data):
+        pass
+
+    def config_schema(self):
+        return SCHEMA
+
+    def etag(self, path):
+        return None
+
+    def validate_config(self, config):
+        self.probes.append(config)
+        return self.response(config)
+
+
+def test_normalize_fills_nested_defaults():
+    """Defaults apply inside nested objects, $refs, array items and Optional models."""
+    validator = ManifestValidator(SCHEMA)
+    config = {"symbol": "BTC", "book": {"levels": [{}, {"size": 2.0}]}, "fees": {}}
+    assert validator.normalize(config) == {
+        "symbol": "BTC",
+        "seed": 0,
+        "book": {"depth": 10, "levels": [{"size": 1.0}, {"size": 2.0}]},
+        "fees": {"maker_bps": 1.0},
+    }
+    assert validator.normalize({"symbol": "BTC"})["book"] == {"depth": 10}
+    assert validator.hash({"symbol": "BTC"}) == validator.hash({"symbol": "BTC", "book": {"depth": 10}})
+
+
+def test_probe_without_server_hash_is_not_cached(tmp_path):
+    """An invalid or hashless probe leaves hash_verified unset so the next run retries."""
+    client = FakeClient(lambda config: ValidationResult(valid=False, errors=["boom"]))
+    assert load_validator(client, tmp_path).hash_verified is None
+    assert load_validator(client, tmp_path).hash_verified is None
+    assert client.probes == [PROBE_CONFIG, PROBE_CONFIG]
+
+    local = ManifestValidator(SCHEMA)
+    client.response = lambda config: ValidationResult(valid=True, hash=local.hash(config))
+    assert load_validator(client, tmp_path).hash_verified is True
+    assert load_validator(client, tmp_path).hash_verified is True
+    assert len(client.probes) == 3
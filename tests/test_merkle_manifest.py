@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from examples.merkle_manifest import hash_table, tree_levels  # noqa: E402
+
+
+def _table():
+    return pa.table({
+        "ts": pa.array([datetime.datetime(2025, 1, 1, 0, 0, i) for i in range(6)], pa.timestamp("ns")),
+        "price": [100.0, None, 101.5, 102.0, 99.0, 98.5],
+        "symbol": ["BTC", "BTC", None, "ETH", "ETH", "BTC"],
+        "raw": [b"a", b"", None, b"xyz", b"q", b"r"],
+        "flag": [True, False, None, True, True, False],
+    })
+
+
+def test_hash_ignores_metadata_chunking_encoding_and_offsets():
+    table = _table()
+    expected = hash_table(table)
+
+    with_metadata = table.replace_schema_metadata({b"pandas": b"{}"})
+    chunked = pa.concat_tables([table.slice(0, 2), table.slice(2)])
+    encoded = table.set_column(2, "symbol", table.column("symbol").dictionary_encode())
+    padded = pa.concat_tables([_table(), table]).slice(6)  # Non-zero buffer offsets
+
+    for variant in (with_metadata, chunked, encoded, padded):
+        assert hash_table(variant) == expected
+
+
+def test_hash_depends_on_values_names_and_nulls():
+    table = _table()
+    expected = hash_table(table)
+
+    changed = table.set_column(1, "price", pa.array([100.0, None, 101.5, 102.0, 99.0, 98.6]))
+    renamed = table.rename_columns(["ts", "px", "symbol", "raw", "flag"])
+    filled = table.set_column(1, "price", pa.array([100.0, 0.0, 101.5, 102.0, 99.0, 98.5]))
+
+    for variant in (changed, renamed, filled):
+        assert hash_table(variant) != expected
+
+
+def test_odd_node_is_rehashed_with_node_prefix():
+    leaves = [hash_table(_table().slice(i, 1)) for i in range(3)]
+    levels = tree_levels(leaves)
+
+    assert levels[1][1] != leaves[2]
+    assert len(levels[-1]) == 1
+
+
+def test_nested_columns_hash():
+    """List and struct columns hash by value instead of failing on bit_width."""
+    table = pa.table({
+        "levels": pa.array([[1], [2, 3], None, []]),
+        "quote": pa.array([{"bid": 1.0, "ask": 2.0}, None, {"bid": 3.0, "ask": None}, {"bid": 4.0, "ask": 5.0}]),
+    })
+    expected = hash_table(table)
+
+    chunked = pa.concat_tables([table.slice(0, 1), table.slice(1)])
+    changed = table.set_column(0, "levels", pa.array([[1], [2, 4], None, []]))
+
+    assert hash_table(chunked) == expected
+    assert hash_table(changed) != expected
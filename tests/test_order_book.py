@@ -0,0 +1,50 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from examples.order_book import replay_books  # noqa: E402
+
+
+def _write(path, rows):
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=4)
+    return path
+
+
+def _bids_asks(books, symbol="BTC"):
+    top = books.top(symbol)
+    return top.bid_prices.round(2).tolist(), top.ask_prices.round(2).tolist()
+
+
+def test_snapshot_rebuild_does_not_depend_on_batch_size(tmp_path):
+    """A snapshot split across batches or row groups is applied as one run."""
+    rows = [
+        {"symbol": "BTC", "type": "update", "side": "bid", "price": 90.0, "size": 5.0},
+        {"symbol": "BTC", "type": "snapshot", "side": "bid", "price": 99.0, "size": 1.0},
+        {"symbol": "BTC", "type": "snapshot", "side": "bid", "price": 98.0, "size": 1.0},
+        {"symbol": "BTC", "type": "trade", "side": "ask", "price": 99.0, "size": 0.5},
+        {"symbol": "BTC", "type": "snapshot", "side": "bid", "price": 97.0, "size": 1.0},
+        {"symbol": "BTC", "type": "snapshot", "side": "ask", "price": 101.0, "size": 2.0},
+        {"symbol": "BTC", "type": "update", "side": "ask", "price": 102.0, "size": 3.0},
+        {"symbol": "BTC", "type": "update", "side": "bid", "price": 98.0, "size": 0.0},
+    ]
+    path = _write(tmp_path / "events.parquet", rows)
+
+    expected = ([99.0, 97.0], [101.0, 102.0])
+    for batch_size in range(1, len(rows) + 2):
+        assert _bids_asks(replay_books([path], batch_size=batch_size)) == expected, batch_size
+
+
+def test_back_to_back_snapshots_replace_each_other(tmp_path):
+    """With timestamps, a second snapshot right after the first clears it."""
+    rows = [
+        {"ts": 1, "type": "snapshot", "side": "bid", "price": 99.0, "size": 1.0},
+        {"ts": 1, "type": "snapshot", "side": "ask", "price": 101.0, "size": 1.0},
+        {"ts": 2, "type": "snapshot", "side": "bid", "price": 98.0, "size": 1.0},
+        {"ts": 2, "type": "snapshot", "side": "ask", "price": 102.0, "size": 1.0},
+    ]
+    path = _write(tmp_path / "events.parquet", rows)
+
+    for batch_size in (1, 2, 3, 10):
+        books = replay_books([path], batch_size=batch_size, symbol="BTC")
+        assert _bids_asks(books) == ([98.0], [102.0]), batch_size
@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyarrow")
+
+from examples.quantile_sketch import KLLSketch, ks_2samp_sketch  # noqa: E402
+
+
+def _sketch(values, chunk=100_000):
+    sketch = KLLSketch()
+    for start in range(0, len(values), chunk):
+        sketch.update(values[start:start + chunk])
+    return sketch
+
+
+def test_rank_error_bounds_the_cdf():
+    """The tracked bound covers the actual rank error, also after merging."""
+    values = np.random.default_rng(1).normal(size=500_000)
+    merged = _sketch(values[:200_000]).merge(_sketch(values[200_000:]))
+
+    grid = np.concatenate(merged.levels)
+    exact = np.searchsorted(np.sort(values), grid, side="right") / len(values)
+
+    assert 0 < np.abs(merged.cdf(grid) - exact).max() <= merged.rank_error
+
+
+def test_sketch_ks_does_not_reject_same_distribution():
+    """Two large draws from one distribution: sketch error alone must not reject."""
+    rng = np.random.default_rng(0)
+    a, b = (_sketch(rng.normal(size=2_000_000)) for _ in range(2))
+
+    d, p = ks_2samp_sketch(a, b)
+
+    assert d > 0
+    assert p > 0.05
+
+
+def test_sketch_ks_rejects_shifted_distribution():
+    """A shift well beyond the sketches' accuracy is still detected."""
+    rng = np.random.default_rng(0)
+    a = _sketch(rng.normal(size=2_000_000))
+    b = _sketch(rng.normal(0.1, 1.0, size=2_000_000))
+
+    assert ks_2samp_sketch(a, b)[1] < 1e-6
+
+
+def test_sidecar_rebuilt_when_file_rewritten_with_same_rows(tmp_path):
+    """Sidecars are keyed on file content, not just the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from examples.quantile_sketch import load_sidecar
+
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"price": np.linspace(100.0, 101.0, 1000)}), path)
+    assert load_sidecar(path)["price"].max == 101.0
+
+    pq.write_table(pa.table({"price": np.linspace(200.0, 202.0, 1000)}), path)
+    assert load_sidecar(path)["price"].max == 202.0
+    assert load_sidecar(path)["price"].min == 200.0
@@ -0,0 +1,80 @@
+import os
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+import server  # noqa: E402
+
+
+def _daemon_end(reply=None):
+    """A socket pair whose far end answers like a daemon (or with ``reply``)."""
+    shim, daemon = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    def serve():
+        with daemon:
+            if reply is None:
+                reader = daemon.makefile("r", encoding="utf-8")
+                writer = daemon.makefile("w", encoding="utf-8")
+                server.serve_stream(reader, writer)
+            else:
+                daemon.recv(4096)
+                daemon.sendall(reply)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return shim
+
+
+def test_shim_accepts_daemon_with_same_identity():
+    """The handshake passes when key, base URL and user all match."""
+    with _daemon_end() as sock:
+        assert server._check_daemon(sock) is None
+
+
+def test_shim_refuses_daemon_with_other_identity():
+    """A daemon started with another API key or base URL is not used."""
+    reply = b'{"jsonrpc": "2.0", "id": 1, "result": {"identity": "0000000000000000"}}\n'
+    with _daemon_end(reply) as sock:
+        assert "different" in server._check_daemon(sock)
+    with _daemon_end(b"") as sock:
+        assert "handshake" in server._check_daemon(sock)
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="needs SO_PEERCRED")
+def test_shim_refuses_daemon_of_other_user(monkeypatch):
+    """Peer credentials must name this user."""
+    monkeypatch.setattr(server, "_UID", os.getuid() + 1)
+    with _daemon_end() as sock:
+        assert "uid" in server._check_daemon(sock)
+
+
+def test_default_socket_names_identity():
+    """Shims with different keys or endpoints get different default sockets."""
+    assert server.BRIDGE_IDENTITY in server.DEFAULT_SOCKET or os.getenv("ALEATORIC_BRIDGE_SOCKET")
+
+
+def test_cache_skips_error_results_and_unseeded_draws(monkeypatch):
+    """isError results are refetched; random tools are only cached with a seed."""
+    monkeypatch.setattr(server, "_cache", server.OrderedDict())
+    calls = []
+
+    def fetch(req):
+        calls.append(req["id"])
+        return {"jsonrpc": "2.0", "id": req["id"], "result": {"isError": len(calls) == 1}}
+
+    def call(name, arguments, msg_id):
+        params = {"name": name, "arguments": arguments}
+        return server.cached_call({"id": msg_id, "method": "tools/call", "params": params}, fetch)
+
+    assert call("get_presets", {}, 1)["result"]["isError"]
+    assert not call("get_presets", {}, 2)["result"]["isError"]
+    assert call("get_presets", {}, 3)["id"] == 3
+    assert calls == [1, 2]
+
+    call("generate_dataset", {"config": {"symbol": "BTC"}}, 4)
+    call("generate_dataset", {"config": {"symbol": "BTC"}}, 5)
+    call("generate_dataset", {"config": {"symbol": "BTC", "seed": 7}}, 6)
+    call("generate_dataset", {"config": {"symbol": "BTC", "seed": 7}}, 7)
+    assert calls == [1, 2, 4, 5, 6]
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+pa = pytest.importorskip("pyarrow")
+
+import server  # noqa: E402
+
+
+def test_as_table_keeps_keys_missing_from_first_record():
+    """Fields that only later records carry become columns (nulls elsewhere)."""
+    rows = [{"ts": 0}] + [{"ts": i, "bid": 1.0} for i in range(1, 200)]
+
+    table = server._as_table(rows)
+
+    assert table.column_names == ["ts", "bid"]
+    assert table.column("bid").null_count == 1
+    assert table.column("bid").to_pylist()[1:] == [1.0] * 199
+
+
+def test_offload_keeps_inline_rows(tmp_path, monkeypatch):
+    """Spooling adds a pointer to the Arrow file; the host still gets the rows."""
+    monkeypatch.setattr(server, "SPOOL_ENABLED", True)
+    monkeypatch.setattr(server, "SPOOL_DIR", str(tmp_path / "spool"))
+    text = json.dumps({"symbol": "BTC", "rows": [{"ts": i, "price": 1.0} for i in range(150)]})
+    resp = {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": text}]}}
+
+    content = server.offload_datasets(resp)["result"]["content"]
+
+    assert content[0] == {"type": "text", "text": text}
+    pointer = json.loads(content[1]["text"])["arrow"]
+    assert pointer["rows"] == 150 and pointer["field"] == "rows"
+    path = pointer["uri"][len("file://"):]
+    assert pa.ipc.open_file(pa.memory_map(path)).read_all().num_rows == 150
+    assert server._spool_files_exist(resp)
+
+
+def test_spool_is_user_only_and_rejects_planted_files(tmp_path, monkeypatch):
+    """The spool directory is 0700 and a reused file must hold the same bytes."""
+    spool = tmp_path / "spool"
+    monkeypatch.setattr(server, "SPOOL_DIR", str(spool))
+    table = pa.table({"ts": list(range(10))})
+
+    path = server.spool_table(table)
+    assert os.stat(spool).st_mode & 0o777 == 0o700
+    assert os.stat(path).st_mode & 0o077 == 0
+    original = open(path, "rb").read()
+
+    with open(path, "wb") as f:
+        f.write(b"planted")
+    assert server.spool_table(table) == path
+    assert open(path, "rb").read() == original
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership")
+def test_spool_rejects_directory_of_another_user(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "_UID", os.getuid() + 1)
+    with pytest.raises(OSError):
+        server._ensure_spool_dir()